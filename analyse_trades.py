@@ -6,16 +6,20 @@ import argparse
 import math
 from datetime import datetime, date
 
-import matplotlib.pyplot as plt
+import numpy as np
 
+from backtest import metrics
 from interface.binance_io import BinanceInterface
 from interface.config import Config
+from interface.trade_store import TradeStore
 
 COMMISSION = 0.001
 
 
 def analyse_trades(currency_pairs, start_date=None):
-    binance = BinanceInterface()
+    import matplotlib.pyplot as plt
+
+    binance = BinanceInterface(trade_store=TradeStore())
 
     for index, currency_pair in enumerate(currency_pairs):
         trades = binance.my_trade_history(currency_pair)
@@ -62,6 +66,20 @@ def analyse_trades(currency_pairs, start_date=None):
                 acquired_price = None
             previous_price = trade.price
 
+        trade_profits = np.diff(money)
+        drawdown, drawdown_duration = metrics.max_drawdown(money)
+        logging.info(
+            "{}: money: {}; trades: {}; win rate: {}; profit factor: {}; max drawdown: {} over {} trades".format(
+                currency_pair,
+                money[-1],
+                len(trade_profits),
+                metrics.win_rate(trade_profits),
+                metrics.profit_factor(trade_profits),
+                drawdown,
+                drawdown_duration,
+            )
+        )
+
         plt.subplot(len(currency_pairs), 1, index + 1)
         plt.title(currency_pair)
         plt.plot(t_money, money, color="blue")
@@ -0,0 +1,78 @@
+from backtest import metrics
+from backtest.engine import Book, per_bar_signals, run_signals
+from model import as_series
+from strategy.pipeline import Pipeline
+
+
+def run_comparison(strategies, klines, n_features, commission, vectorized=True):
+    """Backtest several strategies over one pass on the klines
+
+    strategies is a dict of strategies by name, each trading with its own
+    book. Strategies declaring their indicators share one pipeline, so the
+    indicators they have in common are computed once. Results are returned
+    by strategy name.
+    """
+    klines = as_series(klines)
+    if not vectorized:
+        return run_comparison_per_bar(strategies, klines, n_features, commission)
+
+    planned = {
+        name: strategy
+        for name, strategy in strategies.items()
+        if hasattr(strategy, "indicators")
+    }
+    signals = dict(zip(planned, Pipeline(list(planned.values())).signals(klines)))
+    results = {}
+    for name, strategy in strategies.items():
+        buy, sell = (
+            signals[name]
+            if name in signals
+            else per_bar_signals(strategy, klines, n_features)
+        )
+        results[name] = run_signals(
+            buy, sell, klines.close_price, klines.close_time, n_features, commission
+        )
+    return results
+
+
+def run_comparison_per_bar(strategies, klines, n_features, commission):
+    """Feed each window of klines to every strategy in turn"""
+    books = {name: Book(commission) for name in strategies}
+    for k in range(n_features, len(klines)):
+        klines_ref = klines[k - n_features : k]
+        price = klines_ref[-1].close_price
+        close_time = klines_ref[-1].close_time
+        for name, strategy in strategies.items():
+            book = books[name]
+            action = strategy.decide_action(klines_ref, book.acquired)
+            book.act(k - 1, action.is_buy(), action.is_sell(), price, close_time)
+    return {name: book.result() for name, book in books.items()}
+
+
+def compare_results(results, klines, commission):
+    """Money, number of transactions and metrics of each strategy, by name"""
+    klines = as_series(klines)
+    return {
+        name: {
+            "money": result.money[-1],
+            "nb_transactions": result.nb_transactions,
+            **metrics.backtest_metrics(result, klines, commission),
+        }
+        for name, result in results.items()
+    }
+
+
+def format_comparison(comparison):
+    fields = ["money", "nb_transactions", "sharpe", "max_drawdown", "win_rate"]
+    lines = [
+        "{:>16} {:>12} {:>6} {:>12} {:>12} {:>12}".format(
+            "strategy", "money", "trades", "sharpe", "drawdown", "win rate"
+        )
+    ]
+    for name, summary in comparison.items():
+        lines.append(
+            "{:>16} {:>12.6f} {:>6} {:>12.6f} {:>12.6f} {:>12.6f}".format(
+                name, *(summary[field] for field in fields)
+            )
+        )
+    return "\n".join(lines)
@@ -0,0 +1,118 @@
+import logging
+from datetime import date
+
+import numpy as np
+
+from model import as_series
+
+
+class BacktestResult:
+    def __init__(self, money, sell_times, buy_indices, sell_indices):
+        self.money = money
+        self.sell_times = sell_times
+        self.buy_indices = buy_indices
+        self.sell_indices = sell_indices
+
+    @property
+    def nb_transactions(self):
+        return len(self.buy_indices) + len(self.sell_indices)
+
+
+class Book:
+    """Position and money of one strategy, shared by the per-bar and batch runs"""
+
+    def __init__(self, commission):
+        self.commission = commission
+        self.money = [0.0]
+        self.acquired = None
+        self.sell_times = []
+        self.buy_indices = []
+        self.sell_indices = []
+
+    def act(self, index, is_buy, is_sell, price, current_time):
+        if not self.acquired and is_buy:
+            self.acquired = (1 - self.commission) / price
+            self.buy_indices.append(index)
+            logging.info("Buying at {}".format(price))
+        elif self.acquired and is_sell:
+            self.money.append(
+                self.money[-1] + (1.0 - self.commission) * price * self.acquired - 1.0
+            )
+            self.acquired = None
+            self.sell_times.append(current_time)
+            self.sell_indices.append(index)
+            logging.info(
+                "Selling at {}; money: {}; date: {}".format(
+                    price,
+                    self.money[-1],
+                    date.fromtimestamp(current_time / 1000).isoformat(),
+                )
+            )
+
+    def result(self):
+        return BacktestResult(
+            self.money, self.sell_times, self.buy_indices, self.sell_indices
+        )
+
+
+def run_per_bar(strategy, klines, n_features, commission):
+    klines = as_series(klines)
+    book = Book(commission)
+    for k in range(n_features, len(klines)):
+        klines_ref = klines[k - n_features : k]
+        action = strategy.decide_action(klines_ref, book.acquired)
+        book.act(
+            k - 1,
+            action.is_buy(),
+            action.is_sell(),
+            klines_ref[-1].close_price,
+            klines_ref[-1].close_time,
+        )
+    return book.result()
+
+
+def per_bar_signals(strategy, klines, n_features):
+    """Signal arrays of a strategy that only decides one window at a time
+
+    buy[i] is the decision without a position and sell[i] the one with a
+    position, given the n_features klines up to kline i.
+    """
+    klines = as_series(klines)
+    buy = np.zeros(len(klines), dtype=bool)
+    sell = np.zeros(len(klines), dtype=bool)
+    for k in range(n_features, len(klines) + 1):
+        klines_ref = klines[k - n_features : k]
+        buy[k - 1] = bool(strategy.decide_action(klines_ref, None).is_buy())
+        sell[k - 1] = bool(strategy.decide_action(klines_ref, 1.0).is_sell())
+    return buy, sell
+
+
+def strategy_signals(strategy, klines, n_features):
+    if hasattr(strategy, "signals"):
+        return strategy.signals(klines)
+    return per_bar_signals(strategy, klines, n_features)
+
+
+def run_signals(buy, sell, close_prices, close_times, n_features, commission):
+    """Turn whole-series signal arrays into fills
+
+    buy[i] and sell[i] are the decisions taken once kline i is known, so the
+    per-bar loop over windows klines[k - n_features : k] maps to i = k - 1.
+    Only bars carrying a signal are visited.
+    """
+    book = Book(commission)
+    end = len(close_prices) - 1
+    candidates = np.flatnonzero(buy[n_features - 1 : end] | sell[n_features - 1 : end])
+    for i in (candidates + n_features - 1).tolist():
+        book.act(i, buy[i], sell[i], float(close_prices[i]), int(close_times[i]))
+    return book.result()
+
+
+def run_backtest(strategy, klines, n_features, commission, vectorized=True):
+    if not vectorized or not hasattr(strategy, "signals"):
+        return run_per_bar(strategy, klines, n_features, commission)
+    klines = as_series(klines)
+    buy, sell = strategy.signals(klines)
+    return run_signals(
+        buy, sell, klines.close_price, klines.close_time, n_features, commission
+    )
@@ -0,0 +1,120 @@
+import numpy as np
+
+MS_PER_YEAR = 365 * 24 * 3600 * 1000
+
+
+def equity_curve(result, close_prices, commission):
+    """Equity and position for every kline of a backtest, with a starting capital of 1
+
+    Open positions are valued at the close price, before the sell commission.
+    """
+    n = len(close_prices)
+    buys = np.asarray(result.buy_indices, dtype=np.int64)
+    sells = np.asarray(result.sell_indices, dtype=np.int64)
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+
+    position_changes = np.zeros(n)
+    np.add.at(position_changes, buys, 1.)
+    np.add.at(position_changes, sells, -1.)
+    positions = np.cumsum(position_changes)
+
+    units = (1 - commission) / close_prices[buys]
+    unit_changes = np.zeros(n)
+    np.add.at(unit_changes, buys, units)
+    np.add.at(unit_changes, sells, -units[:len(sells)])
+    held_units = np.cumsum(unit_changes)
+
+    realized_changes = np.zeros(n)
+    np.add.at(realized_changes, sells, np.diff(result.money))
+    realized = np.cumsum(realized_changes)
+
+    return 1. + realized + held_units * close_prices - positions, positions
+
+
+def periods_per_year(close_times):
+    if len(close_times) < 2:
+        return 1.
+    return MS_PER_YEAR / float(np.median(np.diff(close_times)))
+
+
+def returns(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    return np.diff(equity) / equity[:-1]
+
+
+def sharpe_ratio(equity, nb_periods_per_year):
+    period_returns = returns(equity)
+    if len(period_returns) == 0:
+        return 0.
+    std = np.std(period_returns)
+    return 0. if std == 0 else float(np.mean(period_returns) / std * np.sqrt(nb_periods_per_year))
+
+
+def sortino_ratio(equity, nb_periods_per_year):
+    period_returns = returns(equity)
+    if len(period_returns) == 0:
+        return 0.
+    downside = np.sqrt(np.mean(np.minimum(period_returns, 0.) ** 2))
+    return 0. if downside == 0 else float(np.mean(period_returns) / downside * np.sqrt(nb_periods_per_year))
+
+
+def max_drawdown(values):
+    """Largest drop from a previous peak, and longest number of periods below a previous peak"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return 0., 0
+    drawdowns = np.maximum.accumulate(values) - values
+    under_water = np.concatenate(([False], drawdowns > 0, [False]))
+    edges = np.flatnonzero(np.diff(under_water.astype(np.int8)))
+    durations = edges[1::2] - edges[::2]
+    return float(drawdowns.max()), int(durations.max()) if len(durations) else 0
+
+
+def win_rate(trade_profits):
+    trade_profits = np.asarray(trade_profits, dtype=np.float64)
+    return float(np.mean(trade_profits > 0)) if len(trade_profits) else 0.
+
+
+def profit_factor(trade_profits):
+    """Gains over losses; None when there are gains but no loss, as JSON has no infinity"""
+    trade_profits = np.asarray(trade_profits, dtype=np.float64)
+    gains = trade_profits[trade_profits > 0].sum()
+    losses = -trade_profits[trade_profits < 0].sum()
+    if losses == 0:
+        return None if gains > 0 else 0.
+    return float(gains / losses)
+
+
+def exposure(positions):
+    positions = np.asarray(positions)
+    return float(np.mean(positions != 0)) if len(positions) else 0.
+
+
+def turnover(positions):
+    """Average absolute position change per period"""
+    positions = np.asarray(positions, dtype=np.float64)
+    return float(np.abs(np.diff(positions)).sum() / len(positions)) if len(positions) else 0.
+
+
+def compute_metrics(equity, positions, trade_profits, nb_periods_per_year):
+    drawdown, drawdown_duration = max_drawdown(equity)
+    return {
+        "sharpe": sharpe_ratio(equity, nb_periods_per_year),
+        "sortino": sortino_ratio(equity, nb_periods_per_year),
+        "max_drawdown": drawdown,
+        "max_drawdown_duration": drawdown_duration,
+        "win_rate": win_rate(trade_profits),
+        "profit_factor": profit_factor(trade_profits),
+        "exposure": exposure(positions),
+        "turnover": turnover(positions),
+    }
+
+
+def backtest_metrics(result, klines, commission):
+    equity, positions = equity_curve(result, klines.close_price, commission)
+    return compute_metrics(
+        equity,
+        positions,
+        np.diff(result.money),
+        periods_per_year(klines.close_time),
+    )
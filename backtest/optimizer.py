@@ -0,0 +1,136 @@
+import itertools
+import logging
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest import metrics
+from backtest.engine import run_backtest
+from interface import read_data
+from model import as_series
+
+# Kline dataset of a worker process, loaded once by init_worker
+_worker_klines = None
+
+
+def parse_param_range(text):
+    """Parse "NAME=start:stop:step" (stop included) or "NAME=v1,v2,..." """
+    name, _, values_text = text.partition("=")
+    if not name or not values_text:
+        raise ValueError("Invalid parameter range: {}".format(text))
+    if ":" in values_text:
+        start, stop, step = [_parse_number(value) for value in values_text.split(":")]
+        count = int(round((stop - start) / step)) + 1
+        values = [start + k * step for k in range(count)]
+        if not all(isinstance(value, int) for value in (start, stop, step)):
+            values = [round(value, 12) for value in values]
+    else:
+        values = [_parse_number(value) for value in values_text.split(",")]
+    return name, values
+
+
+def _parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def grid_search_params(param_ranges):
+    names = list(param_ranges)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(param_ranges[name] for name in names))
+    ]
+
+
+def random_search_params(param_ranges, nb_samples, seed=None):
+    rng = random.Random(seed)
+    return [
+        {name: rng.choice(values) for name, values in param_ranges.items()}
+        for _ in range(nb_samples)
+    ]
+
+
+def make_strategy(strategy_class, params):
+    strat = strategy_class()
+    for name, value in params.items():
+        if not hasattr(strategy_class, name):
+            raise ValueError(
+                "{} has no parameter {}".format(strategy_class.__name__, name)
+            )
+        setattr(strat, name, value)
+    return strat
+
+
+def evaluate(strategy_class, params, klines, n_features, commission):
+    klines = as_series(klines)
+    strat = make_strategy(strategy_class, params)
+    result = run_backtest(strat, klines, n_features, commission)
+    result_metrics = metrics.backtest_metrics(result, klines, commission)
+    return {
+        "params": params,
+        "money": result.money[-1],
+        "nb_transactions": result.nb_transactions,
+        "drawdown": result_metrics["max_drawdown"],
+        "sharpe": result_metrics["sharpe"],
+    }
+
+
+def init_worker(file_path, klines):
+    global _worker_klines
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker_klines = read_data.read_klines(file_path) if file_path else klines
+
+
+def worker_klines():
+    return _worker_klines
+
+
+def _evaluate_in_worker(task):
+    strategy_class, params, n_features, commission = task
+    return evaluate(strategy_class, params, _worker_klines, n_features, commission)
+
+
+def run_sweep(
+    strategy_class,
+    param_sets,
+    n_features,
+    commission,
+    file_path=None,
+    klines=None,
+    max_workers=None,
+    rank_by="money",
+):
+    """Backtest every parameter set in parallel, best first according to rank_by
+
+    With a file path, each worker memory-maps the kline file once, so the
+    dataset is shared through the page cache. Otherwise the klines are
+    handed to each worker once at start-up, not to each task.
+    """
+    if (file_path is None) == (klines is None):
+        raise ValueError("Exactly one of file path and klines is needed")
+    tasks = [(strategy_class, params, n_features, commission) for params in param_sets]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_worker,
+        initargs=(file_path, klines),
+    ) as executor:
+        results = list(executor.map(_evaluate_in_worker, tasks))
+    return sorted(results, key=lambda result: result[rank_by], reverse=True)
+
+
+def format_results(results):
+    lines = ["{:>4} {:>12} {:>6} {:>10} {:>8}  {}".format(
+        "rank", "money", "trades", "drawdown", "sharpe", "params")]
+    for rank, result in enumerate(results, start=1):
+        lines.append(
+            "{:>4} {:>12.6f} {:>6} {:>10.6f} {:>8.3f}  {}".format(
+                rank,
+                result["money"],
+                result["nb_transactions"],
+                result["drawdown"],
+                result["sharpe"],
+                result["params"],
+            )
+        )
+    return "\n".join(lines)
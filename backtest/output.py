@@ -0,0 +1,39 @@
+import json
+import os
+
+import numpy as np
+
+from model import as_series
+
+RESULT_FILE = "result.npz"
+SUMMARY_FILE = "summary.json"
+
+
+def save_result(directory, klines, result, summary):
+    """Write the money curve and trade log as arrays, and the summary as JSON
+
+    Trades are stored as one column per field: kline index, close time,
+    close price and side (1 for a buy, -1 for a sell).
+    """
+    klines = as_series(klines)
+    os.makedirs(directory, exist_ok=True)
+    trade_indices = np.array(sorted(result.buy_indices + result.sell_indices), dtype=np.int64)
+    trade_sides = np.where(np.isin(trade_indices, result.buy_indices), 1, -1).astype(np.int8)
+    np.savez_compressed(
+        os.path.join(directory, RESULT_FILE),
+        money=np.array(result.money),
+        money_times=np.array([klines.close_time[0]] + result.sell_times, dtype=np.int64),
+        trade_indices=trade_indices,
+        trade_times=klines.close_time[trade_indices],
+        trade_prices=klines.close_price[trade_indices],
+        trade_sides=trade_sides,
+    )
+    with open(os.path.join(directory, SUMMARY_FILE), "w") as file:
+        json.dump(summary, file, indent=2)
+
+
+def load_result(directory):
+    with np.load(os.path.join(directory, RESULT_FILE)) as data:
+        arrays = dict(data)
+    with open(os.path.join(directory, SUMMARY_FILE)) as file:
+        return arrays, json.load(file)
@@ -0,0 +1,109 @@
+import logging
+from functools import reduce
+
+import numpy as np
+
+from backtest.engine import strategy_signals
+from model import as_series
+
+
+class PortfolioResult:
+    def __init__(self, symbols, open_times, cash, symbol_values, symbol_profits, nb_transactions):
+        self.symbols = symbols
+        self.open_times = open_times
+        self.cash = cash
+        self.symbol_values = symbol_values
+        self.symbol_profits = symbol_profits
+        self.nb_transactions = nb_transactions
+
+    @property
+    def equity(self):
+        """Cash plus market value of the open positions, for every aligned kline"""
+        return self.cash + self.symbol_values.sum(axis=1)
+
+
+def align_klines(klines_by_symbol):
+    """Keep the open times present for every symbol
+
+    Returns the common open times and, for each symbol, the index in its own
+    series of each common open time.
+    """
+    series = [as_series(klines) for klines in klines_by_symbol.values()]
+    open_times = reduce(np.intersect1d, [klines.open_time for klines in series])
+    indices = [np.searchsorted(klines.open_time, open_times) for klines in series]
+    return open_times, indices
+
+
+def run_portfolio(strategies, klines_by_symbol, n_features, commission):
+    """Backtest one strategy per symbol on a shared capital of 1
+
+    Sells are applied before buys within a kline, and each buy spends an equal
+    share of the cash between the symbols without a position. Operations
+    within a kline are vectorized across symbols.
+    """
+    symbols = list(klines_by_symbol)
+    open_times, indices = align_klines(klines_by_symbol)
+    n = len(open_times)
+    nb_symbols = len(symbols)
+
+    prices = np.empty((n, nb_symbols))
+    buy = np.zeros((n, nb_symbols), dtype=bool)
+    sell = np.zeros((n, nb_symbols), dtype=bool)
+    for s, symbol in enumerate(symbols):
+        klines = as_series(klines_by_symbol[symbol])
+        symbol_buy, symbol_sell = strategy_signals(strategies[symbol], klines, n_features)
+        # Same range of decisions as a single symbol backtest
+        valid = indices[s] >= n_features - 1
+        valid &= indices[s] < len(klines) - 1
+        prices[:, s] = klines.close_price[indices[s]]
+        buy[:, s] = symbol_buy[indices[s]] & valid
+        sell[:, s] = symbol_sell[indices[s]] & valid
+
+    cash = 1.0
+    units = np.zeros(nb_symbols)
+    costs = np.zeros(nb_symbols)
+    realized = np.zeros(nb_symbols)
+    nb_transactions = np.zeros(nb_symbols, dtype=int)
+    event_rows = [0]
+    event_cash = [cash]
+    event_units = [units.copy()]
+    event_profits = [np.zeros(nb_symbols)]
+
+    for t in np.flatnonzero((buy | sell).any(axis=1)).tolist():
+        held = units > 0
+        selling = sell[t] & held
+        buying = buy[t] & ~held
+        if not selling.any() and not buying.any():
+            continue
+        if selling.any():
+            proceeds = (1 - commission) * units[selling] * prices[t, selling]
+            cash += proceeds.sum()
+            realized[selling] += proceeds - costs[selling]
+            units[selling] = 0.
+            costs[selling] = 0.
+            logging.info("Selling {} at {}; cash: {}".format(
+                [symbols[s] for s in np.flatnonzero(selling)], prices[t, selling], cash))
+        if buying.any():
+            stake = cash / np.count_nonzero(units == 0)
+            units[buying] = (1 - commission) * stake / prices[t, buying]
+            costs[buying] = stake
+            cash -= stake * np.count_nonzero(buying)
+            logging.info("Buying {} at {}; cash: {}".format(
+                [symbols[s] for s in np.flatnonzero(buying)], prices[t, buying], cash))
+        nb_transactions += selling | buying
+        event_rows.append(t)
+        event_cash.append(cash)
+        event_units.append(units.copy())
+        event_profits.append(realized - costs)
+
+    # State after the last event at or before each kline
+    last_event = np.searchsorted(event_rows, np.arange(n), side="right") - 1
+    symbol_values = np.array(event_units)[last_event] * prices
+    return PortfolioResult(
+        symbols,
+        open_times,
+        np.array(event_cash)[last_event],
+        symbol_values,
+        np.array(event_profits)[last_event] + symbol_values,
+        nb_transactions,
+    )
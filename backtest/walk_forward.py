@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest import optimizer
+
+
+def make_folds(n, train_size, test_size, step=None):
+    """Rolling (train_start, train_end, test_start, test_end) index ranges
+
+    Each test range directly follows its train range, and consecutive folds
+    are shifted by step klines, test_size by default.
+    """
+    step = step or test_size
+    folds = []
+    start = 0
+    while start + train_size + test_size <= n:
+        train_end = start + train_size
+        folds.append((start, train_end, train_end, train_end + test_size))
+        start += step
+    return folds
+
+
+def run_fold(strategy_class, param_sets, klines, fold, n_features, commission):
+    """Pick the best parameters on the train range and evaluate them on the test range
+
+    The n_features klines preceding the test range are given to the strategy
+    as history, so that its first decision is taken at the start of the test
+    range.
+    """
+    train_start, train_end, test_start, test_end = fold
+    train_klines = klines[train_start:train_end]
+    train_results = [
+        optimizer.evaluate(strategy_class, params, train_klines, n_features, commission)
+        for params in param_sets
+    ]
+    best = max(train_results, key=lambda result: result["money"])
+    test_klines = klines[max(0, test_start - n_features) : test_end]
+    test = optimizer.evaluate(
+        strategy_class, best["params"], test_klines, n_features, commission
+    )
+    return {
+        "fold": fold,
+        "params": best["params"],
+        "train_money": best["money"],
+        "test_money": test["money"],
+        "nb_transactions": test["nb_transactions"],
+        "drawdown": test["drawdown"],
+    }
+
+
+def _run_fold_in_worker(task):
+    strategy_class, param_sets, fold, n_features, commission = task
+    return run_fold(
+        strategy_class,
+        param_sets,
+        optimizer.worker_klines(),
+        fold,
+        n_features,
+        commission,
+    )
+
+
+def run_walk_forward(
+    strategy_class,
+    param_sets,
+    folds,
+    n_features,
+    commission,
+    file_path=None,
+    klines=None,
+    max_workers=None,
+):
+    """Run independent folds in parallel, in fold order
+
+    The parameters chosen on the last fold are the ones to use in production.
+    """
+    if (file_path is None) == (klines is None):
+        raise ValueError("Exactly one of file path and klines is needed")
+    tasks = [
+        (strategy_class, param_sets, fold, n_features, commission) for fold in folds
+    ]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=optimizer.init_worker,
+        initargs=(file_path, klines),
+    ) as executor:
+        return list(executor.map(_run_fold_in_worker, tasks))
+
+
+def format_folds(fold_results):
+    lines = [
+        "{:>16} {:>16} {:>12} {:>12} {:>6}  {}".format(
+            "train", "test", "train money", "test money", "trades", "params"
+        )
+    ]
+    for result in fold_results:
+        train_start, train_end, test_start, test_end = result["fold"]
+        lines.append(
+            "{:>16} {:>16} {:>12.6f} {:>12.6f} {:>6}  {}".format(
+                "{}-{}".format(train_start, train_end),
+                "{}-{}".format(test_start, test_end),
+                result["train_money"],
+                result["test_money"],
+                result["nb_transactions"],
+                result["params"],
+            )
+        )
+    lines.append(
+        "Out-of-sample money: {}".format(
+            sum(result["test_money"] for result in fold_results)
+        )
+    )
+    return "\n".join(lines)
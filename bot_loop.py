@@ -3,86 +3,112 @@
 
 import time
 import argparse
-import json
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
+from interface import instrumentation
 from interface.binance_io import BinanceInterface
+from interface.candle_clock import CandleClock
 from interface.config import Config
+from interface.http_session import gather_calls, run_concurrently
+from interface.kline_cache import KlineCache
+from interface.kline_stream import KlineStream
+from interface.state_journal import StateJournal
+from interface.trade_store import TradeStore
 
 STATE_FILE = "state/{}.json"
 COMMISSION = 0.001
 N_REF = 150
+# Attempts at fetching a kline that should just have closed
+CLOSE_FETCH_RETRIES = 5
+METRICS_DUMP_PERIOD = 60
 
 
-def save_state(profile_name, state):
+def stage_timer(stage):
+    return instrumentation.metrics.timer("bot_stage_seconds", stage=stage)
+
+
+def save_state(journal, state):
     try:
-        with open(STATE_FILE.format(profile_name), "w") as f:
-            json.dump(state, f)
+        with stage_timer("save_state"):
+            journal.save(state)
     except Exception as e:
         logging.error(f"Unable to write state file: {e}")
 
 
-def load_state(profile_name):
+def load_state(journal):
     try:
-        with open(STATE_FILE.format(profile_name), "r") as f:
-            return json.load(f)
+        return journal.load()
     except Exception as e:
         logging.error(f"Unable to load state file: {e}")
         return None
 
 
+def record_buy(state, price, buy_quantity):
+    instrumentation.metrics.increment(
+        "bot_transactions_total", symbol=state["symbol"], side="buy"
+    )
+    logging.info(
+        "Buying {} at {}; profit: {}".format(buy_quantity, price, state["profit"])
+    )
+    state["previous_price"] = price
+    state["nb_transactions"] += 1
+    state["buy_quantity"] = buy_quantity
+    state["acquired"] = (1 - state["commission"]) / price
+    state["profit"] -= 1.0
+
+
+def record_sell(state, price):
+    instrumentation.metrics.increment(
+        "bot_transactions_total", symbol=state["symbol"], side="sell"
+    )
+    logging.info(
+        "Selling {} at {}; profit: {}".format(
+            state["buy_quantity"], price, state["profit"]
+        )
+    )
+    state["profit"] += (1 - state["commission"]) * state["acquired"] * price
+    state["previous_price"] = price
+    state["nb_transactions"] += 1
+    state["buy_quantity"] = None
+    state["acquired"] = None
+
+
 def probe_and_act(strat, binance, state, klines):
-    previous_price = state["previous_price"]
     acquired = state["acquired"]
     quantity = state["quantity"]
     buy_quantity = state["buy_quantity"]
-    commission = state["commission"]
-    profit = state["profit"]
     simulate = state["simulate"]
     symbol = state["symbol"]
 
-    action = strat.decide_action(klines, acquired)
+    with stage_timer("decide_action"):
+        action = strat.decide_action(klines, acquired)
     price = klines[-1].close_price
 
     # Buy or sell
     if not acquired and action.is_buy():
         buy_quantity = float("%.3g" % quantity)
         if not simulate:
-            order = binance.create_order(
-                is_buy=True, quantity=buy_quantity, symbol=symbol
-            )
+            with stage_timer("create_order"):
+                order = binance.create_order(
+                    is_buy=True, quantity=buy_quantity, symbol=symbol
+                )
             price = float(order["fills"][0]["price"])
-        logging.info("Buying {} at {}; profit: {}".format(buy_quantity, price, profit))
-        state["previous_price"] = price
-        state["nb_transactions"] += 1
-        state["buy_quantity"] = buy_quantity
-        state["acquired"] = (1 - commission) / price
-        state["profit"] -= 1.0
+        record_buy(state, price, buy_quantity)
     elif acquired and action.is_sell():
         if not simulate:
-            order = binance.create_order(
-                is_buy=False, quantity=buy_quantity, symbol=symbol
-            )
+            with stage_timer("create_order"):
+                order = binance.create_order(
+                    is_buy=False, quantity=buy_quantity, symbol=symbol
+                )
             price = float(order["fills"][0]["price"])
-        logging.info("Selling {} at {}; profit: {}".format(buy_quantity, price, profit))
-        state["previous_price"] = price
-        state["nb_transactions"] += 1
-        state["buy_quantity"] = None
-        state["acquired"] = None
-        state["profit"] += (1 - commission) * acquired * price
+        record_sell(state, price)
 
 
-def run(params):
-    state = load_state(params["profile_name"])
-
-    period = params["period"]
-    symbol = params["symbol"]
-    interval = params["interval"]
-
-    binance = BinanceInterface()
+def init_state(params, journal, last_trade, start_price):
+    state = load_state(journal)
 
-    last_trade = binance.last_trade(symbol)
     logging.info("Last trade in this currency pair: {}".format(last_trade))
     acquired_price = last_trade.price if last_trade and last_trade.is_buy else None
     buy_quantity = (
@@ -90,11 +116,6 @@ def run(params):
         if last_trade and last_trade.is_buy
         else None
     )
-    start_price = binance.last_price(symbol)
-
-    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
-
-    strat = KlinesAvgLogRatioStrategy()
 
     if not state:
         state = {
@@ -106,31 +127,62 @@ def run(params):
             "start_price": start_price,
         }
         state = {**params, **state}
+    return state
+
+
+def log_run(i, state, klines):
+    price = klines[-1].close_price
+    logging.info(
+        "{} run {}; profit: {}; transactions: {}; price ratio to previous: {}; market: {}".format(
+            state["symbol"],
+            i,
+            state["profit"],
+            state["nb_transactions"],
+            price / state["previous_price"],
+            price / state["start_price"] - 1,
+        )
+    )
+
+
+def run(params):
+    period = params["period"]
+    symbol = params["symbol"]
+    interval = params["interval"]
+
+    binance = BinanceInterface(trade_store=TradeStore())
+    journal = StateJournal(STATE_FILE.format(params["profile_name"]))
+    state = init_state(
+        params,
+        journal,
+        *run_concurrently(
+            (binance.last_trade, params["symbol"]),
+            (binance.last_price, params["symbol"]),
+        ),
+    )
+
+    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+    strat = KlinesAvgLogRatioStrategy()
+    kline_cache = KlineCache(binance.get_klines, time_offset=binance.server_time_diff())
 
     i = 0
     while True:
         i += 1
         begin_time = time.time()
 
-        klines = binance.get_klines(limit=N_REF, interval=interval, symbol=symbol)
+        with stage_timer("get_klines"):
+            klines = kline_cache.get_klines(
+                limit=N_REF, interval=interval, symbol=symbol
+            )
 
         if not klines:
             logging.error("Could not retrieve klines")
             continue
 
-        price = klines[-1].close_price
-        logging.info(
-            "Run {}; profit: {}; transactions: {}; price ratio to previous: {}; market: {}".format(
-                i,
-                state["profit"],
-                state["nb_transactions"],
-                price / state["previous_price"],
-                price / state["start_price"] - 1,
-            )
-        )
+        log_run(i, state, klines)
         probe_and_act(strat, binance, state, klines)
 
-        save_state(params["profile_name"], state)
+        save_state(journal, state)
 
         # Sleep if duration was shorter than period
         duration = time.time() - begin_time
@@ -138,36 +190,164 @@ def run(params):
             time.sleep(period - duration)
 
 
+def run_aligned(params):
+    symbol = params["symbol"]
+    interval = params["interval"]
+
+    binance = BinanceInterface(trade_store=TradeStore())
+    journal = StateJournal(STATE_FILE.format(params["profile_name"]))
+    state = init_state(
+        params,
+        journal,
+        *run_concurrently(
+            (binance.last_trade, params["symbol"]),
+            (binance.last_price, params["symbol"]),
+        ),
+    )
+
+    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+    strat = KlinesAvgLogRatioStrategy()
+    clock = CandleClock(interval, binance.server_time_diff())
+    # Always refresh: only the klines closed since the previous run are requested.
+    # Klines are classified as closed on the server clock the bot wakes on.
+    kline_cache = KlineCache(
+        binance.get_klines, max_age=0, time_offset=clock.time_offset
+    )
+
+    i = 0
+    while True:
+        i += 1
+        next_open_time = clock.wait_for_close()
+
+        for _ in range(CLOSE_FETCH_RETRIES):
+            with stage_timer("get_klines"):
+                klines = kline_cache.get_klines(
+                    limit=N_REF, interval=interval, symbol=symbol, closed_only=True
+                )
+            if klines and klines[-1].close_time >= next_open_time - 1:
+                break
+            time.sleep(clock.guard)
+        else:
+            logging.error("Could not retrieve kline closing at {}".format(next_open_time))
+            continue
+
+        log_run(i, state, klines)
+        probe_and_act(strat, binance, state, klines)
+
+        save_state(journal, state)
+
+        # Follow the drift of the local clock, now that the decision is made
+        try:
+            clock.time_offset = binance.server_time_diff()
+        except Exception as e:
+            logging.error(f"Unable to read server time: {e}")
+        kline_cache.time_offset = clock.time_offset
+
+
+async def run_stream(params):
+    binance = BinanceInterface(trade_store=TradeStore())
+    journal = StateJournal(STATE_FILE.format(params["profile_name"]))
+    state = init_state(
+        params,
+        journal,
+        *await gather_calls(
+            (binance.last_trade, params["symbol"]),
+            (binance.last_price, params["symbol"]),
+        ),
+    )
+
+    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+    strat = KlinesAvgLogRatioStrategy()
+
+    i = 0
+
+    async def on_close(klines):
+        nonlocal i
+        i += 1
+        log_run(i, state, klines)
+        await asyncio.to_thread(probe_and_act, strat, binance, state, klines)
+        save_state(journal, state)
+
+    stream = KlineStream(
+        binance,
+        params["symbol"],
+        params["interval"],
+        N_REF,
+        time_offset=await asyncio.to_thread(binance.server_time_diff),
+    )
+    await stream.run(on_close)
+
+
+def enable_metrics(port, file_path):
+    if port is None and not file_path:
+        return
+    metrics = instrumentation.enable()
+    if port is not None:
+        metrics.serve(port)
+    if file_path:
+        metrics.start_dump(file_path, METRICS_DUMP_PERIOD)
+
+
 def read_profile(profile_name):
     if not profile_name:
         raise EnvironmentError("Profile name was not specified")
     return Config().profile_config(profile_name)
 
 
+def profile_params(config, profile_name, simulate):
+    profile = config.profile_config(profile_name)
+    return {
+        "commission": COMMISSION,
+        "simulate": simulate,
+        "symbol": profile.symbol,
+        "quantity": profile.quantity,
+        "interval": config.interval,
+        "period": config.period,
+        "profile_name": profile_name,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="Cryptocurrency trading bot")
     parser.add_argument(
         "-s", "--simulate", help="Do not make order, simulate only", action="store_true"
     )
     parser.add_argument("-p", "--profile", help="Profile name")
+    parser.add_argument(
+        "--stream",
+        help="Act on each closed kline from the websocket stream instead of polling",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--aligned",
+        help="Act once per kline, right after it closes according to the server clock",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        help="Serve stage timings in the Prometheus text format on this port",
+        type=int,
+    )
+    parser.add_argument(
+        "--metrics-file", help="Dump stage timings as JSON to this file every minute"
+    )
     args = parser.parse_args()
 
     log_format = "%(asctime)-15s %(message)s"
     logging.basicConfig(format=log_format, level=logging.DEBUG)
 
-    config = Config()
-    profile = config.profile_config(args.profile)
-    params = {
-        "commission": COMMISSION,
-        "simulate": args.simulate,
-        "symbol": profile.symbol,
-        "quantity": profile.quantity,
-        "interval": config.interval,
-        "period": config.period,
-        "profile_name": args.profile,
-    }
+    enable_metrics(args.metrics_port, args.metrics_file)
+
+    params = profile_params(Config(), args.profile, args.simulate)
 
-    run(params)
+    if args.stream:
+        asyncio.run(run_stream(params))
+    elif args.aligned:
+        run_aligned(params)
+    else:
+        run(params)
 
 
 if __name__ == "__main__":
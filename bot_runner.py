@@ -0,0 +1,161 @@
+#! /usr/bin/env python3
+# coding: utf-8
+
+import argparse
+import asyncio
+import logging
+import time
+
+from bot_loop import (
+    N_REF,
+    STATE_FILE,
+    enable_metrics,
+    init_state,
+    log_run,
+    profile_params,
+    record_buy,
+    record_sell,
+    save_state,
+    stage_timer,
+)
+from interface.binance_async import AsyncBinanceInterface
+from interface.config import Config
+from interface.kline_cache import AsyncKlineCache
+from interface.state_journal import StateJournal
+from interface.trade_store import TradeStore
+
+# Seconds before a profile stopped by an error is restarted
+RESTART_DELAY = 60
+
+
+async def probe_and_act(strat, binance, state, klines):
+    acquired = state["acquired"]
+    buy_quantity = state["buy_quantity"]
+    symbol = state["symbol"]
+
+    with stage_timer("decide_action"):
+        action = strat.decide_action(klines, acquired)
+    price = klines[-1].close_price
+
+    # Buy or sell
+    if not acquired and action.is_buy():
+        buy_quantity = float("%.3g" % state["quantity"])
+        if not state["simulate"]:
+            with stage_timer("create_order"):
+                order = await binance.create_order(
+                    is_buy=True, quantity=buy_quantity, symbol=symbol
+                )
+            price = float(order["fills"][0]["price"])
+        record_buy(state, price, buy_quantity)
+    elif acquired and action.is_sell():
+        if not state["simulate"]:
+            with stage_timer("create_order"):
+                order = await binance.create_order(
+                    is_buy=False, quantity=buy_quantity, symbol=symbol
+                )
+            price = float(order["fills"][0]["price"])
+        record_sell(state, price)
+
+
+async def run_profile(params, binance, kline_cache):
+    symbol = params["symbol"]
+    journal = StateJournal(STATE_FILE.format(params["profile_name"]))
+    state = init_state(
+        params,
+        journal,
+        await binance.last_trade(symbol),
+        await binance.last_price(symbol),
+    )
+
+    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+    strat = KlinesAvgLogRatioStrategy()
+
+    i = 0
+    while True:
+        i += 1
+        begin_time = time.time()
+
+        with stage_timer("get_klines"):
+            klines = await kline_cache.get_klines(
+                limit=N_REF, interval=params["interval"], symbol=symbol
+            )
+
+        if klines:
+            log_run(i, state, klines)
+            await probe_and_act(strat, binance, state, klines)
+            save_state(journal, state)
+        else:
+            logging.error("Could not retrieve klines for {}".format(symbol))
+
+        # Sleep if duration was shorter than period
+        duration = time.time() - begin_time
+        if duration < params["period"]:
+            await asyncio.sleep(params["period"] - duration)
+
+
+async def supervise_profile(params, binance, kline_cache):
+    """Run a profile, restarting it after an error while the other profiles go on"""
+    while True:
+        try:
+            await run_profile(params, binance, kline_cache)
+        except Exception:
+            logging.exception("Profile {} stopped".format(params["profile_name"]))
+        await asyncio.sleep(RESTART_DELAY)
+
+
+async def run(profile_names, simulate):
+    config = Config()
+    binance = await AsyncBinanceInterface.create(trade_store=TradeStore())
+    if not simulate:
+        await binance.start_user_stream()
+    try:
+        time_offset = await binance.server_time_diff()
+    except Exception as e:
+        logging.error(f"Unable to read server time: {e}")
+        time_offset = 0.0
+    # Klines are classified as closed on the server clock
+    kline_cache = AsyncKlineCache(binance.get_klines, time_offset=time_offset)
+    try:
+        await asyncio.gather(
+            *(
+                supervise_profile(
+                    profile_params(config, profile_name, simulate), binance, kline_cache
+                )
+                for profile_name in profile_names or config.profiles
+            )
+        )
+    finally:
+        await binance.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cryptocurrency trading bot running several profiles in one process"
+    )
+    parser.add_argument(
+        "-s", "--simulate", help="Do not make order, simulate only", action="store_true"
+    )
+    parser.add_argument(
+        "-p", "--profile", help="Profile names, all profiles by default", nargs="*"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        help="Serve stage timings in the Prometheus text format on this port",
+        type=int,
+    )
+    parser.add_argument(
+        "--metrics-file", help="Dump stage timings as JSON to this file every minute"
+    )
+    args = parser.parse_args()
+
+    log_format = "%(asctime)-15s %(message)s"
+    logging.basicConfig(format=log_format, level=logging.DEBUG)
+
+    enable_metrics(args.metrics_port, args.metrics_file)
+
+    asyncio.run(run(args.profile, args.simulate))
+
+
+if __name__ == "__main__":
+    main()
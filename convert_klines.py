@@ -0,0 +1,28 @@
+#! /usr/bin/env python3
+# coding: utf-8
+
+import logging
+import argparse
+import os
+
+from interface import read_data
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Convert JSON kline dumps to the binary kline format')
+    parser.add_argument('files', nargs='+', help='JSON kline files (e.g. data/binance_klines_BTCUSDT_1h_1569445200000.json)')
+    args = parser.parse_args()
+
+    log_format = '%(asctime)-15s %(message)s'
+    logging.basicConfig(format=log_format, level=logging.INFO)
+
+    for file_path in args.files:
+        klines = read_data.read_klines_from_json(file_path)
+        binary_file_path = os.path.splitext(file_path)[0] + '.klines'
+        read_data.write_klines_to_binary(binary_file_path, klines)
+        logging.info('Converted {} klines from {} to {}'.format(len(klines), file_path, binary_file_path))
+
+
+if __name__ == '__main__':
+    main()
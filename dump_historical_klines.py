@@ -5,7 +5,6 @@ import logging
 import argparse
 
 from interface.binance_io import BinanceInterface
-from model import Kline
 
 
 def main():
@@ -14,19 +13,26 @@ def main():
     parser.add_argument('-c', '--currency-pair', help='Curreny pair for which to resturn data (e.g. BTCUSDT)', dest='currency_pair')
     parser.add_argument('-i', '--interval', help='Interval of klines (e.g. "2h")')
     parser.add_argument('-d', '--date', help='Start date from which to retrieve kline (e.g. "2 years ago"')
+    parser.add_argument('-j', '--json', help='Dump the whole range to a new JSON file', action='store_true')
+    parser.add_argument('-f', '--file', help='Binary kline file to update, e.g. one written by convert_klines.py')
     args = parser.parse_args()
 
     log_format = '%(asctime)-15s %(message)s'
     logging.basicConfig(format=log_format, level=logging.DEBUG)
     
-    if not args.date:
+    if args.json and args.file:
+        raise RuntimeError('Cant dump to JSON and update a kline file')
+    elif args.json and not args.date:
         raise RuntimeError('Missing start date')
     elif not args.currency_pair:
         raise RuntimeError('Missing currency pair')
     elif not args.interval:
         raise RuntimeError('Missing interval')
 
-    BinanceInterface().dump_historical_klines(args.interval, args.currency_pair, args.date, 'now')
+    if args.json:
+        BinanceInterface().dump_historical_klines(args.interval, args.currency_pair, args.date, 'now')
+    else:
+        BinanceInterface().update_historical_klines(args.interval, args.currency_pair, args.date, args.file)
 
 
 if __name__ == '__main__':
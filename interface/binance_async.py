@@ -0,0 +1,146 @@
+import logging
+import time
+
+from binance import AsyncClient
+
+from interface import instrumentation
+from interface.binance_io import BinanceInterface, merge_trades, read_binance_keys
+from interface.order_tracker import OrderTracker
+from interface.rate_limiter import RequestScheduler
+from model import KlineSeries, Trade
+
+
+class AsyncBinanceInterface:
+    """Coroutine counterpart of BinanceInterface
+
+    A single instance can be shared by every profile of a process: the
+    underlying AsyncClient keeps one pooled HTTP session.
+    """
+
+    BINANCE_KEY_FILE = BinanceInterface.BINANCE_KEY_FILE
+    TRADE_PAGE_SIZE = BinanceInterface.TRADE_PAGE_SIZE
+
+    def __init__(self, client, scheduler=None, trade_store=None):
+        self.client = client
+        self.scheduler = scheduler or RequestScheduler.shared()
+        self.order_tracker = OrderTracker(client, scheduler=self.scheduler)
+        self.trade_store = trade_store
+
+    @classmethod
+    async def create(cls, trade_store=None):
+        return cls(
+            await AsyncClient.create(*read_binance_keys(cls.BINANCE_KEY_FILE)),
+            trade_store=trade_store,
+        )
+
+    async def close(self):
+        await self.order_tracker.stop()
+        await self.client.close_connection()
+
+    async def call(self, priority, method, **kwargs):
+        with instrumentation.metrics.timer("binance_request_seconds", method=method):
+            try:
+                return await self.scheduler.call_async(
+                    self.client, priority, method, **kwargs
+                )
+            except Exception:
+                instrumentation.metrics.increment(
+                    "binance_request_errors_total", method=method
+                )
+                raise
+
+    async def get_klines(self, limit, interval, symbol, start_time=None, end_time=None):
+        klines = None
+        try:
+            klines = await self.call(
+                RequestScheduler.PRIORITY_MARKET,
+                "get_klines",
+                symbol=symbol,
+                interval=interval,
+                limit=limit,
+                startTime=start_time,
+                endTime=end_time,
+            )
+        except Exception as e:
+            logging.error("Error retrieving klines: {}".format(e))
+        if not klines:
+            logging.error("Kline data invalid")
+            return None
+        return KlineSeries.from_data(klines)
+
+    async def last_price(self, symbol):
+        try:
+            ticker = await self.call(
+                RequestScheduler.PRIORITY_MARKET, "get_ticker", symbol=symbol
+            )
+        except Exception:
+            logging.error("Error retrieving last price")
+            return None
+        if not ticker or "lastPrice" not in ticker:
+            logging.error("Price data invalid")
+            return None
+        return float(ticker["lastPrice"])
+
+    async def server_time_diff(self, nb_samples=5):
+        """Server time minus local time, in ms, as BinanceInterface.server_time_diff"""
+        best_round_trip = None
+        diff = 0
+        for _ in range(nb_samples):
+            local_time1 = time.time() * 1000
+            server_time = await self.call(
+                RequestScheduler.PRIORITY_MARKET, "get_server_time"
+            )
+            local_time2 = time.time() * 1000
+            round_trip = local_time2 - local_time1
+            if best_round_trip is None or round_trip < best_round_trip:
+                best_round_trip = round_trip
+                diff = server_time["serverTime"] - (local_time1 + local_time2) / 2
+        logging.info(
+            "Server time diff: {:.0f} ms; round trip: {:.0f} ms".format(
+                diff, best_round_trip
+            )
+        )
+        return diff
+
+    async def create_order(self, is_buy, quantity, symbol):
+        return await self.order_tracker.submit(is_buy, quantity, symbol)
+
+    def submit_order(self, is_buy, quantity, symbol, callback=None):
+        """Send a market order without waiting; see OrderTracker.submit"""
+        return self.order_tracker.submit(is_buy, quantity, symbol, callback)
+
+    async def start_user_stream(self):
+        await self.order_tracker.start()
+
+    async def sync_trades(self, symbol):
+        """Download the fills newer than the last one in the trade store"""
+        last_id = self.trade_store.last_id(symbol)
+        from_id = last_id + 1 if last_id is not None else 0
+        while True:
+            trade_data = await self.call(
+                RequestScheduler.PRIORITY_ANALYTICS,
+                "get_my_trades",
+                symbol=symbol,
+                fromId=from_id,
+                limit=self.TRADE_PAGE_SIZE,
+            )
+            self.trade_store.add(symbol, trade_data)
+            if len(trade_data) < self.TRADE_PAGE_SIZE:
+                return
+            from_id = trade_data[-1]["id"] + 1
+
+    async def my_trade_history(self, symbol):
+        if self.trade_store:
+            await self.sync_trades(symbol)
+            return merge_trades(self.trade_store.trades(symbol))
+        trade_data = await self.call(
+            RequestScheduler.PRIORITY_ANALYTICS, "get_my_trades", symbol=symbol
+        )
+        return merge_trades([Trade(trade) for trade in trade_data])
+
+    async def last_trade(self, symbol):
+        if self.trade_store:
+            await self.sync_trades(symbol)
+            return self.trade_store.last_trade(symbol)
+        trades = await self.my_trade_history(symbol)
+        return trades[-1] if trades else None
@@ -4,25 +4,111 @@ import time
 import datetime
 
 from binance.client import Client
-from model import Kline, Trade
+from interface import http_session, instrumentation, read_data
+from interface.rate_limiter import RequestScheduler
+from model import KlineSeries, Trade
+
+
+def read_binance_keys(key_file):
+    with open(key_file, newline="\n") as file:
+        api_key = next(file).rstrip("\n")
+        secret_key = next(file).rstrip("\n")
+    return api_key, secret_key
+
+
+def merge_trades(trades):
+    """Merge consecutive fills on the same side less than a minute apart"""
+    merged_trades = []
+    previous_trade_time = None
+    previous_trade_is_buy = None
+    for trade in trades:
+        if (
+            previous_trade_time
+            and abs(trade.time - previous_trade_time) < 60.0
+            and trade.is_buy == previous_trade_is_buy
+        ):
+            merged_trades[-1].quantity += trade.quantity
+        else:
+            merged_trades.append(trade)
+        previous_trade_time = trade.time
+        previous_trade_is_buy = trade.is_buy
+    return merged_trades
+
+
+def is_filled(order):
+    return bool(order) and order.get("status") == Client.ORDER_STATUS_FILLED
+
+
+def order_with_fills(order):
+    """Add an average fill to orders from get_order, which come without fills"""
+    if order and "fills" not in order and float(order.get("executedQty", 0)) > 0:
+        order["fills"] = [
+            {
+                "price": str(
+                    float(order["cummulativeQuoteQty"]) / float(order["executedQty"])
+                ),
+                "qty": order["executedQty"],
+            }
+        ]
+    return order
 
 
 class BinanceInterface:
 
     TIMEOUT = 20
+    ORDER_POLL_DELAY = 0.25
+    ORDER_POLL_MAX_DELAY = 4
     BINANCE_KEY_FILE = ".binance"
+    KLINE_FILE = "data/binance_klines_{}_{}.klines"
+    KLINE_PAGE_SIZE = 1000
+    TRADE_PAGE_SIZE = 1000
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, scheduler=None, trade_store=None):
         if client:
             self.client = client
         else:
-            with open(self.BINANCE_KEY_FILE, newline="\n") as file:
-                api_key = next(file).rstrip("\n")
-                secret_key = next(file).rstrip("\n")
-            self.client = Client(api_key, secret_key)
+            self.client = http_session.use_pooled_session(
+                Client(
+                    *read_binance_keys(self.BINANCE_KEY_FILE),
+                    requests_params={"timeout": http_session.TIMEOUT},
+                )
+            )
+        self.scheduler = scheduler or RequestScheduler.shared()
+        self.trade_store = trade_store
+
+    def call(self, priority, method, **kwargs):
+        """Call a client method once the scheduler allows its weight"""
+        with instrumentation.metrics.timer("binance_request_seconds", method=method):
+            try:
+                return self.scheduler.call(self.client, priority, method, **kwargs)
+            except Exception:
+                instrumentation.metrics.increment(
+                    "binance_request_errors_total", method=method
+                )
+                raise
+
+    def paced_pages(self, klines_data):
+        """Acquire the weight of each page of a historical kline generator before it is fetched"""
+        klines_data = iter(klines_data)
+        weight = self.scheduler.weight("get_historical_klines_generator")
+        nb_klines = 0
+        while True:
+            if nb_klines % self.KLINE_PAGE_SIZE == 0:
+                self.scheduler.acquire(weight, RequestScheduler.PRIORITY_ANALYTICS)
+            try:
+                kline_data = next(klines_data)
+            except StopIteration:
+                return
+            nb_klines += 1
+            yield kline_data
 
     def get_history(self, limit, symbol):
-        trades = self.client.get_recent_trades(symbol=symbol, limit=limit)
+        trades = self.call(
+            RequestScheduler.PRIORITY_ANALYTICS,
+            "get_recent_trades",
+            symbol=symbol,
+            limit=limit,
+        )
         t = [int(trade["time"]) for trade in trades]
         x = [float(trade["price"]) for trade in trades]
         return t, x
@@ -30,7 +116,9 @@ class BinanceInterface:
     def get_klines(self, limit, interval, symbol, start_time=None, end_time=None):
         klines = None
         try:
-            klines = self.client.get_klines(
+            klines = self.call(
+                RequestScheduler.PRIORITY_MARKET,
+                "get_klines",
                 symbol=symbol,
                 interval=interval,
                 limit=limit,
@@ -42,15 +130,17 @@ class BinanceInterface:
         if not klines:
             logging.error("Kline data invalid")
             return None
-        return [Kline(kline_data) for kline_data in klines]
+        return KlineSeries.from_data(klines)
 
     def dump_historical_klines(self, interval, symbol, start_time, end_time):
         klines = list(
-            self.client.get_historical_klines_generator(
-                symbol=symbol,
-                interval=interval,
-                start_str=start_time,
-                end_str=end_time,
+            self.paced_pages(
+                self.client.get_historical_klines_generator(
+                    symbol=symbol,
+                    interval=interval,
+                    start_str=start_time,
+                    end_str=end_time,
+                )
             )
         )
         logging.info("Number of klines: {}".format(len(klines)))
@@ -61,9 +151,49 @@ class BinanceInterface:
         with open(file_name, mode="w") as file:
             json.dump(klines, file)
 
+    def update_historical_klines(self, interval, symbol, start_time, file_name=None):
+        """Append klines closed since the last one stored to the binary kline file
+
+        Pages are persisted as they arrive, so an interrupted download resumes
+        from the last complete page. start_time is only used for a new file.
+        The file defaults to KLINE_FILE for the symbol and interval.
+        """
+        file_name = file_name or self.KLINE_FILE.format(symbol, interval)
+        with read_data.open_binary_klines_for_append(file_name) as file:
+            stored_klines = read_data.read_klines_from_binary(file_name)
+            if len(stored_klines):
+                start_time = int(stored_klines.close_time[-1]) + 1
+            elif not start_time:
+                raise ValueError("Missing start time for new kline file")
+            now = int(time.time() * 1000)
+            nb_klines = 0
+            page = []
+            for kline_data in self.paced_pages(
+                self.client.get_historical_klines_generator(
+                    symbol=symbol,
+                    interval=interval,
+                    start_str=start_time,
+                )
+            ):
+                # The last kline is still open and will be fetched on next update
+                if kline_data[6] >= now:
+                    break
+                page.append(kline_data)
+                if len(page) == self.KLINE_PAGE_SIZE:
+                    read_data.append_klines_to_binary(file, KlineSeries.from_data(page))
+                    nb_klines += len(page)
+                    page = []
+            if page:
+                read_data.append_klines_to_binary(file, KlineSeries.from_data(page))
+                nb_klines += len(page)
+        logging.info("Number of new klines: {}".format(nb_klines))
+        return file_name
+
     def last_price(self, symbol):
         try:
-            ticker = self.client.get_ticker(symbol=symbol)
+            ticker = self.call(
+                RequestScheduler.PRIORITY_MARKET, "get_ticker", symbol=symbol
+            )
         except:
             logging.error("Error retrieving last price")
             return None
@@ -73,7 +203,9 @@ class BinanceInterface:
         return float(ticker["lastPrice"])
 
     def create_order(self, is_buy, quantity, symbol):
-        order = self.client.create_order(
+        order = self.call(
+            RequestScheduler.PRIORITY_ORDER,
+            "create_order",
             symbol=symbol,
             side=Client.SIDE_BUY if is_buy else Client.SIDE_SELL,
             type=Client.ORDER_TYPE_MARKET,
@@ -83,51 +215,76 @@ class BinanceInterface:
         if not order or "orderId" not in order:
             raise ValueError("No order ID in returned order")
         order_id = order["orderId"]
-        for _ in range(0, self.TIMEOUT):
-            if (
-                not order
-                or "status" not in order
-                or order["status"] != Client.ORDER_STATUS_FILLED
-            ):
-                logging.info("Awaiting order filling...")
-                time.sleep(1)
-                order = self.client.get_order(symbol=symbol, orderId=order_id)
-                logging.info("Waiting on order: {}".format(order))
-        return order
-
-    def server_time_diff(self):
-        for _ in range(1, 10):
-            local_time1 = int(time.time() * 1000)
-            server_time = self.client.get_server_time()
-            diff1 = server_time["serverTime"] - local_time1
-            local_time2 = int(time.time() * 1000)
-            diff2 = local_time2 - server_time["serverTime"]
-            print(
-                "local1: %s server:%s local2: %s diff1:%s diff2:%s"
-                % (local_time1, server_time["serverTime"], local_time2, diff1, diff2)
+        # Poll with exponential backoff for at most TIMEOUT seconds
+        delay = self.ORDER_POLL_DELAY
+        deadline = time.time() + self.TIMEOUT
+        while not is_filled(order) and time.time() < deadline:
+            logging.info("Awaiting order filling...")
+            time.sleep(delay)
+            delay = min(2 * delay, self.ORDER_POLL_MAX_DELAY)
+            order = self.call(
+                RequestScheduler.PRIORITY_ORDER,
+                "get_order",
+                symbol=symbol,
+                orderId=order_id,
+            )
+            logging.info("Waiting on order: {}".format(order))
+        return order_with_fills(order)
+
+    def server_time_diff(self, nb_samples=5):
+        """Server time minus local time, in ms
+
+        Taken from the sample with the shortest round trip, assuming the
+        server time is read halfway through the request.
+        """
+        best_round_trip = None
+        diff = 0
+        for _ in range(nb_samples):
+            local_time1 = time.time() * 1000
+            server_time = self.call(
+                RequestScheduler.PRIORITY_MARKET, "get_server_time"
             )
-            time.sleep(2)
+            local_time2 = time.time() * 1000
+            round_trip = local_time2 - local_time1
+            if best_round_trip is None or round_trip < best_round_trip:
+                best_round_trip = round_trip
+                diff = server_time["serverTime"] - (local_time1 + local_time2) / 2
+        logging.info(
+            "Server time diff: {:.0f} ms; round trip: {:.0f} ms".format(
+                diff, best_round_trip
+            )
+        )
+        return diff
+
+    def sync_trades(self, symbol):
+        """Download the fills newer than the last one in the trade store"""
+        last_id = self.trade_store.last_id(symbol)
+        from_id = last_id + 1 if last_id is not None else 0
+        while True:
+            trade_data = self.call(
+                RequestScheduler.PRIORITY_ANALYTICS,
+                "get_my_trades",
+                symbol=symbol,
+                fromId=from_id,
+                limit=self.TRADE_PAGE_SIZE,
+            )
+            self.trade_store.add(symbol, trade_data)
+            if len(trade_data) < self.TRADE_PAGE_SIZE:
+                return
+            from_id = trade_data[-1]["id"] + 1
 
     def my_trade_history(self, symbol):
-        trade_data = self.client.get_my_trades(symbol=symbol)
-        trades = [Trade(trade) for trade in trade_data]
-        merged_trades = []
-        previous_trade_time = None
-        previous_trade_is_buy = None
-        for trade in trades:
-            if (
-                previous_trade_time
-                and abs(trade.time - previous_trade_time) < 60.0
-                and trade.is_buy == previous_trade_is_buy
-            ):
-                merged_trades[-1].quantity += trade.quantity
-            else:
-                merged_trades.append(trade)
-            previous_trade_time = trade.time
-            previous_trade_is_buy = trade.is_buy
-        return merged_trades
+        if self.trade_store:
+            self.sync_trades(symbol)
+            return merge_trades(self.trade_store.trades(symbol))
+        trade_data = self.call(
+            RequestScheduler.PRIORITY_ANALYTICS, "get_my_trades", symbol=symbol
+        )
+        return merge_trades([Trade(trade) for trade in trade_data])
 
     def last_trade(self, symbol):
-        if not self.my_trade_history(symbol):
-            return None
-        return self.my_trade_history(symbol)[-1]
+        if self.trade_store:
+            self.sync_trades(symbol)
+            return self.trade_store.last_trade(symbol)
+        trades = self.my_trade_history(symbol)
+        return trades[-1] if trades else None
@@ -0,0 +1,53 @@
+import logging
+import time
+
+INTERVAL_UNITS_MS = {
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000,
+    "w": 7 * 24 * 60 * 60 * 1000,
+}
+# Epoch is a Thursday, while weekly klines open on Monday
+WEEK_OFFSET_MS = 4 * INTERVAL_UNITS_MS["d"]
+
+
+def interval_ms(interval):
+    """Duration of a Binance kline interval such as '1m', '4h' or '1w', in ms"""
+    unit = interval[-1:]
+    if unit not in INTERVAL_UNITS_MS or not interval[:-1].isdigit():
+        raise ValueError("Unsupported kline interval: {}".format(interval))
+    return int(interval[:-1]) * INTERVAL_UNITS_MS[unit]
+
+
+def next_open_time(server_time, interval):
+    """Open time of the first kline opening strictly after server_time, in ms"""
+    step = interval_ms(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith("w") else 0
+    return ((int(server_time) - offset) // step + 1) * step + offset
+
+
+class CandleClock:
+    """Sleeps until the next kline boundary of the server clock
+
+    The guard delay after the boundary leaves time for the exchange to close
+    the kline before it is requested.
+    """
+
+    GUARD = 0.5
+
+    def __init__(self, interval, time_offset=0.0, guard=GUARD):
+        self.interval = interval
+        self.time_offset = time_offset
+        self.guard = guard
+
+    def server_time(self):
+        return time.time() * 1000 + self.time_offset
+
+    def wait_for_close(self):
+        """Sleep until a kline closes; the open time of the kline that follows it"""
+        server_time = self.server_time()
+        boundary = next_open_time(server_time, self.interval)
+        delay = (boundary - server_time) / 1000 + self.guard
+        logging.debug("Sleeping {:.1f} s until next kline close".format(delay))
+        time.sleep(delay)
+        return boundary
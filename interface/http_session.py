@@ -0,0 +1,89 @@
+import asyncio
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 10
+# Connect and read timeouts, in seconds
+TIMEOUT = (3.05, 10)
+KEEPALIVE_IDLE = 60
+KEEPALIVE_INTERVAL = 15
+KEEPALIVE_COUNT = 4
+CONNECT_RETRIES = 2
+
+
+def keepalive_socket_options(
+    idle=KEEPALIVE_IDLE, interval=KEEPALIVE_INTERVAL, count=KEEPALIVE_COUNT
+):
+    options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    # Probe settings are not available on every platform
+    for name, value in [
+        ("TCP_KEEPIDLE", idle),
+        ("TCP_KEEPINTVL", interval),
+        ("TCP_KEEPCNT", count),
+    ]:
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections are kept open with TCP keep-alive
+
+    Reusing a pooled connection skips the DNS lookup, TCP connect and TLS
+    handshake of a new request.
+    """
+
+    def __init__(self, socket_options, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def pooled_session(pool_size=POOL_SIZE, keepalive_idle=KEEPALIVE_IDLE):
+    session = requests.Session()
+    adapter = KeepAliveAdapter(
+        keepalive_socket_options(idle=keepalive_idle),
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        # Only retry connection failures: a request may not be sent twice
+        max_retries=Retry(
+            total=CONNECT_RETRIES,
+            connect=CONNECT_RETRIES,
+            read=0,
+            status=0,
+            backoff_factor=0.2,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def use_pooled_session(client, session=None):
+    """Make a binance Client send its requests through a pooled session"""
+    session = session or pooled_session()
+    session.headers.update(client.session.headers)
+    client.session.close()
+    client.session = session
+    return client
+
+
+async def gather_calls(*calls):
+    """Run blocking (function, *args) calls concurrently; results are in call order"""
+    return await asyncio.gather(
+        *(asyncio.to_thread(function, *args) for function, *args in calls)
+    )
+
+
+def run_concurrently(*calls):
+    """gather_calls for callers outside of an event loop"""
+    return asyncio.run(gather_calls(*calls))
@@ -0,0 +1,204 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(key, value) for key, value in pairs) + "}"
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        return {
+            "buckets": dict(zip(map(str, self.buckets + ("+Inf",)), self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class Timer:
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.begin_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe_key(self.key, time.perf_counter() - self.begin_time)
+        return False
+
+
+class Metrics:
+    """In-memory timing histograms and counters, keyed by name and labels"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def timer(self, name, **labels):
+        """Context manager recording its duration in the name histogram"""
+        return Timer(self, (name, tuple(sorted(labels.items()))))
+
+    def observe(self, name, value, **labels):
+        self.observe_key((name, tuple(sorted(labels.items()))), value)
+
+    def observe_key(self, key, value):
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(self.buckets)
+            self.histograms[key].observe(value)
+
+    def increment(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            names = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in names:
+                    lines.append("# TYPE {} histogram".format(name))
+                    names.add(name)
+                cumulated = 0
+                for bound, count in zip(self.buckets + ("+Inf",), histogram.counts):
+                    cumulated += count
+                    lines.append(
+                        "{}_bucket{} {}".format(
+                            name, format_labels(labels, [("le", bound)]), cumulated
+                        )
+                    )
+                lines.append(
+                    "{}_sum{} {}".format(name, format_labels(labels), histogram.sum)
+                )
+                lines.append(
+                    "{}_count{} {}".format(name, format_labels(labels), histogram.count)
+                )
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in names:
+                    lines.append("# TYPE {} counter".format(name))
+                    names.add(name)
+                lines.append("{}{} {}".format(name, format_labels(labels), value))
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }
+
+    def dump(self, file_path):
+        """Write the metrics as JSON, replacing the previous dump atomically"""
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(tmp_path, file_path)
+
+    def start_dump(self, file_path, period):
+        """Dump the metrics every period seconds from a daemon thread"""
+
+        def dump_loop():
+            while True:
+                time.sleep(period)
+                self.dump(file_path)
+
+        threading.Thread(target=dump_loop, daemon=True).start()
+
+    def serve(self, port, host=""):
+        """Serve the Prometheus text on http://host:port/metrics from a daemon thread"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class NullTimer:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullMetrics:
+    """Metrics doing nothing, in place while instrumentation is disabled"""
+
+    NULL_TIMER = NullTimer()
+
+    def timer(self, name, **labels):
+        return self.NULL_TIMER
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def increment(self, name, value=1, **labels):
+        pass
+
+
+# Looked up at each call, so instrumented code follows enable()
+metrics = NullMetrics()
+
+
+def enable(buckets=BUCKETS):
+    global metrics
+    if not isinstance(metrics, Metrics):
+        metrics = Metrics(buckets)
+    return metrics
+
+
+def disable():
+    global metrics
+    metrics = NullMetrics()
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from model import KlineSeries
+
+
+class KlineCache:
+    """Klines shared between callers, per (symbol, interval)
+
+    Closed klines are kept, so a refresh only requests klines from the last
+    closed one onwards: that kline again, in case it was stored before the
+    exchange finalized it, the still-open kline and any kline closed since.
+    Klines are classified as closed against the server clock, time_offset
+    being the server time minus the local time in ms. Requests for the same
+    key are coalesced: callers waiting on a refresh get its result instead
+    of issuing their own request.
+
+    fetch has the signature of BinanceInterface.get_klines.
+    """
+
+    MAX_SIZE = 1000
+    MAX_AGE = 5.
+    TAIL_LIMIT = 1000
+
+    def __init__(self, fetch, max_age=MAX_AGE, max_size=MAX_SIZE, time_offset=0.0):
+        self.fetch = fetch
+        self.max_age = max_age
+        self.max_size = max_size
+        self.time_offset = time_offset
+        self.closed_klines = defaultdict(list)
+        self.open_klines = {}
+        self.fetch_times = {}
+        self.locks = defaultdict(threading.Lock)
+
+    def get_klines(self, limit, interval, symbol, closed_only=False):
+        """The limit last klines, the still-open one last, as BinanceInterface.get_klines
+
+        With closed_only, the limit last closed klines are returned instead.
+        None if the klines are stale and could not be refreshed.
+        """
+        key = (symbol, interval)
+        # One more kline is needed when the open one is left out
+        fetch_limit = limit + 1 if closed_only else limit
+        with self.locks[key]:
+            if self.is_stale(key, fetch_limit) and not self.refresh(key, fetch_limit):
+                return None
+            return self.window(key, limit, closed_only)
+
+    def refresh(self, key, limit):
+        """Fetch the klines missing from the cache; False if the fetch failed"""
+        request = self.fetch_request(key, limit)
+        klines = self.fetch(**request)
+        if klines and not self.merge(key, klines, request):
+            request = self.fetch_request(key, limit)
+            klines = self.fetch(**request)
+            if klines:
+                self.merge(key, klines, request)
+        return bool(klines)
+
+    def server_time(self):
+        return int(time.time() * 1000 + self.time_offset)
+
+    def is_stale(self, key, limit):
+        fetch_time = self.fetch_times.get(key)
+        return (
+            fetch_time is None
+            or time.time() - fetch_time > self.max_age
+            or len(self.closed_klines[key]) < limit - 1
+        )
+
+    def fetch_request(self, key, limit):
+        symbol, interval = key
+        closed_klines = self.closed_klines[key]
+        if len(closed_klines) >= limit - 1:
+            return {
+                "limit": self.TAIL_LIMIT,
+                "interval": interval,
+                "symbol": symbol,
+                "start_time": closed_klines[-1].open_time,
+            }
+        return {"limit": limit, "interval": interval, "symbol": symbol}
+
+    def merge(self, key, klines, request):
+        """Store fetched klines; False if too many are missing to catch up from the tail
+
+        Stored klines from the first fetched one onwards are replaced.
+        """
+        if "start_time" in request and len(klines) == request["limit"]:
+            self.closed_klines[key] = []
+            return False
+        if "start_time" not in request:
+            self.closed_klines[key] = []
+        now = self.server_time()
+        closed_klines = self.closed_klines[key]
+        while closed_klines and closed_klines[-1].open_time >= klines[0].open_time:
+            closed_klines.pop()
+        self.open_klines[key] = None
+        for kline in klines:
+            if kline.close_time >= now:
+                self.open_klines[key] = kline
+            elif not closed_klines or kline.open_time > closed_klines[-1].open_time:
+                closed_klines.append(kline)
+        del closed_klines[: -self.max_size]
+        self.fetch_times[key] = time.time()
+        return True
+
+    def window(self, key, limit, closed_only=False):
+        if key not in self.fetch_times:
+            return None
+        open_kline = None if closed_only else self.open_klines.get(key)
+        klines = self.closed_klines[key][-(limit - 1 if open_kline else limit) :]
+        return KlineSeries.from_klines(klines + ([open_kline] if open_kline else []))
+
+
+class AsyncKlineCache(KlineCache):
+    """KlineCache whose fetch is a coroutine, for tasks of the same event loop"""
+
+    def __init__(
+        self,
+        fetch,
+        max_age=KlineCache.MAX_AGE,
+        max_size=KlineCache.MAX_SIZE,
+        time_offset=0.0,
+    ):
+        super().__init__(fetch, max_age, max_size, time_offset)
+        self.pending = {}
+
+    async def get_klines(self, limit, interval, symbol, closed_only=False):
+        key = (symbol, interval)
+        fetch_limit = limit + 1 if closed_only else limit
+        if key in self.pending and not await self.pending[key]:
+            return None
+        if self.is_stale(key, fetch_limit):
+            task = asyncio.ensure_future(self.refresh(key, fetch_limit))
+            self.pending[key] = task
+            try:
+                if not await task:
+                    return None
+            finally:
+                if self.pending.get(key) is task:
+                    del self.pending[key]
+        return self.window(key, limit, closed_only)
+
+    async def refresh(self, key, limit):
+        request = self.fetch_request(key, limit)
+        klines = await self.fetch(**request)
+        if klines and not self.merge(key, klines, request):
+            request = self.fetch_request(key, limit)
+            klines = await self.fetch(**request)
+            if klines:
+                self.merge(key, klines, request)
+        return bool(klines)
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import websockets
+
+from model import Kline
+
+
+class KlineStream:
+    """Rolling window of closed klines, kept up to date by the Binance kline stream
+
+    The window is filled once over REST, then each closed kline received on
+    the websocket is appended. A missing kline, e.g. after a reconnection,
+    triggers a new REST backfill. Backfilled klines are classified as closed
+    against the server clock, time_offset being the server time minus the
+    local time in ms.
+    """
+
+    STREAM_URL = "wss://stream.binance.com:9443/ws/{}@kline_{}"
+    RECONNECT_DELAY = 5
+
+    def __init__(self, binance, symbol, interval, size, url=None, time_offset=0.0):
+        self.binance = binance
+        self.symbol = symbol
+        self.interval = interval
+        self.window = deque(maxlen=size)
+        self.url = url or self.STREAM_URL.format(symbol.lower(), interval)
+        self.time_offset = time_offset
+
+    def backfill(self):
+        klines = self.binance.get_klines(
+            limit=self.window.maxlen + 1, interval=self.interval, symbol=self.symbol
+        )
+        if not klines:
+            raise ValueError("Could not retrieve klines to fill the window")
+        now = int(time.time() * 1000 + self.time_offset)
+        self.window.clear()
+        self.window.extend(kline for kline in klines if kline.close_time < now)
+
+    async def apply(self, message):
+        """Add the kline of a stream message to the window; True if it is a newly closed kline"""
+        kline_data = json.loads(message).get("k")
+        if not kline_data or not kline_data["x"]:
+            return False
+        kline = Kline(
+            [
+                kline_data["t"],
+                kline_data["o"],
+                kline_data["h"],
+                kline_data["l"],
+                kline_data["c"],
+                kline_data["v"],
+                kline_data["T"],
+                kline_data["q"],
+                kline_data["n"],
+            ]
+        )
+        if self.window and kline.open_time <= self.window[-1].open_time:
+            return False
+        if self.window and kline.open_time != self.window[-1].close_time + 1:
+            logging.warning("Missing klines before {}, backfilling".format(kline.open_time))
+            await asyncio.to_thread(self.backfill)
+            return True
+        self.window.append(kline)
+        return True
+
+    def klines(self):
+        return list(self.window)
+
+    async def run(self, on_close):
+        """Call the on_close coroutine with the window each time a kline closes"""
+        while True:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    # Backfill once subscribed, so no kline is missed in between
+                    await asyncio.to_thread(self.backfill)
+                    async for message in websocket:
+                        if await self.apply(message):
+                            await on_close(self.klines())
+            except (websockets.WebSocketException, OSError, ValueError) as e:
+                # Backfill errors included, as the REST call may succeed on reconnection
+                logging.error("Kline stream interrupted: {}".format(e))
+            await asyncio.sleep(self.RECONNECT_DELAY)
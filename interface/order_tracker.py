@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+
+import websockets
+from binance.client import Client
+
+from interface.binance_io import is_filled, order_with_fills
+from interface.rate_limiter import RequestScheduler
+
+
+class OrderTracker:
+    """Market orders whose fill is awaited without blocking the event loop
+
+    Fills are reported by executionReport events of the user data stream,
+    once start() has been called. Each pending order is also polled over REST
+    with exponential backoff, in case the stream misses the event. The listen
+    key of the stream is requested again on each reconnection, which renews
+    it or replaces it once expired. After
+    TIMEOUT seconds, the order is checked a last time and returned as it is,
+    like BinanceInterface.create_order does.
+    """
+
+    USER_STREAM_URL = "wss://stream.binance.com:9443/ws/{}"
+    KEEPALIVE_PERIOD = 30 * 60
+    RECONNECT_DELAY = 5
+    TIMEOUT = 60
+    POLL_DELAY = 0.5
+    POLL_MAX_DELAY = 8
+    MAX_UNCLAIMED_FILLS = 100
+
+    def __init__(self, client, url=None, scheduler=None):
+        self.client = client
+        self.url = url
+        self.scheduler = scheduler or RequestScheduler.shared()
+        self.waiters = {}
+        # Fills received before their order was registered
+        self.unclaimed_fills = OrderedDict()
+        self.tasks = []
+        self.listen_key = None
+
+    async def start(self):
+        if not self.url:
+            await self.renew_listen_key()
+            self.tasks.append(asyncio.create_task(self.keep_alive()))
+        self.tasks.append(asyncio.create_task(self.listen()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    async def renew_listen_key(self):
+        self.listen_key = await self.call("stream_get_listen_key")
+        self.url = self.USER_STREAM_URL.format(self.listen_key)
+
+    async def keep_alive(self):
+        while True:
+            await asyncio.sleep(self.KEEPALIVE_PERIOD)
+            try:
+                await self.call("stream_keepalive", listenKey=self.listen_key)
+            except Exception as e:
+                # The key is requested again when the stream reconnects
+                logging.error("Unable to keep user data stream alive: {}".format(e))
+
+    async def call(self, method, **kwargs):
+        return await self.scheduler.call_async(
+            self.client, RequestScheduler.PRIORITY_ORDER, method, **kwargs
+        )
+
+    async def listen(self):
+        reconnecting = False
+        while True:
+            if reconnecting:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+            if reconnecting and self.listen_key is not None:
+                try:
+                    await self.renew_listen_key()
+                except Exception as e:
+                    logging.error("Unable to get a user data stream listen key: {}".format(e))
+                    continue
+            reconnecting = True
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    async for message in websocket:
+                        self.handle_message(message)
+            except (websockets.WebSocketException, OSError) as e:
+                logging.error("User data stream interrupted: {}".format(e))
+
+    def handle_message(self, message):
+        try:
+            self.handle_event(json.loads(message))
+        except (ValueError, KeyError, AttributeError) as e:
+            logging.error("Ignoring user data stream message {}: {}".format(message, e))
+
+    def handle_event(self, event):
+        if event.get("e") != "executionReport" or event.get("X") != Client.ORDER_STATUS_FILLED:
+            return
+        order = order_with_fills(
+            {
+                "symbol": event["s"],
+                "orderId": event["i"],
+                "status": event["X"],
+                "executedQty": event["z"],
+                "cummulativeQuoteQty": event["Z"],
+            }
+        )
+        self.resolve(order)
+
+    def resolve(self, order):
+        future = self.waiters.get(order["orderId"])
+        if future is None:
+            self.unclaimed_fills[order["orderId"]] = order
+            while len(self.unclaimed_fills) > self.MAX_UNCLAIMED_FILLS:
+                self.unclaimed_fills.popitem(last=False)
+        elif not future.done():
+            future.set_result(order)
+
+    async def poll(self, symbol, order_id):
+        delay = self.POLL_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, self.POLL_MAX_DELAY)
+            try:
+                order = await self.call("get_order", symbol=symbol, orderId=order_id)
+            except Exception as e:
+                logging.error("Error polling order {}: {}".format(order_id, e))
+                continue
+            logging.info("Waiting on order: {}".format(order))
+            if is_filled(order):
+                self.resolve(order_with_fills(order))
+                return
+
+    async def execute(self, is_buy, quantity, symbol):
+        order = await self.call(
+            "create_order",
+            symbol=symbol,
+            side=Client.SIDE_BUY if is_buy else Client.SIDE_SELL,
+            type=Client.ORDER_TYPE_MARKET,
+            quantity=quantity,
+        )
+        logging.info("Order: {}".format(order))
+        if not order or "orderId" not in order:
+            raise ValueError("No order ID in returned order")
+        if is_filled(order):
+            return order
+        order_id = order["orderId"]
+        if order_id in self.unclaimed_fills:
+            return self.unclaimed_fills.pop(order_id)
+
+        logging.info("Awaiting order filling...")
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[order_id] = future
+        poll_task = asyncio.create_task(self.poll(symbol, order_id))
+        try:
+            return await asyncio.wait_for(future, self.TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.error(
+                "Order {} not filled after {} s, checking it once more".format(
+                    order_id, self.TIMEOUT
+                )
+            )
+        finally:
+            poll_task.cancel()
+            del self.waiters[order_id]
+
+        # The order may have filled unnoticed; the caller records what it gets
+        try:
+            order = await self.call("get_order", symbol=symbol, orderId=order_id)
+        except Exception as e:
+            logging.error("Error polling order {}: {}".format(order_id, e))
+        logging.info("Order after timeout: {}".format(order))
+        return order_with_fills(order)
+
+    def submit(self, is_buy, quantity, symbol, callback=None):
+        """Send a market order; the returned future resolves to the filled order"""
+        future = asyncio.ensure_future(self.execute(is_buy, quantity, symbol))
+        if callback:
+            future.add_done_callback(callback)
+        return future
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Mapping
+
+from binance.exceptions import BinanceAPIException
+
+
+class RequestScheduler:
+    """Paces Binance requests on the request weight budget of the account
+
+    Weight is refilled continuously as a token bucket and corrected with the
+    weight the server reports as used. Waiting requests are served in
+    priority order, and lower priorities may not use the last part of the
+    budget, which stays available for orders.
+    """
+
+    WEIGHT_LIMIT = 6000
+    SAFETY_FACTOR = 0.8
+    USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+    DEFAULT_RETRY_AFTER = 60
+    RATE_LIMIT_STATUS_CODES = (418, 429)
+
+    PRIORITY_ORDER = 0
+    PRIORITY_MARKET = 1
+    PRIORITY_ANALYTICS = 2
+    # Share of the budget a request of each priority may use
+    PRIORITY_SHARES = {PRIORITY_ORDER: 1., PRIORITY_MARKET: .85, PRIORITY_ANALYTICS: .6}
+
+    ENDPOINT_WEIGHTS = {
+        "create_order": 1,
+        "get_order": 4,
+        "get_klines": 2,
+        "get_historical_klines_generator": 2,
+        "get_ticker": 2,
+        "get_server_time": 1,
+        "get_recent_trades": 25,
+        "get_my_trades": 20,
+        "stream_get_listen_key": 2,
+        "stream_keepalive": 2,
+    }
+
+    _shared = None
+
+    def __init__(self, weight_limit=WEIGHT_LIMIT, clock=time.monotonic):
+        self.capacity = weight_limit * self.SAFETY_FACTOR
+        self.rate = self.capacity / 60
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.blocked_until = 0.
+        self.waiting = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def weight(self, method):
+        return self.ENDPOINT_WEIGHTS.get(method, 1)
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def try_acquire(self, entry, weight, priority):
+        """Take the weight if the request is first in line; otherwise the time to wait"""
+        now = self.refill()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.waiting[0] != entry:
+            return 1. / self.rate
+        reserve = self.capacity * (1. - self.PRIORITY_SHARES[priority])
+        missing = weight + reserve - self.tokens
+        if missing > 0:
+            return missing / self.rate
+        self.tokens -= weight
+        heapq.heappop(self.waiting)
+        return 0.
+
+    def enqueue(self, priority):
+        entry = (priority, next(self.counter))
+        heapq.heappush(self.waiting, entry)
+        return entry
+
+    def dequeue(self, entry):
+        if entry in self.waiting:
+            self.waiting.remove(entry)
+            heapq.heapify(self.waiting)
+
+    def acquire(self, weight, priority):
+        with self.condition:
+            entry = self.enqueue(priority)
+            try:
+                while True:
+                    wait = self.try_acquire(entry, weight, priority)
+                    if not wait:
+                        return
+                    self.condition.wait(wait)
+            finally:
+                self.dequeue(entry)
+                self.condition.notify_all()
+
+    async def acquire_async(self, weight, priority):
+        with self.condition:
+            entry = self.enqueue(priority)
+        try:
+            while True:
+                with self.condition:
+                    wait = self.try_acquire(entry, weight, priority)
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            with self.condition:
+                self.dequeue(entry)
+                self.condition.notify_all()
+
+    def update_used_weight(self, response):
+        """Align the bucket on the weight used according to the server"""
+        headers = getattr(response, "headers", None)
+        if not isinstance(headers, Mapping) or self.USED_WEIGHT_HEADER not in headers:
+            return
+        used_weight = int(headers[self.USED_WEIGHT_HEADER])
+        with self.condition:
+            self.refill()
+            self.tokens = min(self.tokens, self.capacity - used_weight)
+
+    def rate_limited(self, exception):
+        """Stop every request after a 429 or 418 response, for as long as the server asks"""
+        headers = getattr(getattr(exception, "response", None), "headers", None)
+        if isinstance(headers, Mapping) and "Retry-After" in headers:
+            retry_after = int(headers["Retry-After"])
+        else:
+            retry_after = self.DEFAULT_RETRY_AFTER
+        logging.error("Rate limited by Binance, pausing requests for {} s".format(retry_after))
+        with self.condition:
+            self.blocked_until = self.clock() + retry_after
+            self.tokens = 0.
+
+    def call(self, client, priority, method, **kwargs):
+        """Call a client method once its weight is available"""
+        self.acquire(self.weight(method), priority)
+        try:
+            result = getattr(client, method)(**kwargs)
+        except BinanceAPIException as e:
+            if e.status_code in self.RATE_LIMIT_STATUS_CODES:
+                self.rate_limited(e)
+            raise
+        self.update_used_weight(getattr(client, "response", None))
+        return result
+
+    async def call_async(self, client, priority, method, **kwargs):
+        """Coroutine counterpart of call, for an AsyncClient"""
+        await self.acquire_async(self.weight(method), priority)
+        try:
+            result = await getattr(client, method)(**kwargs)
+        except BinanceAPIException as e:
+            if e.status_code in self.RATE_LIMIT_STATUS_CODES:
+                self.rate_limited(e)
+            raise
+        self.update_used_weight(getattr(client, "response", None))
+        return result
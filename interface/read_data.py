@@ -1,7 +1,21 @@
 import csv
 import json
+import os
 
-from model import Kline
+import numpy as np
+
+from model import Kline, KlineSeries, as_series
+
+# Binary kline files: a header followed by one fixed-capacity block per
+# field, so each column can be memory-mapped as a contiguous array. The
+# header holds the number of klines written, updated once their values are
+# on disk, and the capacity of the blocks, doubled by rewriting the file.
+KLINE_FILE_HEADER = b'CBKLINE2'
+KLINE_FILE_COUNTS_DTYPE = np.dtype('<u8')
+KLINE_FILE_COUNTS_SIZE = 2 * KLINE_FILE_COUNTS_DTYPE.itemsize
+KLINE_FILE_DATA_OFFSET = len(KLINE_FILE_HEADER) + KLINE_FILE_COUNTS_SIZE
+KLINE_COLUMN_DTYPES = [np.dtype(dtype).newbyteorder('<') for dtype in KlineSeries.KLINE_DTYPES]
+KLINE_FILE_MIN_CAPACITY = 1024
 
 
 def read_from_csv(file_path, n=None):
@@ -38,8 +52,111 @@ def read_prices_from_json(file_path):
 
 def read_klines_from_json(file_path):
     with open(file_path, newline='') as file:
-        data = json.load(file)
-        klines = []
-        for kline_data in data:
-            klines.append(Kline(kline_data))
-        return klines
+        return KlineSeries.from_data(json.load(file))
+
+
+def read_binary_header(file, file_path):
+    if file.read(len(KLINE_FILE_HEADER)) != KLINE_FILE_HEADER:
+        raise ValueError('Not a binary kline file: {}'.format(file_path))
+    n, capacity = np.frombuffer(file.read(KLINE_FILE_COUNTS_SIZE), dtype=KLINE_FILE_COUNTS_DTYPE)
+    return int(n), int(capacity)
+
+
+def column_offset(k, capacity):
+    return KLINE_FILE_DATA_OFFSET + sum(dtype.itemsize for dtype in KLINE_COLUMN_DTYPES[:k]) * capacity
+
+
+def read_klines_from_binary(file_path):
+    with open(file_path, 'rb') as file:
+        n, capacity = read_binary_header(file, file_path)
+    columns = {}
+    for k, (label, dtype) in enumerate(zip(Kline.KLINE_LABELS, KLINE_COLUMN_DTYPES)):
+        if n == 0:
+            columns[label] = np.zeros(0, dtype=dtype)
+        else:
+            columns[label] = np.memmap(file_path, dtype=dtype, mode='r',
+                                       offset=column_offset(k, capacity), shape=(n,))
+    return KlineSeries(columns)
+
+
+def write_klines_to_binary(file_path, klines, capacity=None):
+    klines = as_series(klines)
+    capacity = max(len(klines), capacity or 0)
+    with open(file_path, 'wb') as file:
+        file.write(KLINE_FILE_HEADER)
+        file.write(np.array([len(klines), capacity], dtype=KLINE_FILE_COUNTS_DTYPE).tobytes())
+        for label, dtype in zip(Kline.KLINE_LABELS, KLINE_COLUMN_DTYPES):
+            column = np.zeros(capacity, dtype=dtype)
+            column[:len(klines)] = getattr(klines, label)
+            file.write(column.tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class BinaryKlineWriter:
+    """Binary kline file open for appending
+
+    Values are written to the free part of each block before the number of
+    klines is updated, so an interrupted append leaves the previous klines
+    intact. A full file is rewritten with twice the capacity, then replaces
+    the previous one.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'r+b')
+        try:
+            self.n, self.capacity = read_binary_header(self.file, file_path)
+        except ValueError:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self.file.close()
+
+    def grow(self, capacity):
+        tmp_path = self.file_path + '.tmp'
+        write_klines_to_binary(tmp_path, read_klines_from_binary(self.file_path), capacity)
+        self.file.close()
+        os.replace(tmp_path, self.file_path)
+        self.file = open(self.file_path, 'r+b')
+        self.capacity = capacity
+
+    def append(self, klines):
+        klines = as_series(klines)
+        if self.n + len(klines) > self.capacity:
+            self.grow(max(2 * self.capacity, self.n + len(klines), KLINE_FILE_MIN_CAPACITY))
+        for k, (label, dtype) in enumerate(zip(Kline.KLINE_LABELS, KLINE_COLUMN_DTYPES)):
+            self.file.seek(column_offset(k, self.capacity) + self.n * dtype.itemsize)
+            self.file.write(np.asarray(getattr(klines, label), dtype=dtype).tobytes())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.n += len(klines)
+        self.file.seek(len(KLINE_FILE_HEADER))
+        self.file.write(np.array([self.n], dtype=KLINE_FILE_COUNTS_DTYPE).tobytes())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+
+def open_binary_klines_for_append(file_path):
+    """Open a binary kline file after its last complete kline, creating it if missing"""
+    if not os.path.isfile(file_path):
+        write_klines_to_binary(file_path, [])
+    return BinaryKlineWriter(file_path)
+
+
+def append_klines_to_binary(writer, klines):
+    writer.append(klines)
+
+
+def read_klines(file_path):
+    if file_path.endswith('.json'):
+        return read_klines_from_json(file_path)
+    return read_klines_from_binary(file_path)
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+
+
+class StateJournal:
+    """Bot state persisted as a snapshot followed by a journal of changes
+
+    Each save appends one fsync'd JSON line holding the keys whose value
+    changed. Records set absolute values, so replaying a record twice is
+    harmless. Every COMPACT_EVERY records, the state is written atomically to
+    the snapshot file, which keeps the format of the former state file, and the
+    journal is emptied.
+    """
+
+    COMPACT_EVERY = 1000
+
+    def __init__(self, snapshot_path, compact_every=COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".journal"
+        self.compact_every = compact_every
+        self.state = None
+        self.nb_records = 0
+        self.file = None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def load(self):
+        """The state from the snapshot and the journal; None if neither exist"""
+        state = None
+        if os.path.isfile(self.snapshot_path):
+            with open(self.snapshot_path) as file:
+                state = json.load(file)
+        valid_size = 0
+        self.nb_records = 0
+        if os.path.isfile(self.journal_path):
+            with open(self.journal_path, "rb") as file:
+                for line in file:
+                    # A record without its newline is torn even if it parses,
+                    # and the next one would be appended to it
+                    try:
+                        changes = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        changes = None
+                    if changes is None:
+                        # Record torn by a crash while appending
+                        logging.warning("Ignoring incomplete state journal record")
+                        break
+                    state = {**(state or {}), **changes}
+                    valid_size += len(line)
+                    self.nb_records += 1
+        self.state = dict(state) if state is not None else None
+        self.open_journal(valid_size)
+        return state
+
+    def open_journal(self, valid_size=0):
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.close()
+        self.file = open(self.journal_path, "ab")
+        self.file.truncate(valid_size)
+
+    def save(self, state):
+        """Append the changes since the last save; no write if nothing changed"""
+        if self.file is None:
+            self.open_journal()
+        previous_state = self.state or {}
+        changes = {
+            key: value
+            for key, value in state.items()
+            if key not in previous_state or previous_state[key] != value
+        }
+        if not changes:
+            return
+        self.file.write(json.dumps(changes).encode() + b"\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.state = dict(state)
+        self.nb_records += 1
+        if self.nb_records >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write the state to the snapshot atomically, then empty the journal"""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        directory = os.path.dirname(self.snapshot_path) or "."
+        directory_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+        self.open_journal()
+        self.nb_records = 0
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+
+from model import Trade
+
+
+class TradeStore:
+    """Local append-only copy of the account fills, in SQLite
+
+    Fills are keyed by (symbol, trade id), ids being increasing per symbol,
+    so only fills newer than the last stored id have to be downloaded.
+    """
+
+    DB_FILE = "data/trades.sqlite"
+    MERGE_DELAY = 60.0
+
+    def __init__(self, file_path=DB_FILE):
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Calls may come from worker threads, one at a time
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS fills ("
+                "symbol TEXT NOT NULL, id INTEGER NOT NULL, time INTEGER NOT NULL, "
+                "price REAL NOT NULL, qty REAL NOT NULL, is_buyer INTEGER NOT NULL, "
+                "PRIMARY KEY (symbol, id))"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def last_id(self, symbol):
+        row = self.connection.execute(
+            "SELECT MAX(id) FROM fills WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        return row[0]
+
+    def add(self, symbol, trade_data):
+        """Store fills as returned by get_my_trades; already stored fills are ignored"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO fills VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        symbol,
+                        trade["id"],
+                        trade["time"],
+                        float(trade["price"]),
+                        float(trade["qty"]),
+                        trade["isBuyer"],
+                    )
+                    for trade in trade_data
+                ],
+            )
+
+    def query(self, sql, parameters):
+        for trade_id, trade_time, price, qty, is_buyer in self.connection.execute(
+            sql, parameters
+        ):
+            yield Trade(
+                {
+                    "id": trade_id,
+                    "time": trade_time,
+                    "price": price,
+                    "qty": qty,
+                    "isBuyer": bool(is_buyer),
+                }
+            )
+
+    def trades(self, symbol):
+        """All fills of a symbol, oldest first"""
+        return list(
+            self.query(
+                "SELECT id, time, price, qty, is_buyer FROM fills WHERE symbol = ? ORDER BY id",
+                (symbol,),
+            )
+        )
+
+    def last_trade(self, symbol):
+        """Last trade once merged as by merge_trades, reading only its own fills"""
+        last_trade = None
+        for trade in self.query(
+            "SELECT id, time, price, qty, is_buyer FROM fills WHERE symbol = ? ORDER BY id DESC",
+            (symbol,),
+        ):
+            if last_trade and (
+                trade.is_buy != last_trade.is_buy
+                or abs(last_trade.time - trade.time) >= self.MERGE_DELAY
+            ):
+                break
+            if last_trade:
+                trade.quantity += last_trade.quantity
+            last_trade = trade
+        return last_trade
@@ -1,5 +1,9 @@
+import itertools
+import os
 from datetime import datetime
 
+import numpy as np
+
 
 class TradeAction:
     BUY_ACTION = 'buy'
@@ -24,6 +28,8 @@ class Kline:
     KLINE_LABELS = ['open_time', 'open_price', 'high_price', 'low_price',
                     'close_price', 'volume', 'close_time', 'quote_asset_volume', 'nb_trades']
 
+    __slots__ = KLINE_LABELS
+
     def __init__(self, kline_data):
         for k in range(len(self.KLINE_LABELS)):
             setattr(self, self.KLINE_LABELS[k], float(kline_data[k]) if isinstance(
@@ -32,12 +38,90 @@ class Kline:
     def __eq__(self, other):
         if not isinstance(other, Kline):
             return False
-        return self.__dict__ == other.__dict__
+        return all(getattr(self, label) == getattr(other, label) for label in self.KLINE_LABELS)
+
+    def __repr__(self):
+        return '<Kline open_time={} close_price={}>'.format(self.open_time, self.close_price)
 
     def diff(self):
         return self.close_price - self.open_price
 
 
+class KlineSeries:
+    """Klines stored as one contiguous NumPy column per field
+
+    Slicing returns a series of views on the same columns; indexing with an
+    integer builds a Kline for that bar only. A view keeps the series it was
+    sliced from as root, with its offset in it: bar k of the view is bar
+    offset + k of the root, whose key identifies the data.
+    """
+
+    KLINE_DTYPES = [np.int64, np.float64, np.float64, np.float64,
+                    np.float64, np.float64, np.int64, np.float64, np.int64]
+
+    __slots__ = Kline.KLINE_LABELS + ['key', 'root', 'offset']
+
+    keys = itertools.count()
+
+    def __init__(self, columns, root=None, offset=0):
+        for label in Kline.KLINE_LABELS:
+            setattr(self, label, columns[label])
+        self.root = root if root is not None else self
+        # Unique across processes, as series are sent to worker processes
+        self.key = self.root.key if root is not None else (os.getpid(), next(self.keys))
+        self.offset = offset
+
+    @classmethod
+    def from_data(cls, klines_data):
+        return cls({
+            label: np.array([kline_data[k] for kline_data in klines_data], dtype=dtype)
+            for k, (label, dtype) in enumerate(zip(Kline.KLINE_LABELS, cls.KLINE_DTYPES))
+        })
+
+    @classmethod
+    def from_klines(cls, klines):
+        return cls({
+            label: np.array([getattr(kline, label) for kline in klines], dtype=dtype)
+            for label, dtype in zip(Kline.KLINE_LABELS, cls.KLINE_DTYPES)
+        })
+
+    def __len__(self):
+        return len(self.close_price)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = {label: getattr(self, label)[index] for label in Kline.KLINE_LABELS}
+            start, _, step = index.indices(len(self))
+            if step != 1:
+                return KlineSeries(columns)
+            return KlineSeries(columns, self.root, self.offset + start)
+        kline = Kline.__new__(Kline)
+        for label in Kline.KLINE_LABELS:
+            setattr(kline, label, getattr(self, label)[index].item())
+        return kline
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def __eq__(self, other):
+        if isinstance(other, KlineSeries):
+            return len(self) == len(other) and all(
+                np.array_equal(getattr(self, label), getattr(other, label))
+                for label in Kline.KLINE_LABELS)
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return False
+
+    def typical_prices(self):
+        return (self.close_price + self.high_price + self.low_price) / 3
+
+
+def as_series(klines):
+    return klines if isinstance(klines, KlineSeries) else KlineSeries.from_klines(klines)
+
+
 class Trade:
 
     def __init__(self, trade_data):
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+# coding: utf-8
+
+import argparse
+import logging
+
+from backtest import optimizer
+from strategy import STRATEGIES
+
+COMMISSION = 0.001
+N_FEATURES = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parameter sweep on crypto currency trading strategies"
+    )
+    parser.add_argument("-f", "--file", help="Kline file path")
+    parser.add_argument(
+        "-S", "--strategy", help="Strategy name", choices=STRATEGIES, required=True
+    )
+    parser.add_argument(
+        "-p",
+        "--param",
+        help='Parameter range, e.g. "NB_PERIODS=24:96:24" or "THRESHOLD=0.0002,0.0005"',
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "-r",
+        "--random",
+        help="Number of random parameter sets instead of the full grid",
+        type=int,
+    )
+    parser.add_argument("-w", "--workers", help="Number of processes", type=int)
+    parser.add_argument(
+        "--rank-by",
+        help="Result field used for ranking",
+        dest="rank_by",
+        choices=["money", "sharpe"],
+        default="money",
+    )
+    parser.add_argument(
+        "--features",
+        help="Number of klines given to the strategy",
+        type=int,
+        default=N_FEATURES,
+    )
+    parser.add_argument(
+        "-n", "--top", help="Number of results to show", type=int, default=20
+    )
+    args = parser.parse_args()
+
+    log_format = "%(asctime)-15s %(message)s"
+    logging.basicConfig(format=log_format, level=logging.INFO)
+
+    if not args.file:
+        raise RuntimeError("No test file path")
+
+    param_ranges = dict(optimizer.parse_param_range(text) for text in args.param)
+    param_sets = (
+        optimizer.random_search_params(param_ranges, args.random)
+        if args.random
+        else optimizer.grid_search_params(param_ranges)
+    )
+    logging.info("Running {} backtests".format(len(param_sets)))
+
+    results = optimizer.run_sweep(
+        STRATEGIES[args.strategy],
+        param_sets,
+        n_features=args.features,
+        commission=COMMISSION,
+        file_path=args.file,
+        max_workers=args.workers,
+        rank_by=args.rank_by,
+    )
+    logging.info("Ranking:\n{}".format(optimizer.format_results(results[: args.top])))
+
+
+if __name__ == "__main__":
+    main()
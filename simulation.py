@@ -2,57 +2,43 @@
 # coding: utf-8
 
 
-from datetime import timedelta, date
+from datetime import timedelta
 import argparse
 import logging
+import os
 
-import matplotlib.pyplot as plt
-
+from backtest import comparison, metrics, optimizer, output, walk_forward
+from backtest.engine import run_backtest
+from backtest.portfolio import run_portfolio
 from interface import read_data
-from model import TradeAction
+from strategy import STRATEGIES
 
 #TEST_FILE_PATH = "data/binance_klines_ETHUSDT_1h_1676660400000.json"
 TEST_FILE_PATH = "data/binance_klines_BTCUSDT_1h_1676664000000.json"
 COMMISSION = 0.001
 N_FEATURES = 1000
+TRAIN_SIZE = 24 * 180
+TEST_SIZE = 24 * 30
 
 
-def run_simulation(klines, n_features, commission, save, validate):
-    n = len(klines)
+def run_simulation(
+    klines,
+    n_features,
+    commission,
+    save,
+    validate,
+    vectorized=True,
+    output_dir=None,
+    show_plot=False,
+    strategy_name="avg_log_ratio",
+):
     n_start = 0
-    money = [0.0]
-    acquired = None
-    previous_price = float("inf")
-    sell_times = []
-
-    from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
-
-    strat = KlinesAvgLogRatioStrategy()
-
-    for k in range(n_start + n_features, n):
-        klines_ref = klines[k - n_features : k]
-
-        price = klines_ref[-1].close_price
-        current_time = klines_ref[-1].close_time
-
-        action = strat.decide_action(klines_ref, acquired)
-
-        if not acquired and action.is_buy():
-            acquired = (1 - commission) / price
-            previous_price = price
-            logging.info("Buying at {}".format(price))
-        elif acquired and action.is_sell():
-            money.append(money[-1] + (1.0 - commission) * price * acquired - 1.0)
-            acquired = None
-            previous_price = price
-            logging.info(
-                "Selling at {}; money: {}; date: {}".format(
-                    price,
-                    money[-1],
-                    date.fromtimestamp(current_time / 1000).isoformat(),
-                )
-            )
-            sell_times.append(current_time)
+
+    strat = STRATEGIES[strategy_name]()
+
+    result = run_backtest(strat, klines, n_features, commission, vectorized)
+    money = result.money
+    sell_times = result.sell_times
 
     market = (klines[-1].close_price - klines[n_start].close_price) / klines[
         n_start
@@ -72,20 +58,104 @@ def run_simulation(klines, n_features, commission, save, validate):
             duration, avg_per_month, avg_per_year
         )
     )
+    result_metrics = metrics.backtest_metrics(result, klines, commission)
+    logging.info(
+        "Metrics: {}".format(
+            "; ".join("{}: {}".format(name, value) for name, value in result_metrics.items())
+        )
+    )
+
+    if output_dir:
+        summary = {
+            "money": money[-1],
+            "nb_transactions": result.nb_transactions,
+            "market": market,
+            "duration_days": duration / timedelta(days=1),
+            "avg_per_month": avg_per_month,
+            "avg_per_year": avg_per_year,
+            **result_metrics,
+        }
+        output.save_result(output_dir, klines, result, summary)
+        logging.info("Results written to {}".format(output_dir))
 
-    plot(klines, money, sell_times)
+    if show_plot:
+        plot(klines, money, sell_times)
 
     return money
 
 
+def run_comparison_simulation(
+    klines, strategy_names, n_features, commission, vectorized=True
+):
+    strategies = {name: STRATEGIES[name]() for name in strategy_names}
+    results = comparison.run_comparison(
+        strategies, klines, n_features, commission, vectorized
+    )
+    summaries = comparison.compare_results(results, klines, commission)
+    logging.info("Comparison:\n{}".format(comparison.format_comparison(summaries)))
+
+    return summaries
+
+
+def run_validation(
+    file_path,
+    n_features,
+    commission,
+    param_ranges,
+    train_size,
+    test_size,
+    strategy_name="avg_log_ratio",
+):
+    n = len(read_data.read_klines(file_path))
+    folds = walk_forward.make_folds(n, train_size, test_size)
+    if not folds:
+        raise RuntimeError("Not enough klines for one train and test range")
+
+    fold_results = walk_forward.run_walk_forward(
+        STRATEGIES[strategy_name],
+        optimizer.grid_search_params(param_ranges),
+        folds,
+        n_features=n_features,
+        commission=commission,
+        file_path=file_path,
+    )
+    logging.info(
+        "Walk-forward validation:\n{}".format(walk_forward.format_folds(fold_results))
+    )
+    logging.info("Parameters to use: {}".format(fold_results[-1]["params"]))
+
+    return fold_results
+
+
+def run_portfolio_simulation(
+    klines_by_symbol, n_features, commission, strategy_name="avg_log_ratio"
+):
+    strategies = {symbol: STRATEGIES[strategy_name]() for symbol in klines_by_symbol}
+    result = run_portfolio(strategies, klines_by_symbol, n_features, commission)
+
+    for s, symbol in enumerate(result.symbols):
+        logging.info(
+            "{}: profit: {}; number of transactions: {}".format(
+                symbol, result.symbol_profits[-1, s], result.nb_transactions[s]
+            )
+        )
+    logging.info(
+        "Portfolio equity: {}; aligned klines: {}".format(
+            result.equity[-1], len(result.open_times)
+        )
+    )
+
+    return result
+
+
 def plot(klines, money, sell_times):
+    import matplotlib.pyplot as plt
+
     plt.subplot(2, 1, 1)
     plt.plot([klines[0].close_time] + sell_times, money)
 
     plt.subplot(2, 1, 2)
-    x = [kline.close_time for kline in klines]
-    y = [kline.close_price for kline in klines]
-    plt.plot(x, y)
+    plt.plot(klines.close_time, klines.close_price)
     plt.axhline(y=0)
 
     plt.show()
@@ -97,8 +167,47 @@ def simulate(**kwargs):
         description="Simulation on crypto currency trading strategies"
     )
     parser.add_argument("-f", "--file", help="Test file path")
+    parser.add_argument(
+        "-P",
+        "--portfolio",
+        help="Test file paths of several symbols sharing the same capital",
+        nargs="+",
+    )
+    parser.add_argument(
+        "-S",
+        "--strategy",
+        help="Strategy names, compared side by side when there are several",
+        nargs="+",
+        choices=STRATEGIES,
+        default=["avg_log_ratio"],
+    )
     parser.add_argument("-s", "--save", help="Save model", action="store_true")
     parser.add_argument("-v", "--validate", help="Validate model", action="store_true")
+    parser.add_argument(
+        "-p",
+        "--param",
+        help='Parameter range to validate, e.g. "NB_PERIODS=24:96:24"',
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "--train", help="Number of klines per train range", type=int, default=TRAIN_SIZE
+    )
+    parser.add_argument(
+        "--test", help="Number of klines per test range", type=int, default=TEST_SIZE
+    )
+    parser.add_argument(
+        "-o", "--output", help="Directory where results are written"
+    )
+    parser.add_argument(
+        "--plot", help="Plot money and price after the simulation", action="store_true"
+    )
+    parser.add_argument(
+        "--per-bar",
+        help="Call the strategy once per kline instead of on the whole series",
+        dest="per_bar",
+        action="store_true",
+    )
     args = parser.parse_args()
 
     log_format = "%(asctime)-15s %(message)s"
@@ -107,10 +216,54 @@ def simulate(**kwargs):
     if args.save and args.validate:
         raise RuntimeError("Cant save and validate")
 
+    if len(args.strategy) > 1:
+        for option, is_set in [
+            ("-v", args.validate),
+            ("-P", args.portfolio),
+            ("-o", args.output),
+            ("--plot", args.plot),
+        ]:
+            if is_set:
+                parser.error("{} takes a single strategy".format(option))
+
+    if args.portfolio:
+        run_portfolio_simulation(
+            {
+                os.path.basename(file_path): read_data.read_klines(file_path)
+                for file_path in args.portfolio
+            },
+            n_features=N_FEATURES,
+            commission=COMMISSION,
+            strategy_name=args.strategy[0],
+        )
+        return
+
     if not args.file:
         raise RuntimeError("No test file path")
 
-    klines = read_data.read_klines_from_json(file_path=args.file)
+    if args.validate:
+        run_validation(
+            args.file,
+            n_features=N_FEATURES,
+            commission=COMMISSION,
+            param_ranges=dict(optimizer.parse_param_range(text) for text in args.param),
+            train_size=args.train,
+            test_size=args.test,
+            strategy_name=args.strategy[0],
+        )
+        return
+
+    klines = read_data.read_klines(file_path=args.file)
+
+    if len(args.strategy) > 1:
+        run_comparison_simulation(
+            klines,
+            args.strategy,
+            n_features=N_FEATURES,
+            commission=COMMISSION,
+            vectorized=not args.per_bar,
+        )
+        return
 
     run_simulation(
         klines,
@@ -118,6 +271,10 @@ def simulate(**kwargs):
         commission=COMMISSION,
         save=args.save,
         validate=args.validate,
+        vectorized=not args.per_bar,
+        output_dir=args.output,
+        show_plot=args.plot,
+        strategy_name=args.strategy[0],
     )
 
 
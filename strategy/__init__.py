@@ -0,0 +1,10 @@
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+from strategy.bollinger_bands import KlinesBollingerBandsStrategy
+from strategy.rsi_ema import KlinesRsiEmaStrategy
+
+# Kline strategies that can be backtested, by command line name
+STRATEGIES = {
+    "avg_log_ratio": KlinesAvgLogRatioStrategy,
+    "bollinger_bands": KlinesBollingerBandsStrategy,
+    "rsi_ema": KlinesRsiEmaStrategy,
+}
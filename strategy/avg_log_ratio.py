@@ -1,8 +1,11 @@
 import logging
-import math
 import statistics
 
+import numpy as np
+
 from model import TradeAction
+from strategy import pipeline
+from strategy.indicator_cache import shared_cache
 from strategy.indicators import Indicators
 
 
@@ -11,14 +14,12 @@ class KlinesAvgLogRatioStrategy:
     NB_PERIODS = 72
     THRESHOLD = 0.0005
 
+    indicator_cache = shared_cache
+
     def decide_action(self, klines, acquired):
-        typical_prices = [(kline.close_price + kline.high_price +
-                           kline.low_price) / 3 for kline in klines]
+        typical_prices = self.indicator_cache.prices(klines, "typical")
 
-        log_ratios = [
-                math.log(typical_prices[-self.NB_PERIODS + i] / typical_prices[-self.NB_PERIODS + i - 1])
-                for i in range(self.NB_PERIODS)
-            ]
+        log_ratios = np.log(typical_prices[-self.NB_PERIODS:] / typical_prices[-self.NB_PERIODS - 1:-1])
 
         avg_log_ratio = statistics.fmean(log_ratios)
         #print(f'Avg log ratio: {avg_log_ratio}')
@@ -28,3 +29,20 @@ class KlinesAvgLogRatioStrategy:
         if acquired and avg_log_ratio < -self.THRESHOLD:
             return TradeAction('sell')
         return TradeAction(None)
+
+    def indicators(self):
+        return {
+            "avg_log_ratio": pipeline.sma(
+                pipeline.log_returns(pipeline.typical()), self.NB_PERIODS
+            ),
+        }
+
+    def signals(self, klines):
+        return self.signals_from(klines, pipeline.evaluate_inputs(self.indicators(), klines))
+
+    def signals_from(self, klines, inputs):
+        # Average of the log ratios of the last NB_PERIODS klines up to each index
+        avg_log_ratio = inputs["avg_log_ratio"].copy()
+        avg_log_ratio[:self.NB_PERIODS] = np.nan
+
+        return avg_log_ratio > self.THRESHOLD, avg_log_ratio < -self.THRESHOLD
@@ -1,7 +1,10 @@
 import logging
 
-from model import TradeAction
-from strategy.indicators import Indicators
+import numpy as np
+
+from model import TradeAction, as_series
+from strategy import pipeline
+from strategy.indicator_cache import shared_cache
 
 
 class KlinesBollingerBandsStrategy:
@@ -10,21 +13,21 @@ class KlinesBollingerBandsStrategy:
     STD_DEV_FACTOR = 1.
     TREND_NB_PERIODS = 20
 
-    def decide_action(self, klines, acquired):
-        current_price = klines[-1].close_price
+    indicator_cache = shared_cache
 
-        typical_prices = [(kline.close_price + kline.high_price +
-                           kline.low_price) / 3 for kline in klines]
+    def decide_action(self, klines, acquired):
+        klines = as_series(klines)
+        current_price = klines.close_price[-1]
 
         # Get current trend
-        past_ma = Indicators.exp_moving_average(typical_prices, len(
-            typical_prices) - self.TREND_NB_PERIODS, self.NB_PERIODS)
+        past_ma = self.indicator_cache.exp_moving_average(
+            klines, "typical", len(klines) - self.TREND_NB_PERIODS, self.NB_PERIODS)
 
         # Get std deviation and MA until second to last close price (finished klines)
-        std_deviation = Indicators.standard_deviation(
-            typical_prices, len(typical_prices) - 2, self.NB_PERIODS)
-        ma = Indicators.exp_moving_average(
-            typical_prices, len(typical_prices) - 2, self.NB_PERIODS)
+        std_deviation = self.indicator_cache.standard_deviation(
+            klines, "typical", len(klines) - 2, self.NB_PERIODS)
+        ma = self.indicator_cache.exp_moving_average(
+            klines, "typical", len(klines) - 2, self.NB_PERIODS)
 
         if std_deviation != 0:
             logging.debug('Current price compared to Bollinger bands: {}; trend: {}'.format(
@@ -35,3 +38,29 @@ class KlinesBollingerBandsStrategy:
         if acquired and ma < past_ma and current_price > ma + self.STD_DEV_FACTOR * std_deviation:
             return TradeAction('sell')
         return TradeAction(None)
+
+    def indicators(self):
+        return {
+            "close": pipeline.close(),
+            "ema": pipeline.ema(pipeline.typical(), self.NB_PERIODS),
+            "std": pipeline.std(pipeline.typical(), self.NB_PERIODS),
+        }
+
+    def signals(self, klines):
+        return self.signals_from(klines, pipeline.evaluate_inputs(self.indicators(), klines))
+
+    def signals_from(self, klines, inputs):
+        close_prices = inputs["close"]
+        ema = inputs["ema"]
+
+        # Same offsets as in decide_action for a window ending at each index
+        past_ma = np.full(len(ema), np.nan)
+        past_ma[self.TREND_NB_PERIODS - 1:] = ema[:len(ema) - self.TREND_NB_PERIODS + 1]
+        ma = np.full(len(ema), np.nan)
+        ma[1:] = ema[:-1]
+        std = np.full(len(ema), np.nan)
+        std[1:] = inputs["std"][:-1]
+
+        buy = (ma > past_ma) & (close_prices < ma - self.STD_DEV_FACTOR * std)
+        sell = (ma < past_ma) & (close_prices > ma + self.STD_DEV_FACTOR * std)
+        return buy, sell
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+from model import as_series
+from strategy.indicators import Indicators, RangeRatioIndex
+
+
+class IndicatorCache:
+    """Indicator values memoized per series, indicator, parameters and index
+
+    Entries are keyed on the root series of the klines and on absolute
+    indices, so strategies deciding on the same data, or on windows sliced
+    from the same series, compute each value once. The least recently used
+    values are evicted beyond max_size, and the least recently used price
+    arrays beyond max_series.
+
+    Only windows of the same series share entries: the live bot builds a new
+    series from its kline cache every cycle, so there values are only shared
+    between the strategies deciding on that cycle's window, and hits come
+    from backtests and parameter sweeps.
+    """
+
+    MAX_SIZE = 100000
+    MAX_SERIES = 16
+
+    def __init__(self, max_size=MAX_SIZE, max_series=MAX_SERIES):
+        self.max_size = max_size
+        self.max_series = max_series
+        self.entries = OrderedDict()
+        self.series_entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries) + len(self.series_entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.series_entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        nb_lookups = self.hits + self.misses
+        return self.hits / nb_lookups if nb_lookups else 0.
+
+    def get(self, key, compute, series=False):
+        entries = self.series_entries if series else self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        value = compute()
+        entries[key] = value
+        while len(entries) > (self.max_series if series else self.max_size):
+            entries.popitem(last=False)
+        return value
+
+    def prices(self, klines, name):
+        """Close or typical prices of klines, computed once for their root series"""
+        klines = as_series(klines)
+        if name == "close":
+            return klines.close_price
+        if name != "typical":
+            raise ValueError("Unknown prices: {}".format(name))
+        root_prices = self.get(
+            (klines.key, "typical"), klines.root.typical_prices, series=True
+        )
+        return root_prices[klines.offset:klines.offset + len(klines)]
+
+    def indicator(self, klines, prices_name, name, parameters, K):
+        """Indicators.<name>(prices, K, *parameters), K being an index in klines"""
+        klines = as_series(klines)
+        return self.get(
+            (klines.key, prices_name, name, parameters, klines.offset + K),
+            lambda: getattr(Indicators, name)(self.prices(klines, prices_name), K, *parameters),
+        )
+
+    def exp_moving_average(self, klines, prices_name, K, nb_period):
+        return self.indicator(klines, prices_name, "exp_moving_average", (nb_period,), K)
+
+    def standard_deviation(self, klines, prices_name, K, nb_period):
+        return self.indicator(klines, prices_name, "standard_deviation", (nb_period,), K)
+
+    def range_ratio_index(self, klines, prices_name):
+        """RangeRatioIndex of the prices of the root series of klines, built once"""
+        klines = as_series(klines)
+        return self.get(
+            (klines.key, prices_name, "range_ratio_index"),
+            lambda: RangeRatioIndex(self.prices(klines.root, prices_name)),
+            series=True,
+        )
+
+    def rsi(self, klines, prices_name, begin, end):
+        """Indicators.rsi(prices, begin, end), from the index of the root series"""
+        klines = as_series(klines)
+        index = self.range_ratio_index(klines, prices_name)
+        return float(index.ratio(klines.offset + begin, klines.offset + end))
+
+
+# Shared by the strategies of a process
+shared_cache = IndicatorCache()
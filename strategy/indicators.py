@@ -65,17 +65,15 @@ class Indicators:
 
     @classmethod
     def stoch_rsi(cls, x, begin, end):
-        rsi_on_range = [cls.rsi(x, begin, end - i) for i in reversed(range(0, cls.STOCH_RSI_RANGE))]
-        if not rsi_on_range:
+        if cls.STOCH_RSI_RANGE <= 0:
             logging.error('Not enough points')
             return None
-        current_rsi = rsi_on_range[-1]
-        min_rsi = min(rsi_on_range)
-        max_rsi = max(rsi_on_range)
-        if min_rsi == max_rsi:
+        # The STOCH_RSI_RANGE ratios are read from cumulated sums
+        value = RangeRatioIndex(x).stoch(begin, end, cls.STOCH_RSI_RANGE)
+        if value is None:
             logging.error('Not enough points: min and max are equal')
             return None
-        return (current_rsi - min_rsi) / (max_rsi - min_rsi)
+        return float(value)
 
     @classmethod
     def mfi(cls, x, volumes, begin, end):
@@ -103,3 +101,154 @@ class Indicators:
     def standard_deviation(cls, x, K, nb_period):
         sma = cls.simple_moving_average(x, K, nb_period)
         return math.sqrt(sum((price - sma) ** 2 for price in x[K : K - nb_period : -1]) / nb_period)
+
+    # Series variants: element K is the scalar indicator at index K, or NaN
+    # where there are not enough points before K
+
+    @classmethod
+    def simple_moving_average_series(cls, x, nb_period):
+        x = np.asarray(x, dtype=float)
+        result = np.full(len(x), np.nan)
+        if len(x) >= nb_period:
+            cumulated = np.concatenate(([0.], np.cumsum(x)))
+            result[nb_period - 1:] = (cumulated[nb_period:] - cumulated[:-nb_period]) / nb_period
+        return result
+
+    @classmethod
+    def exp_moving_average_series(cls, x, nb_period):
+        x = np.asarray(x, dtype=float)
+        result = np.full(len(x), np.nan)
+        if len(x) >= nb_period:
+            # Convolution reverses the weights: the first one applies to x[K]
+            result[nb_period - 1:] = np.convolve(x, cls.get_exp_weights(nb_period), mode='valid')
+        return result
+
+    @classmethod
+    def standard_deviation_series(cls, x, nb_period):
+        x = np.asarray(x, dtype=float)
+        result = np.full(len(x), np.nan)
+        if len(x) >= nb_period:
+            # Centering keeps the difference of cumulated squares accurate
+            centered = x - np.mean(x)
+            mean = cls.simple_moving_average_series(centered, nb_period)[nb_period - 1:]
+            mean_square = cls.simple_moving_average_series(centered ** 2, nb_period)[nb_period - 1:]
+            result[nb_period - 1:] = np.sqrt(np.maximum(mean_square - mean ** 2, 0.))
+        return result
+
+    @classmethod
+    def macd_series(cls, x):
+        """MACD and signal lines, as in moving_average_conv_div and moving_average_conv_div_ema"""
+        macd = cls.exp_moving_average_series(x, cls.EMA_1_RANGE) - cls.exp_moving_average_series(x, cls.EMA_2_RANGE)
+        signal = np.full(len(macd), np.nan)
+        first = cls.EMA_2_RANGE - 1
+        if len(macd) > first:
+            signal[first:] = cls.exp_moving_average_series(macd[first:], cls.MACD_EMA_RANGE)
+        return macd, signal
+
+    @classmethod
+    def macd_difference_series(cls, x):
+        macd, signal = cls.macd_series(x)
+        return macd - signal
+
+    @classmethod
+    def rsi_series(cls, x, nb_period):
+        """Element K is rsi(x, K - nb_period + 1, K + 1), the RSI of the last nb_period points"""
+        return RangeRatioIndex(x).window_series(nb_period)
+
+    @classmethod
+    def mfi_series(cls, x, volumes, nb_period):
+        """Element K is mfi(x, volumes, K - nb_period + 1, K + 1)"""
+        return RangeRatioIndex.money_flow(x, volumes).window_series(nb_period)
+
+    @classmethod
+    def stoch_rsi_series(cls, x, begin):
+        """Element K is stoch_rsi(x, begin, K + 1), NaN where it is None"""
+        return RangeRatioIndex(x).stoch_series(begin, cls.STOCH_RSI_RANGE)
+
+    @classmethod
+    def log_returns_series(cls, x):
+        x = np.asarray(x, dtype=float)
+        return np.concatenate(([0.], np.log(x[1:] / x[:-1])))
+
+
+def sliding_extremum(values, size, ufunc):
+    """ufunc (np.minimum or np.maximum) over each window of size values, in linear time
+
+    Windows are split at multiples of size: each one is the union of the end
+    of a block and the start of the next one.
+    """
+    values = np.asarray(values, dtype=float)
+    nb_blocks = -(-len(values) // size)
+    padded = np.full(nb_blocks * size, values[-1])
+    padded[:len(values)] = values
+    blocks = padded.reshape(nb_blocks, size)
+    block_starts = ufunc.accumulate(blocks, axis=1).ravel()
+    block_ends = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(block_ends[:len(values) - size + 1], block_starts[size - 1:len(values)])
+
+
+class RangeRatioIndex:
+    """Cumulated increases and decreases of a series, built once
+
+    ratio(begin, end) equals Indicators.rsi(values, begin, end) in constant
+    time; built on prices times volumes, it equals Indicators.mfi.
+    """
+
+    def __init__(self, values):
+        diffs = np.diff(np.asarray(values, dtype=float))
+        # Element end sums the variations from index 1 to end - 1
+        self.increases = np.concatenate(([0., 0.], np.cumsum(np.where(diffs > 0, diffs, 0.))))
+        self.decreases = np.concatenate(([0., 0.], np.cumsum(np.where(diffs > 0, 0., -diffs))))
+
+    @classmethod
+    def money_flow(cls, x, volumes):
+        return cls(np.asarray(x, dtype=float) * np.asarray(volumes, dtype=float))
+
+    def __len__(self):
+        return len(self.increases) - 1
+
+    def ratio(self, begin, end):
+        if end <= begin + 1:
+            return 0.
+        increases = self.increases[end] - self.increases[begin + 1]
+        decreases = self.decreases[end] - self.decreases[begin + 1]
+        return 0. if increases == 0 and decreases == 0 else increases / (increases + decreases)
+
+    def ratios(self, begins, ends):
+        """ratio for arrays of ranges; empty ranges give 0"""
+        begins = np.asarray(begins)
+        ends = np.asarray(ends)
+        valid = ends > begins + 1
+        starts = np.where(valid, begins + 1, 0)
+        ends = np.where(valid, ends, 0)
+        increases = self.increases[ends] - self.increases[starts]
+        total = increases + self.decreases[ends] - self.decreases[starts]
+        return np.divide(increases, total, out=np.zeros(len(total)), where=total != 0)
+
+    def window_series(self, nb_period):
+        """Element K is the ratio over the nb_period points up to K, NaN before"""
+        result = np.full(len(self), np.nan)
+        if nb_period < 2 or len(self) < nb_period:
+            return result
+        ends = np.arange(nb_period, len(self) + 1)
+        result[nb_period - 1:] = self.ratios(ends - nb_period, ends)
+        return result
+
+    def stoch(self, begin, end, nb_range):
+        """Stochastic of the ratios from begin to each of the nb_range last ends, as Indicators.stoch_rsi"""
+        ratios = self.ratios(np.full(nb_range, begin), np.arange(end - nb_range + 1, end + 1))
+        min_ratio = ratios.min()
+        max_ratio = ratios.max()
+        if min_ratio == max_ratio:
+            return None
+        return (ratios[-1] - min_ratio) / (max_ratio - min_ratio)
+
+    def stoch_series(self, begin, nb_range):
+        """Element K is stoch(begin, K + 1, nb_range), NaN where it is None"""
+        ends = np.arange(1, len(self) + 1)
+        ratios = self.ratios(np.full(len(ends), begin), ends)
+        # Ends before the first one give a ratio of 0
+        padded = np.concatenate((np.zeros(nb_range - 1), ratios))
+        min_ratios = sliding_extremum(padded, nb_range, np.minimum)
+        spread = sliding_extremum(padded, nb_range, np.maximum) - min_ratios
+        return np.divide(ratios - min_ratios, spread, out=np.full(len(spread), np.nan), where=spread != 0)
@@ -0,0 +1,156 @@
+from model import as_series
+from strategy.indicators import Indicators
+
+# Series computed by each kind of node, from the klines, the input series and
+# the parameters of the node
+NODE_FUNCTIONS = {
+    "close": lambda klines: klines.close_price,
+    "typical": lambda klines: klines.typical_prices(),
+    "volume": lambda klines: klines.volume,
+    "sma": lambda klines, x, n: Indicators.simple_moving_average_series(x, n),
+    "ema": lambda klines, x, n: Indicators.exp_moving_average_series(x, n),
+    "std": lambda klines, x, n: Indicators.standard_deviation_series(x, n),
+    "rsi": lambda klines, x, n: Indicators.rsi_series(x, n),
+    "mfi": lambda klines, x, volumes, n: Indicators.mfi_series(x, volumes, n),
+    "macd_difference": lambda klines, x: Indicators.macd_difference_series(x),
+    "log_returns": lambda klines, x: Indicators.log_returns_series(x),
+}
+
+
+class Node:
+    """Indicator series of a pipeline, computed from the klines and other nodes
+
+    Nodes with the same kind, inputs and parameters are equal, so declaring
+    the same indicator twice computes it once.
+    """
+
+    __slots__ = ["name", "inputs", "parameters", "key"]
+
+    def __init__(self, name, inputs=(), parameters=()):
+        if name not in NODE_FUNCTIONS:
+            raise ValueError("Unknown indicator: {}".format(name))
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.parameters = tuple(parameters)
+        self.key = (name, self.inputs, self.parameters)
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        arguments = [repr(node) for node in self.inputs] + [str(p) for p in self.parameters]
+        return "{}({})".format(self.name, ", ".join(arguments)) if arguments else self.name
+
+    def compute(self, klines, values):
+        return NODE_FUNCTIONS[self.name](
+            klines, *(values[node] for node in self.inputs), *self.parameters
+        )
+
+
+def close():
+    return Node("close")
+
+
+def typical():
+    return Node("typical")
+
+
+def volume():
+    return Node("volume")
+
+
+def sma(x, nb_period):
+    return Node("sma", (x,), (nb_period,))
+
+
+def ema(x, nb_period):
+    return Node("ema", (x,), (nb_period,))
+
+
+def std(x, nb_period):
+    return Node("std", (x,), (nb_period,))
+
+
+def rsi(x, nb_period):
+    return Node("rsi", (x,), (nb_period,))
+
+
+def mfi(x, volumes, nb_period):
+    return Node("mfi", (x, volumes), (nb_period,))
+
+
+def macd_difference(x):
+    return Node("macd_difference", (x,))
+
+
+def log_returns(x):
+    return Node("log_returns", (x,))
+
+
+def plan(nodes):
+    """Distinct nodes and their inputs, each one after its inputs"""
+    ordered = []
+    visited = set()
+
+    def visit(node):
+        if node in visited:
+            return
+        visited.add(node)
+        for input_node in node.inputs:
+            visit(input_node)
+        ordered.append(node)
+
+    for node in nodes:
+        visit(node)
+    return ordered
+
+
+def evaluate(nodes, klines):
+    """Series of the planned nodes over klines, each node computed once"""
+    values = {}
+    for node in nodes:
+        values[node] = node.compute(klines, values)
+    return values
+
+
+def evaluate_inputs(inputs, klines):
+    """Series of a single strategy's declared inputs, by input name"""
+    klines = as_series(klines)
+    values = evaluate(plan(inputs.values()), klines)
+    return {name: values[node] for name, node in inputs.items()}
+
+
+class Pipeline:
+    """Indicators of several strategies, planned as one graph of distinct nodes
+
+    Strategies declare their inputs with indicators(), a dict of nodes by
+    name, and turn them into buy and sell arrays with signals_from().
+    """
+
+    def __init__(self, strategies):
+        self.strategies = strategies
+        self.inputs = [strategy.indicators() for strategy in strategies]
+        self.nodes = plan(node for inputs in self.inputs for node in inputs.values())
+
+    def evaluate(self, klines):
+        return evaluate(self.nodes, klines)
+
+    def signals(self, klines):
+        """Buy and sell arrays of each strategy, computing each node once for the series"""
+        klines = as_series(klines)
+        values = self.evaluate(klines)
+        return [
+            strategy.signals_from(
+                klines, {name: values[node] for name, node in inputs.items()}
+            )
+            for strategy, inputs in zip(self.strategies, self.inputs)
+        ]
+
+    def decide(self, klines):
+        """Buy and sell decisions of each strategy on the last kline of a window"""
+        return [
+            (bool(buy[-1]), bool(sell[-1])) for buy, sell in self.signals(klines)
+        ]
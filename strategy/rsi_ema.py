@@ -1,26 +1,59 @@
 import logging
 
-from model import TradeAction
-from strategy.indicators import Indicators
+from model import TradeAction, as_series
+from strategy import pipeline
+from strategy.indicator_cache import shared_cache
 
 
 class KlinesRsiEmaStrategy:
+
+    EMA_SHORT_NB_PERIODS = 20
+    EMA_LONG_NB_PERIODS = 100
+    RSI_NB_PERIODS = 24
+    RSI_BUY_THRESHOLD = 0.45
+    RSI_SELL_THRESHOLD = 0.55
+
+    indicator_cache = shared_cache
+
     def decide_action(self, klines, acquired) -> TradeAction:
-        close_prices = [kline.close_price for kline in klines]
+        klines = as_series(klines)
 
-        ema_short = Indicators.exp_moving_average(
-            close_prices, len(close_prices) - 1, 20
+        ema_short = self.indicator_cache.exp_moving_average(
+            klines, "close", len(klines) - 1, self.EMA_SHORT_NB_PERIODS
         )
-        ema_long = Indicators.exp_moving_average(
-            close_prices, len(close_prices) - 1, 100
+        ema_long = self.indicator_cache.exp_moving_average(
+            klines, "close", len(klines) - 1, self.EMA_LONG_NB_PERIODS
         )
 
-        rsi = Indicators.rsi(close_prices, len(close_prices) - 24, len(close_prices))
+        rsi = self.indicator_cache.rsi(
+            klines, "close", len(klines) - self.RSI_NB_PERIODS, len(klines)
+        )
 
-        if not acquired and rsi < 0.45 and ema_short > ema_long:
+        if not acquired and rsi < self.RSI_BUY_THRESHOLD and ema_short > ema_long:
             return TradeAction("buy")
 
-        if acquired and rsi > 0.55 and ema_short < ema_long:
+        if acquired and rsi > self.RSI_SELL_THRESHOLD and ema_short < ema_long:
             return TradeAction("sell")
 
         return TradeAction(None)
+
+    def indicators(self):
+        return {
+            "ema_short": pipeline.ema(pipeline.close(), self.EMA_SHORT_NB_PERIODS),
+            "ema_long": pipeline.ema(pipeline.close(), self.EMA_LONG_NB_PERIODS),
+            "rsi": pipeline.rsi(pipeline.close(), self.RSI_NB_PERIODS),
+        }
+
+    def signals(self, klines):
+        return self.signals_from(
+            klines, pipeline.evaluate_inputs(self.indicators(), klines)
+        )
+
+    def signals_from(self, klines, inputs):
+        ema_short = inputs["ema_short"]
+        ema_long = inputs["ema_long"]
+        rsi = inputs["rsi"]
+
+        buy = (rsi < self.RSI_BUY_THRESHOLD) & (ema_short > ema_long)
+        sell = (rsi > self.RSI_SELL_THRESHOLD) & (ema_short < ema_long)
+        return buy, sell
@@ -0,0 +1,144 @@
+import math
+from collections import deque
+
+
+class StreamingIndicator:
+    """Indicator advanced one closed kline at a time in constant time
+
+    update(kline) feeds the close price of the kline, push(value) feeds a raw
+    value; both return the new indicator value, or None while warming up.
+    """
+
+    value = None
+
+    def update(self, kline):
+        return self.push(kline.close_price)
+
+    def push(self, x):
+        raise NotImplementedError
+
+
+class RunningEma(StreamingIndicator):
+    """Recursive EMA seeded with the first value
+
+    Unlike Indicators.exp_moving_average, the weights are not truncated to
+    nb_period values.
+    """
+
+    def __init__(self, nb_period):
+        self.alpha = 2 / (nb_period + 1)
+
+    def push(self, x):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class WilderRsi(StreamingIndicator):
+    """RSI with Wilder smoothing, as a ratio between 0 and 1 like Indicators.rsi"""
+
+    def __init__(self, nb_period):
+        self.nb_period = nb_period
+        self.previous = None
+        self.nb_diffs = 0
+        self.avg_gain = 0.
+        self.avg_loss = 0.
+
+    def push(self, x):
+        if self.previous is None:
+            self.previous = x
+            return None
+        diff = x - self.previous
+        self.previous = x
+        gain = diff if diff > 0 else 0.
+        loss = -diff if diff < 0 else 0.
+        if self.nb_diffs < self.nb_period:
+            self.nb_diffs += 1
+            self.avg_gain += (gain - self.avg_gain) / self.nb_diffs
+            self.avg_loss += (loss - self.avg_loss) / self.nb_diffs
+            if self.nb_diffs < self.nb_period:
+                return None
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.nb_period
+            self.avg_loss += (loss - self.avg_loss) / self.nb_period
+        total = self.avg_gain + self.avg_loss
+        self.value = 0. if total == 0 else self.avg_gain / total
+        return self.value
+
+
+class RollingStats(StreamingIndicator):
+    """Mean and population standard deviation over the last nb_period values
+
+    Uses Welford's update for both the added and the evicted value. The value
+    is the standard deviation, as in Indicators.standard_deviation.
+    """
+
+    def __init__(self, nb_period):
+        self.nb_period = nb_period
+        self.window = deque()
+        self.mean = 0.
+        self.m2 = 0.
+
+    def push(self, x):
+        self.window.append(x)
+        if len(self.window) > self.nb_period:
+            old = self.window.popleft()
+            old_mean = self.mean
+            self.mean += (x - old) / self.nb_period
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        self.value = math.sqrt(self.variance)
+        return self.value
+
+    @property
+    def variance(self):
+        return max(self.m2, 0.) / len(self.window) if self.window else 0.
+
+
+class RollingMinMax(StreamingIndicator):
+    """Minimum and maximum over the last nb_period values, with monotonic deques"""
+
+    def __init__(self, nb_period):
+        self.nb_period = nb_period
+        self.count = 0
+        self.min_deque = deque()
+        self.max_deque = deque()
+
+    def push(self, x):
+        index = self.count
+        self.count += 1
+        while self.min_deque and self.min_deque[-1][1] >= x:
+            self.min_deque.pop()
+        self.min_deque.append((index, x))
+        while self.max_deque and self.max_deque[-1][1] <= x:
+            self.max_deque.pop()
+        self.max_deque.append((index, x))
+        if self.min_deque[0][0] <= index - self.nb_period:
+            self.min_deque.popleft()
+        if self.max_deque[0][0] <= index - self.nb_period:
+            self.max_deque.popleft()
+        self.value = (self.min_deque[0][1], self.max_deque[0][1])
+        return self.value
+
+
+class RunningMacd(StreamingIndicator):
+    """MACD line, signal line and their difference, on recursive EMAs
+
+    The periods are those of Indicators.macd_difference, but as with
+    RunningEma the weights are not truncated, so the values differ from it.
+    """
+
+    def __init__(self, short_nb_period=12, long_nb_period=26, signal_nb_period=9):
+        self.ema_short = RunningEma(short_nb_period)
+        self.ema_long = RunningEma(long_nb_period)
+        self.ema_signal = RunningEma(signal_nb_period)
+        self.macd = None
+        self.signal = None
+
+    def push(self, x):
+        self.macd = self.ema_short.push(x) - self.ema_long.push(x)
+        self.signal = self.ema_signal.push(self.macd)
+        self.value = self.macd - self.signal
+        return self.value
@@ -0,0 +1,91 @@
+import unittest
+
+from backtest.comparison import compare_results, format_comparison, run_comparison
+from backtest.engine import run_backtest
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+from strategy.bollinger_bands import KlinesBollingerBandsStrategy
+from strategy.rsi_ema import KlinesRsiEmaStrategy
+
+
+class PerBarStrategy:
+    """Strategy deciding one window at a time only"""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def decide_action(self, klines, acquired):
+        return self.strategy.decide_action(klines, acquired)
+
+
+class ComparisonTest(unittest.TestCase):
+
+    TEST_FILE_PATHS = [
+        "test/data/binance_klines_BTCUSDT_1h_1569445200000.json",
+        "test/data/binance_klines_BTCUSDT_1h_1569618000000.json",
+    ]
+
+    def setUp(self):
+        self.klines = []
+        for file_path in self.TEST_FILE_PATHS:
+            for kline in read_data.read_klines_from_json(file_path):
+                if not self.klines or kline.open_time > self.klines[-1].open_time:
+                    self.klines.append(kline)
+        avg_log_ratio = KlinesAvgLogRatioStrategy()
+        avg_log_ratio.NB_PERIODS = 12
+        avg_log_ratio.THRESHOLD = 0.0002
+        bollinger_bands = KlinesBollingerBandsStrategy()
+        bollinger_bands.STD_DEV_FACTOR = 0.5
+        rsi_ema = KlinesRsiEmaStrategy()
+        rsi_ema.EMA_LONG_NB_PERIODS = 40
+        rsi_ema.RSI_BUY_THRESHOLD = 0.5
+        rsi_ema.RSI_SELL_THRESHOLD = 0.5
+        self.strategies = {
+            "avg_log_ratio": avg_log_ratio,
+            "bollinger_bands": bollinger_bands,
+            "rsi_ema": rsi_ema,
+        }
+
+    def assert_results_equal(self, expected, actual):
+        self.assertEqual(expected.buy_indices, actual.buy_indices)
+        self.assertEqual(expected.sell_indices, actual.sell_indices)
+        self.assertEqual(expected.sell_times, actual.sell_times)
+        for expected_money, actual_money in zip(expected.money, actual.money):
+            self.assertAlmostEqual(expected_money, actual_money)
+
+    def test_matches_single_backtests(self):
+        results = run_comparison(self.strategies, self.klines, 45, 0.001)
+        self.assertEqual(list(self.strategies), list(results))
+        self.assertTrue(any(result.nb_transactions > 2 for result in results.values()))
+        for name, strategy in self.strategies.items():
+            self.assert_results_equal(run_backtest(strategy, self.klines, 45, 0.001), results[name])
+
+    def test_per_bar(self):
+        results = run_comparison(self.strategies, self.klines, 45, 0.001, vectorized=False)
+        for name, strategy in self.strategies.items():
+            self.assert_results_equal(
+                run_backtest(strategy, self.klines, 45, 0.001, vectorized=False), results[name]
+            )
+
+    def test_per_bar_strategy(self):
+        strategies = {
+            "per_bar": PerBarStrategy(self.strategies["avg_log_ratio"]),
+            "rsi_ema": self.strategies["rsi_ema"],
+        }
+        results = run_comparison(strategies, self.klines, 45, 0.001)
+        self.assert_results_equal(
+            run_backtest(self.strategies["avg_log_ratio"], self.klines, 45, 0.001), results["per_bar"]
+        )
+
+    def test_format_comparison(self):
+        results = run_comparison(self.strategies, self.klines, 45, 0.001)
+        summaries = compare_results(results, self.klines, 0.001)
+        self.assertEqual(results["rsi_ema"].money[-1], summaries["rsi_ema"]["money"])
+        self.assertIn("sharpe", summaries["rsi_ema"])
+        lines = format_comparison(summaries).split("\n")
+        self.assertEqual(4, len(lines))
+        self.assertEqual("bollinger_bands", lines[2].split()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
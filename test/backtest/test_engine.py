@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from backtest.engine import per_bar_signals, run_backtest
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+from strategy.bollinger_bands import KlinesBollingerBandsStrategy
+from strategy.rsi_ema import KlinesRsiEmaStrategy
+
+
+class EngineTest(unittest.TestCase):
+
+    TEST_FILE_PATHS = [
+        "test/data/binance_klines_BTCUSDT_1h_1569445200000.json",
+        "test/data/binance_klines_BTCUSDT_1h_1569618000000.json",
+    ]
+
+    def setUp(self):
+        self.klines = []
+        for file_path in self.TEST_FILE_PATHS:
+            for kline in read_data.read_klines_from_json(file_path):
+                if not self.klines or kline.open_time > self.klines[-1].open_time:
+                    self.klines.append(kline)
+        self.strat = KlinesAvgLogRatioStrategy()
+        self.strat.NB_PERIODS = 12
+        self.strat.THRESHOLD = 0.0002
+
+    def test_signals_match_decide_action(self):
+        buy, sell = self.strat.signals(self.klines)
+        for k in range(self.strat.NB_PERIODS + 1, len(self.klines) + 1):
+            klines_ref = self.klines[:k]
+            self.assertEqual(
+                bool(self.strat.decide_action(klines_ref, None).is_buy()), buy[k - 1]
+            )
+            self.assertEqual(
+                bool(self.strat.decide_action(klines_ref, 1.0).is_sell()), sell[k - 1]
+            )
+
+    def assert_signals_match_per_bar(self, strat, n_features):
+        buy, sell = strat.signals(self.klines)
+        per_bar_buy, per_bar_sell = per_bar_signals(strat, self.klines, n_features)
+        np.testing.assert_array_equal(per_bar_buy[n_features - 1:], buy[n_features - 1:])
+        np.testing.assert_array_equal(per_bar_sell[n_features - 1:], sell[n_features - 1:])
+
+    def test_bollinger_bands_signals(self):
+        strat = KlinesBollingerBandsStrategy()
+        strat.STD_DEV_FACTOR = 0.5
+        self.assert_signals_match_per_bar(strat, 45)
+
+    def test_rsi_ema_signals(self):
+        strat = KlinesRsiEmaStrategy()
+        strat.EMA_LONG_NB_PERIODS = 40
+        strat.RSI_BUY_THRESHOLD = 0.5
+        strat.RSI_SELL_THRESHOLD = 0.5
+        self.assert_signals_match_per_bar(strat, 45)
+
+    def test_vectorized_matches_per_bar(self):
+        per_bar = run_backtest(self.strat, self.klines, 20, 0.001, vectorized=False)
+        vectorized = run_backtest(self.strat, self.klines, 20, 0.001)
+        self.assertGreater(per_bar.nb_transactions, 2)
+        self.assertEqual(per_bar.buy_indices, vectorized.buy_indices)
+        self.assertEqual(per_bar.sell_indices, vectorized.sell_indices)
+        self.assertEqual(per_bar.sell_times, vectorized.sell_times)
+        for expected, actual in zip(per_bar.money, vectorized.money):
+            self.assertAlmostEqual(expected, actual)
@@ -0,0 +1,66 @@
+import math
+import unittest
+
+import numpy as np
+
+from backtest import metrics
+from backtest.engine import BacktestResult
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_equity_curve(self):
+        close_prices = [10., 11., 12., 9., 10., 8.]
+        commission = 0.1
+        money = [0.0, 0.9 * 12. * 0.9 / 10. - 1.]
+        result = BacktestResult(money, [0], buy_indices=[0, 4], sell_indices=[2])
+        equity, positions = metrics.equity_curve(result, close_prices, commission)
+        np.testing.assert_array_equal([1, 1, 0, 0, 1, 1], positions)
+        np.testing.assert_allclose(
+            [
+                0.9,
+                0.9 * 1.1,
+                1. + money[1],
+                1. + money[1],
+                money[1] + 0.9,
+                money[1] + 0.9 * 0.8,
+            ],
+            equity,
+        )
+
+    def test_sharpe_and_sortino(self):
+        equity = [1., 1.1, 1.045, 1.1495]
+        period_returns = np.array([.1, -.05, .1])
+        self.assertAlmostEqual(
+            period_returns.mean() / period_returns.std() * math.sqrt(12),
+            metrics.sharpe_ratio(equity, 12),
+        )
+        self.assertAlmostEqual(
+            period_returns.mean() / math.sqrt(.05 ** 2 / 3) * math.sqrt(12),
+            metrics.sortino_ratio(equity, 12),
+        )
+        self.assertEqual(0., metrics.sharpe_ratio([1., 1., 1.], 12))
+        self.assertEqual(0., metrics.sortino_ratio([1., 1.1], 12))
+
+    def test_max_drawdown(self):
+        self.assertEqual((0., 0), metrics.max_drawdown([0.0, 0.1, 0.2]))
+        drawdown, duration = metrics.max_drawdown([0.0, 0.2, -0.05, 0.1, 0.3, 0.25])
+        self.assertAlmostEqual(0.25, drawdown)
+        self.assertEqual(2, duration)
+
+    def test_trade_metrics(self):
+        trade_profits = [0.1, -0.05, 0.2, -0.05]
+        self.assertEqual(0.5, metrics.win_rate(trade_profits))
+        self.assertAlmostEqual(3., metrics.profit_factor(trade_profits))
+        self.assertIsNone(metrics.profit_factor([0.1]))
+        self.assertEqual(0., metrics.profit_factor([]))
+        self.assertEqual(0., metrics.win_rate([]))
+
+    def test_exposure_and_turnover(self):
+        positions = [0, 1, 1, 0, 1, 1, 1, 0]
+        self.assertEqual(5 / 8, metrics.exposure(positions))
+        self.assertEqual(4 / 8, metrics.turnover(positions))
+
+    def test_periods_per_year(self):
+        close_times = np.arange(10) * 3600000 + 3599999
+        self.assertEqual(365 * 24, metrics.periods_per_year(close_times))
@@ -0,0 +1,67 @@
+import unittest
+
+from backtest import optimizer
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+
+class OptimizerTest(unittest.TestCase):
+
+    TEST_FILE_PATH = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+
+    def test_parse_param_range(self):
+        self.assertEqual(
+            ("NB_PERIODS", [12, 24, 36]), optimizer.parse_param_range("NB_PERIODS=12:36:12")
+        )
+        self.assertEqual(
+            ("THRESHOLD", [0.0002, 0.0003, 0.0004]),
+            optimizer.parse_param_range("THRESHOLD=0.0002:0.0004:0.0001"),
+        )
+        self.assertEqual(
+            ("THRESHOLD", [0.0002, 0.001]), optimizer.parse_param_range("THRESHOLD=0.0002,0.001")
+        )
+        with self.assertRaises(ValueError):
+            optimizer.parse_param_range("THRESHOLD")
+
+    def test_grid_search_params(self):
+        self.assertEqual(
+            [{"A": 1, "B": 3}, {"A": 1, "B": 4}, {"A": 2, "B": 3}, {"A": 2, "B": 4}],
+            optimizer.grid_search_params({"A": [1, 2], "B": [3, 4]}),
+        )
+
+    def test_random_search_params(self):
+        param_sets = optimizer.random_search_params({"A": [1, 2], "B": [3, 4]}, 5, seed=1)
+        self.assertEqual(5, len(param_sets))
+        for params in param_sets:
+            self.assertIn(params["A"], [1, 2])
+            self.assertIn(params["B"], [3, 4])
+
+    def test_make_strategy(self):
+        strat = optimizer.make_strategy(KlinesAvgLogRatioStrategy, {"NB_PERIODS": 12})
+        self.assertEqual(12, strat.NB_PERIODS)
+        self.assertEqual(72, KlinesAvgLogRatioStrategy.NB_PERIODS)
+        with self.assertRaises(ValueError):
+            optimizer.make_strategy(KlinesAvgLogRatioStrategy, {"UNKNOWN": 12})
+
+    def test_run_sweep(self):
+        param_sets = optimizer.grid_search_params(
+            {"NB_PERIODS": [6, 12], "THRESHOLD": [0.0001, 0.0003]}
+        )
+        results = optimizer.run_sweep(
+            KlinesAvgLogRatioStrategy,
+            param_sets,
+            n_features=20,
+            commission=0.001,
+            file_path=self.TEST_FILE_PATH,
+            max_workers=2,
+        )
+        self.assertEqual(4, len(results))
+        moneys = [result["money"] for result in results]
+        self.assertEqual(sorted(moneys, reverse=True), moneys)
+
+        klines = read_data.read_klines(self.TEST_FILE_PATH)
+        for result in results:
+            expected = optimizer.evaluate(
+                KlinesAvgLogRatioStrategy, result["params"], klines, 20, 0.001
+            )
+            self.assertEqual(expected, result)
@@ -0,0 +1,41 @@
+import unittest
+import shutil
+import os
+
+import numpy as np
+
+from backtest import output
+from backtest.engine import run_backtest
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+
+class OutputTest(unittest.TestCase):
+
+    TEST_FILE_PATH = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+    TEST_OUTPUT_DIR = "data/test_output"
+
+    def tearDown(self):
+        if os.path.isdir(self.TEST_OUTPUT_DIR):
+            shutil.rmtree(self.TEST_OUTPUT_DIR)
+
+    def test_save_and_load_result(self):
+        klines = read_data.read_klines(self.TEST_FILE_PATH)
+        strat = KlinesAvgLogRatioStrategy()
+        strat.NB_PERIODS = 12
+        strat.THRESHOLD = 0.0001
+        result = run_backtest(strat, klines, 20, 0.001)
+        summary = {"money": result.money[-1]}
+
+        output.save_result(self.TEST_OUTPUT_DIR, klines, result, summary)
+        arrays, loaded_summary = output.load_result(self.TEST_OUTPUT_DIR)
+
+        self.assertEqual(summary, loaded_summary)
+        np.testing.assert_array_equal(result.money, arrays["money"])
+        self.assertEqual(len(result.money), len(arrays["money_times"]))
+        self.assertEqual(result.nb_transactions, len(arrays["trade_indices"]))
+        self.assertEqual(result.buy_indices, arrays["trade_indices"][arrays["trade_sides"] == 1].tolist())
+        self.assertEqual(result.sell_times, arrays["trade_times"][arrays["trade_sides"] == -1].tolist())
+        np.testing.assert_array_equal(
+            klines.close_price[arrays["trade_indices"]], arrays["trade_prices"]
+        )
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from backtest.engine import run_backtest
+from backtest.portfolio import align_klines, run_portfolio
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+
+class PortfolioTest(unittest.TestCase):
+
+    TEST_FILE_PATHS = [
+        "test/data/binance_klines_BTCUSDT_1h_1569445200000.json",
+        "test/data/binance_klines_BTCUSDT_1h_1569618000000.json",
+    ]
+
+    def setUp(self):
+        self.klines = read_data.read_klines(self.TEST_FILE_PATHS[0])
+        self.strat = KlinesAvgLogRatioStrategy()
+        self.strat.NB_PERIODS = 12
+        self.strat.THRESHOLD = 0.0001
+
+    def test_align_klines(self):
+        other_klines = read_data.read_klines(self.TEST_FILE_PATHS[1])
+        open_times, indices = align_klines({"A": self.klines, "B": other_klines})
+        self.assertEqual(24, len(open_times))
+        np.testing.assert_array_equal(open_times, self.klines.open_time[indices[0]])
+        np.testing.assert_array_equal(open_times, other_klines.open_time[indices[1]])
+        self.assertEqual(list(range(48, 72)), indices[0].tolist())
+        self.assertEqual(list(range(0, 24)), indices[1].tolist())
+
+    def test_single_symbol(self):
+        result = run_backtest(self.strat, self.klines, 20, 0.001)
+        portfolio = run_portfolio({"A": self.strat}, {"A": self.klines}, 20, 0.001)
+        self.assertEqual(result.nb_transactions, portfolio.nb_transactions[0])
+        compounded = np.prod(1 + np.diff(result.money))
+        last_sell = result.sell_indices[-1]
+        self.assertAlmostEqual(compounded, portfolio.cash[last_sell])
+        self.assertAlmostEqual(compounded, portfolio.equity[last_sell])
+        self.assertAlmostEqual(compounded - 1, portfolio.symbol_profits[last_sell, 0])
+
+    def test_shared_capital(self):
+        single = run_portfolio({"A": self.strat}, {"A": self.klines}, 20, 0.001)
+        portfolio = run_portfolio(
+            {"A": self.strat, "B": self.strat},
+            {"A": self.klines, "B": self.klines},
+            20,
+            0.001,
+        )
+        np.testing.assert_allclose(single.equity, portfolio.equity)
+        np.testing.assert_allclose(
+            single.symbol_profits[:, 0] / 2, portfolio.symbol_profits[:, 1]
+        )
@@ -0,0 +1,56 @@
+import unittest
+
+from backtest import optimizer, walk_forward
+from interface import read_data
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+
+
+class WalkForwardTest(unittest.TestCase):
+
+    TEST_FILE_PATH = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+
+    def test_make_folds(self):
+        self.assertEqual(
+            [(0, 40, 40, 50), (10, 50, 50, 60), (20, 60, 60, 70)],
+            walk_forward.make_folds(72, train_size=40, test_size=10),
+        )
+        self.assertEqual(
+            [(0, 40, 40, 50), (20, 60, 60, 70)],
+            walk_forward.make_folds(72, train_size=40, test_size=10, step=20),
+        )
+        self.assertEqual([], walk_forward.make_folds(30, train_size=40, test_size=10))
+
+    def test_run_walk_forward(self):
+        param_sets = optimizer.grid_search_params(
+            {"NB_PERIODS": [6, 12], "THRESHOLD": [0.0001, 0.0003]}
+        )
+        folds = walk_forward.make_folds(72, train_size=40, test_size=16)
+        fold_results = walk_forward.run_walk_forward(
+            KlinesAvgLogRatioStrategy,
+            param_sets,
+            folds,
+            n_features=20,
+            commission=0.001,
+            file_path=self.TEST_FILE_PATH,
+            max_workers=2,
+        )
+        self.assertEqual([result["fold"] for result in fold_results], folds)
+
+        klines = read_data.read_klines(self.TEST_FILE_PATH)
+        for fold, result in zip(folds, fold_results):
+            self.assertEqual(
+                walk_forward.run_fold(
+                    KlinesAvgLogRatioStrategy, param_sets, klines, fold, 20, 0.001
+                ),
+                result,
+            )
+            train_results = [
+                optimizer.evaluate(
+                    KlinesAvgLogRatioStrategy, params, klines[fold[0]:fold[1]], 20, 0.001
+                )
+                for params in param_sets
+            ]
+            self.assertEqual(
+                max(train_result["money"] for train_result in train_results),
+                result["train_money"],
+            )
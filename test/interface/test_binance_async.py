@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import AsyncMock
+import asyncio
+import time
+
+from interface.binance_async import AsyncBinanceInterface
+from model import Kline
+
+
+class AsyncBinanceInterfaceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_client = AsyncMock()
+        self.binance = AsyncBinanceInterface(self.mock_client)
+        self.kline_data = [
+            1509926400000,
+            "1.50000000",
+            "1.79900000",
+            "0.50000000",
+            "1.54580000",
+            "15425.04000000",
+            1509947999999,
+            "23698.98992800",
+            199,
+        ]
+
+    def test_klines(self):
+        self.mock_client.get_klines.return_value = [self.kline_data]
+        klines = asyncio.run(
+            self.binance.get_klines(limit=1, interval="1h", symbol="BNBBTC")
+        )
+        self.assertEqual([Kline(self.kline_data)], klines)
+        self.mock_client.get_klines.assert_awaited_once_with(
+            symbol="BNBBTC", interval="1h", limit=1, startTime=None, endTime=None
+        )
+
+    def test_klines_error(self):
+        self.mock_client.get_klines.side_effect = ValueError("Not found")
+        self.assertIsNone(
+            asyncio.run(self.binance.get_klines(limit=1, interval="1h", symbol="BNBBTC"))
+        )
+
+    def test_last_price(self):
+        self.mock_client.get_ticker.return_value = {"lastPrice": "95.62"}
+        self.assertEqual(95.62, asyncio.run(self.binance.last_price("BTCUSDT")))
+
+    def test_create_order_immediate(self):
+        mock_order = {"orderId": 153118, "status": "FILLED"}
+        self.mock_client.create_order.return_value = mock_order
+        order = asyncio.run(
+            self.binance.create_order(is_buy=True, quantity=2.5, symbol="BTCUSDT")
+        )
+        self.assertEqual(mock_order, order)
+        self.mock_client.get_order.assert_not_awaited()
+
+    def test_last_trade(self):
+        self.mock_client.get_my_trades.return_value = [
+            {"id": 1, "price": "4.0", "qty": "12.0", "time": 1499865549000, "isBuyer": True},
+            {"id": 2, "price": "4.1", "qty": "2.0", "time": 1499865949000, "isBuyer": False},
+        ]
+        last_trade = asyncio.run(self.binance.last_trade("BTCUSDT"))
+        self.assertEqual(2, last_trade.id)
+        self.mock_client.get_my_trades.return_value = []
+        self.assertIsNone(asyncio.run(self.binance.last_trade("BTCUSDT")))
+
+    def test_server_time_diff(self):
+        self.mock_client.get_server_time.return_value = {"serverTime": time.time() * 1000 + 5000}
+        diff = asyncio.run(self.binance.server_time_diff(nb_samples=2))
+        self.assertAlmostEqual(5000, diff, delta=1000)
+        self.assertEqual(2, self.mock_client.get_server_time.await_count)
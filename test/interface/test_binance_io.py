@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 import os
 import json
+import time
 from datetime import datetime
 
 from interface.binance_io import BinanceInterface
@@ -12,10 +13,14 @@ from interface import read_data
 class BinanceInterfaceTest(unittest.TestCase):
 
     TEST_KLINE_DATA_FILE = "data/binance_klines_DOGEUSDT_2m_1509926400000.json"
+    TEST_KLINE_BINARY_FILE = "data/binance_klines_DOGEUSDT_2m.klines"
+    TEST_KLINE_CONVERTED_FILE = "data/binance_klines_DOGEUSDT_2m_1509926400000.klines"
+    TEST_FILES = [TEST_KLINE_DATA_FILE, TEST_KLINE_BINARY_FILE, TEST_KLINE_CONVERTED_FILE]
 
     def setUp(self):
-        if os.path.isfile(self.TEST_KLINE_DATA_FILE):
-            os.remove(self.TEST_KLINE_DATA_FILE)
+        for file_path in self.TEST_FILES:
+            if os.path.isfile(file_path):
+                os.remove(file_path)
 
         self.mock_client = MagicMock()
         self.binance = BinanceInterface(self.mock_client)
@@ -50,8 +55,9 @@ class BinanceInterfaceTest(unittest.TestCase):
         ]
 
     def tearDown(self):
-        if os.path.isfile(self.TEST_KLINE_DATA_FILE):
-            os.remove(self.TEST_KLINE_DATA_FILE)
+        for file_path in self.TEST_FILES:
+            if os.path.isfile(file_path):
+                os.remove(file_path)
 
     def test_recent_trades(self):
         self.mock_client.get_recent_trades.return_value = [
@@ -114,12 +120,87 @@ class BinanceInterfaceTest(unittest.TestCase):
         kline_data = read_data.read_klines_from_json(self.TEST_KLINE_DATA_FILE)
         self.assertEqual([Kline(self.kline1), Kline(self.kline2)], kline_data)
 
+    def test_update_historical_klines(self):
+        self.mock_client.get_historical_klines_generator.return_value = [self.kline1]
+        self.binance.update_historical_klines(
+            interval="2m", symbol="DOGEUSDT", start_time="2 years ago"
+        )
+        self.mock_client.get_historical_klines_generator.assert_called_with(
+            symbol="DOGEUSDT", interval="2m", start_str="2 years ago"
+        )
+
+        self.mock_client.get_historical_klines_generator.return_value = [self.kline2]
+        self.binance.update_historical_klines(
+            interval="2m", symbol="DOGEUSDT", start_time="2 years ago"
+        )
+        self.mock_client.get_historical_klines_generator.assert_called_with(
+            symbol="DOGEUSDT", interval="2m", start_str=self.kline1[6] + 1
+        )
+
+        kline_data = read_data.read_klines(self.TEST_KLINE_BINARY_FILE)
+        self.assertEqual([Kline(self.kline1), Kline(self.kline2)], kline_data)
+
+    def test_update_historical_klines_resume(self):
+        self.mock_client.get_historical_klines_generator.return_value = [self.kline1]
+        self.binance.update_historical_klines(
+            interval="2m", symbol="DOGEUSDT", start_time="2 years ago"
+        )
+        # Interrupted write of the next record
+        with open(self.TEST_KLINE_BINARY_FILE, "ab") as file:
+            file.write(b"\x00" * 10)
+
+        self.mock_client.get_historical_klines_generator.return_value = [self.kline2]
+        self.binance.update_historical_klines(
+            interval="2m", symbol="DOGEUSDT", start_time=None
+        )
+        kline_data = read_data.read_klines(self.TEST_KLINE_BINARY_FILE)
+        self.assertEqual([Kline(self.kline1), Kline(self.kline2)], kline_data)
+
+    def test_update_converted_klines(self):
+        read_data.write_klines_to_binary(self.TEST_KLINE_CONVERTED_FILE, [Kline(self.kline1)])
+        self.mock_client.get_historical_klines_generator.return_value = [self.kline2]
+        self.binance.update_historical_klines(
+            interval="2m",
+            symbol="DOGEUSDT",
+            start_time=None,
+            file_name=self.TEST_KLINE_CONVERTED_FILE,
+        )
+        self.mock_client.get_historical_klines_generator.assert_called_with(
+            symbol="DOGEUSDT", interval="2m", start_str=self.kline1[6] + 1
+        )
+        kline_data = read_data.read_klines(self.TEST_KLINE_CONVERTED_FILE)
+        self.assertEqual([Kline(self.kline1), Kline(self.kline2)], kline_data)
+        self.assertFalse(os.path.isfile(self.TEST_KLINE_BINARY_FILE))
+
+    def test_update_historical_klines_skips_open_kline(self):
+        open_kline = list(self.kline2)
+        open_kline[6] = int(time.time() * 1000) + 60000
+        self.mock_client.get_historical_klines_generator.return_value = [
+            self.kline1,
+            open_kline,
+        ]
+        self.binance.update_historical_klines(
+            interval="2m", symbol="DOGEUSDT", start_time="2 years ago"
+        )
+        kline_data = read_data.read_klines(self.TEST_KLINE_BINARY_FILE)
+        self.assertEqual([Kline(self.kline1)], kline_data)
+
     def test_last_price(self):
         self.mock_client.get_ticker.return_value = {"lastPrice": 95.62}
         last_price = self.binance.last_price("BTCUSDT")
         self.assertEqual(95.62, last_price)
         self.mock_client.get_ticker.assert_called_once_with(symbol="BTCUSDT")
 
+    @patch("interface.binance_io.time.time")
+    def test_server_time_diff(self, mock_time):
+        # Round trips of 400 ms, then 100 ms
+        mock_time.side_effect = [1000.0, 1000.4, 1001.0, 1001.1]
+        self.mock_client.get_server_time.side_effect = [
+            {"serverTime": 1000300},
+            {"serverTime": 1001150},
+        ]
+        self.assertEqual(100.0, self.binance.server_time_diff(nb_samples=2))
+
     def test_create_order_immediate(self):
         mock_order = {"orderId": 153118, "status": "FILLED"}
         self.mock_client.create_order.return_value = mock_order
@@ -147,6 +228,20 @@ class BinanceInterfaceTest(unittest.TestCase):
         )
         self.mock_client.get_order.assert_called_with(symbol="BTCUSDT", orderId=153118)
 
+    def test_create_order_delay_fills(self):
+        mock_order_pending = {"orderId": 153118, "status": "NEW"}
+        mock_order_filled = {
+            "orderId": 153118,
+            "status": "FILLED",
+            "executedQty": "2.50000000",
+            "cummulativeQuoteQty": "10.00000000",
+        }
+        self.mock_client.create_order.return_value = mock_order_pending
+        self.mock_client.get_order.return_value = mock_order_filled
+        order = self.binance.create_order(is_buy=True, quantity=2.5, symbol="BTCUSDT")
+        self.assertEqual(4.0, float(order["fills"][0]["price"]))
+        self.mock_client.get_order.assert_called_once_with(symbol="BTCUSDT", orderId=153118)
+
     def test_create_order_failure(self):
         mock_order_failure = {"status": "FAIL"}
         self.mock_client.create_order.return_value = mock_order_failure
@@ -235,7 +330,7 @@ class BinanceInterfaceTest(unittest.TestCase):
         }
         self.mock_client.get_my_trades.return_value = [mock_trade]
         last_trade = self.binance.last_trade(symbol="BTCUSDT")
-        self.mock_client.get_my_trades.assert_called_with(symbol="BTCUSDT")
+        self.mock_client.get_my_trades.assert_called_once_with(symbol="BTCUSDT")
         self.assertEqual(float(mock_trade["price"]), last_trade.price)
         self.assertEqual(mock_trade["isBuyer"], last_trade.is_buy)
         self.assertEqual(mock_trade["time"] / 1000.0, last_trade.time)
@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timezone
+
+from interface.candle_clock import CandleClock, interval_ms, next_open_time
+
+
+def timestamp_ms(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class CandleClockTest(unittest.TestCase):
+
+    def test_interval_ms(self):
+        self.assertEqual(60000, interval_ms("1m"))
+        self.assertEqual(4 * 3600000, interval_ms("4h"))
+        self.assertEqual(3 * 86400000, interval_ms("3d"))
+        with self.assertRaises(ValueError):
+            interval_ms("1M")
+        with self.assertRaises(ValueError):
+            interval_ms("h")
+
+    def test_next_open_time(self):
+        now = timestamp_ms(2020, 3, 11, 13, 42, 5)
+        self.assertEqual(timestamp_ms(2020, 3, 11, 13, 45), next_open_time(now, "15m"))
+        self.assertEqual(timestamp_ms(2020, 3, 11, 14), next_open_time(now, "1h"))
+        self.assertEqual(timestamp_ms(2020, 3, 11, 16), next_open_time(now, "4h"))
+        self.assertEqual(timestamp_ms(2020, 3, 12), next_open_time(now, "1d"))
+        # Weekly klines open on Monday
+        self.assertEqual(timestamp_ms(2020, 3, 16), next_open_time(now, "1w"))
+
+    def test_next_open_time_on_boundary(self):
+        boundary = timestamp_ms(2020, 3, 11, 14)
+        self.assertEqual(boundary + 3600000, next_open_time(boundary, "1h"))
+
+    @patch("interface.candle_clock.time.sleep")
+    @patch("interface.candle_clock.time.time")
+    def test_wait_for_close(self, mock_time, mock_sleep):
+        # Local clock 2 s behind the server
+        mock_time.return_value = timestamp_ms(2020, 3, 11, 13, 59, 50) / 1000
+        clock = CandleClock("1h", time_offset=2000, guard=0.5)
+        self.assertEqual(timestamp_ms(2020, 3, 11, 14), clock.wait_for_close())
+        mock_sleep.assert_called_once_with(8.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
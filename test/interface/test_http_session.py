@@ -0,0 +1,76 @@
+import unittest
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from binance.client import Client
+
+from interface import http_session
+from interface.binance_io import BinanceInterface
+from interface.rate_limiter import RequestScheduler
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Binance REST stub answering every GET with a ticker"""
+
+    protocol_version = "HTTP/1.1"
+    DELAY = 0.2
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        time.sleep(self.DELAY)
+        body = json.dumps({"symbol": "BTCUSDT", "lastPrice": "8000.5"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-mbx-used-weight-1m", "42")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.client_ports = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stub_binance(self):
+        client = http_session.use_pooled_session(Client("key", "secret", ping=False))
+        client.API_URL = self.url + "/api"
+        return BinanceInterface(client, scheduler=RequestScheduler())
+
+    def test_connection_reuse(self):
+        session = http_session.pooled_session()
+        for _ in range(3):
+            self.assertEqual("8000.5", session.get(self.url + "/ticker", timeout=http_session.TIMEOUT).json()["lastPrice"])
+        self.assertEqual(1, len(self.server.client_ports))
+
+    def test_client_session(self):
+        binance = self.stub_binance()
+        self.assertEqual("key", binance.client.session.headers["X-MBX-APIKEY"])
+        self.assertEqual(8000.5, binance.last_price("BTCUSDT"))
+        self.assertEqual(8000.5, binance.last_price("BTCUSDT"))
+        self.assertEqual(1, len(self.server.client_ports))
+        self.assertAlmostEqual(binance.scheduler.capacity - 42, binance.scheduler.tokens, delta=1)
+
+    def test_run_concurrently(self):
+        binance = self.stub_binance()
+        begin_time = time.time()
+        prices = http_session.run_concurrently(*[(binance.last_price, "BTCUSDT")] * 4)
+        self.assertEqual([8000.5] * 4, prices)
+        self.assertLess(time.time() - begin_time, 3 * StubHandler.DELAY)
+
+
+if __name__ == '__main__':
+    unittest.main()
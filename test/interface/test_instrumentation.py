@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import MagicMock
+import json
+import os
+import timeit
+import urllib.request
+
+from interface import instrumentation
+from interface.binance_io import BinanceInterface
+from interface.instrumentation import Metrics, NullMetrics
+from interface.rate_limiter import RequestScheduler
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    TEST_METRICS_FILE = "test_output_metrics.json"
+
+    def tearDown(self):
+        instrumentation.disable()
+        if os.path.isfile(self.TEST_METRICS_FILE):
+            os.remove(self.TEST_METRICS_FILE)
+
+    def test_histogram(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        for value in [0.05, 0.1, 0.5, 2]:
+            metrics.observe("stage_seconds", value, stage="get_klines")
+        histogram = metrics.histograms[("stage_seconds", (("stage", "get_klines"),))]
+        self.assertEqual([2, 1, 1], histogram.counts)
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+
+    def test_timer(self):
+        metrics = Metrics()
+        with metrics.timer("stage_seconds", stage="decide_action"):
+            pass
+        with self.assertRaises(ValueError):
+            with metrics.timer("stage_seconds", stage="decide_action"):
+                raise ValueError()
+        self.assertEqual(2, metrics.histograms[("stage_seconds", (("stage", "decide_action"),))].count)
+
+    def test_prometheus_text(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.observe("stage_seconds", 0.5, stage="save_state")
+        metrics.increment("errors_total", method="get_klines")
+        metrics.increment("errors_total", method="get_klines")
+        self.assertEqual(
+            '# TYPE stage_seconds histogram\n'
+            'stage_seconds_bucket{stage="save_state",le="0.1"} 0\n'
+            'stage_seconds_bucket{stage="save_state",le="1"} 1\n'
+            'stage_seconds_bucket{stage="save_state",le="+Inf"} 1\n'
+            'stage_seconds_sum{stage="save_state"} 0.5\n'
+            'stage_seconds_count{stage="save_state"} 1\n'
+            '# TYPE errors_total counter\n'
+            'errors_total{method="get_klines"} 2\n',
+            metrics.prometheus_text(),
+        )
+
+    def test_dump(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.observe("stage_seconds", 0.5, stage="save_state")
+        metrics.dump(self.TEST_METRICS_FILE)
+        with open(self.TEST_METRICS_FILE) as file:
+            data = json.load(file)
+        self.assertEqual(
+            [{"name": "stage_seconds", "labels": {"stage": "save_state"},
+              "buckets": {"0.1": 0, "1": 1, "+Inf": 0}, "sum": 0.5, "count": 1}],
+            data["histograms"],
+        )
+
+    def test_serve(self):
+        metrics = Metrics()
+        metrics.increment("errors_total")
+        server = metrics.serve(0, host="127.0.0.1")
+        try:
+            url = "http://127.0.0.1:{}/metrics".format(server.server_address[1])
+            with urllib.request.urlopen(url) as response:
+                self.assertIn("errors_total 1", response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_disabled_overhead(self):
+        metrics = NullMetrics()
+
+        def timed_stage():
+            with metrics.timer("stage_seconds", stage="get_klines"):
+                pass
+
+        duration = min(timeit.repeat(timed_stage, number=10000, repeat=5)) / 10000
+        self.assertLess(duration, 1e-6)
+
+    def test_binance_requests(self):
+        metrics = instrumentation.enable()
+        client = MagicMock()
+        client.get_ticker.return_value = {"lastPrice": "1.5"}
+        binance = BinanceInterface(client, scheduler=RequestScheduler())
+        binance.last_price("BTCUSDT")
+        client.get_ticker.side_effect = ValueError()
+        self.assertIsNone(binance.last_price("BTCUSDT"))
+        self.assertEqual(2, metrics.histograms[("binance_request_seconds", (("method", "get_ticker"),))].count)
+        self.assertEqual(1, metrics.counters[("binance_request_errors_total", (("method", "get_ticker"),))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+import time
+
+from interface.kline_cache import KlineCache, AsyncKlineCache
+from model import Kline
+
+INTERVAL_MS = 60000
+
+
+class KlineCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        # Kline 9 is still open
+        self.first_open_time = (int(time.time() * 1000) // INTERVAL_MS - 9) * INTERVAL_MS
+        self.fetch = MagicMock(side_effect=self.klines_from_server)
+        self.nb_klines = 10
+
+    def kline(self, k):
+        open_time = self.first_open_time + k * INTERVAL_MS
+        return Kline([open_time, "1.0", "2.0", "0.5", str(k), "10.0",
+                      open_time + INTERVAL_MS - 1, "15.0", 3])
+
+    def klines_from_server(self, limit, interval, symbol, start_time=None):
+        klines = [self.kline(k) for k in range(self.nb_klines)]
+        if start_time is not None:
+            klines = [kline for kline in klines if kline.open_time >= start_time]
+        return klines[:limit] if start_time is not None else klines[-limit:]
+
+    def test_first_fetch(self):
+        cache = KlineCache(self.fetch)
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        self.assertEqual([self.kline(k) for k in range(5, 10)], klines)
+        self.fetch.assert_called_once_with(limit=5, interval="1m", symbol="BTCUSDT")
+
+    def test_reuse_within_max_age(self):
+        cache = KlineCache(self.fetch)
+        cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        klines = cache.get_klines(limit=3, interval="1m", symbol="BTCUSDT")
+        self.assertEqual([self.kline(k) for k in range(7, 10)], klines)
+        self.assertEqual(1, self.fetch.call_count)
+
+    def test_refresh_tail_only(self):
+        cache = KlineCache(self.fetch, max_age=0.)
+        cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        self.assertEqual([self.kline(k) for k in range(5, 10)], klines)
+        self.fetch.assert_called_with(
+            limit=KlineCache.TAIL_LIMIT,
+            interval="1m",
+            symbol="BTCUSDT",
+            start_time=self.kline(8).open_time,
+        )
+
+    def test_closed_only(self):
+        cache = KlineCache(self.fetch, max_age=0.)
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT", closed_only=True)
+        self.assertEqual([self.kline(k) for k in range(4, 9)], klines)
+        self.fetch.assert_called_once_with(limit=6, interval="1m", symbol="BTCUSDT")
+
+    def test_keys_are_separate(self):
+        cache = KlineCache(self.fetch)
+        cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        cache.get_klines(limit=5, interval="1m", symbol="ETHUSDT")
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_fetch_error(self):
+        self.fetch.side_effect = None
+        self.fetch.return_value = None
+        cache = KlineCache(self.fetch)
+        self.assertIsNone(cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT"))
+
+    def test_refresh_error(self):
+        cache = KlineCache(self.fetch, max_age=0.)
+        cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")
+        self.fetch.side_effect = None
+        self.fetch.return_value = None
+        self.assertIsNone(cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT"))
+
+    def test_replace_partial_kline(self):
+        # Server time overestimated by one minute: open kline 9 is stored as closed
+        cache = KlineCache(self.fetch, max_age=0., time_offset=INTERVAL_MS)
+        cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT", closed_only=True)
+        final_kline = Kline([self.kline(9).open_time, "1.0", "2.0", "0.5", "42", "10.0",
+                             self.kline(9).close_time, "15.0", 3])
+        self.fetch.side_effect = lambda **kwargs: [
+            final_kline if kline.open_time == final_kline.open_time else kline
+            for kline in self.klines_from_server(**kwargs)
+        ]
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT", closed_only=True)
+        self.assertEqual(42., klines[-1].close_price)
+        self.assertEqual([k.open_time for k in klines], sorted(set(k.open_time for k in klines)))
+
+    def test_server_time(self):
+        # Server clock one minute behind the local one: kline 8 is still open
+        cache = KlineCache(self.fetch, time_offset=-INTERVAL_MS)
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT", closed_only=True)
+        self.assertEqual(self.kline(7), klines[-1])
+        cache = KlineCache(self.fetch, time_offset=0.)
+        klines = cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT", closed_only=True)
+        self.assertEqual(self.kline(8), klines[-1])
+
+    def test_async_fetch_error(self):
+        async def fetch(**kwargs):
+            return None
+
+        cache = AsyncKlineCache(fetch)
+        self.assertIsNone(asyncio.run(cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT")))
+
+    def test_async_coalescing(self):
+        calls = []
+
+        async def fetch(**kwargs):
+            calls.append(kwargs)
+            await asyncio.sleep(0.01)
+            return self.klines_from_server(**kwargs)
+
+        cache = AsyncKlineCache(fetch)
+
+        async def run():
+            return await asyncio.gather(
+                *(cache.get_klines(limit=5, interval="1m", symbol="BTCUSDT") for _ in range(3))
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(1, len(calls))
+        for klines in results:
+            self.assertEqual([self.kline(k) for k in range(5, 10)], klines)
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+from http import HTTPStatus
+import json
+import time
+
+import websockets
+
+from interface.kline_stream import KlineStream
+from model import Kline
+
+
+def kline_data(k):
+    return [k * 60000, "1.0", "2.0", "0.5", str(1.0 + k), "10.0", k * 60000 + 59999, "15.0", 3]
+
+
+def kline_message(k, is_closed=True):
+    data = kline_data(k)
+    return json.dumps(
+        {
+            "e": "kline",
+            "s": "BTCUSDT",
+            "k": {
+                "t": data[0],
+                "T": data[6],
+                "o": data[1],
+                "h": data[2],
+                "l": data[3],
+                "c": data[4],
+                "v": data[5],
+                "q": data[7],
+                "n": data[8],
+                "x": is_closed,
+            },
+        }
+    )
+
+
+class KlineStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.binance = MagicMock()
+        self.binance.get_klines.return_value = [Kline(kline_data(k)) for k in range(5)]
+        self.stream = KlineStream(self.binance, "BTCUSDT", "1m", size=3, url="ws://localhost")
+
+    def test_backfill(self):
+        self.stream.backfill()
+        self.binance.get_klines.assert_called_once_with(
+            limit=4, interval="1m", symbol="BTCUSDT"
+        )
+        self.assertEqual([Kline(kline_data(k)) for k in range(2, 5)], self.stream.klines())
+
+    def test_apply(self):
+        self.stream.backfill()
+        self.assertFalse(asyncio.run(self.stream.apply(kline_message(5, is_closed=False))))
+        self.assertFalse(asyncio.run(self.stream.apply(kline_message(4))))
+        self.assertTrue(asyncio.run(self.stream.apply(kline_message(5))))
+        self.assertEqual([Kline(kline_data(k)) for k in range(3, 6)], self.stream.klines())
+
+    def test_apply_gap(self):
+        self.stream.backfill()
+        self.binance.get_klines.return_value = [Kline(kline_data(k)) for k in range(8)]
+        self.assertTrue(asyncio.run(self.stream.apply(kline_message(7))))
+        self.assertEqual(2, self.binance.get_klines.call_count)
+        self.assertEqual([Kline(kline_data(k)) for k in range(5, 8)], self.stream.klines())
+
+    def test_backfill_server_time(self):
+        self.binance.get_klines.return_value = [Kline(kline_data(k)) for k in range(3)]
+        # Server clock at the close of kline 1, which the local clock is far beyond
+        self.stream.time_offset = 2 * 60000 - time.time() * 1000
+        self.stream.backfill()
+        self.assertEqual([Kline(kline_data(k)) for k in range(2)], self.stream.klines())
+
+    def test_run_survives_backfill_error(self):
+        self.binance.get_klines.return_value = None
+        self.stream.RECONNECT_DELAY = 0
+        nb_connections = 0
+
+        async def handler(websocket):
+            nonlocal nb_connections
+            nb_connections += 1
+            await websocket.wait_closed()
+
+        async def run():
+            async with websockets.serve(handler, "localhost", 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                self.stream.url = "ws://localhost:{}".format(port)
+                task = asyncio.create_task(self.stream.run(None))
+                while nb_connections < 2:
+                    self.assertFalse(task.done())
+                    await asyncio.sleep(0.01)
+                task.cancel()
+
+        with self.assertLogs(level="ERROR"):
+            asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertGreaterEqual(self.binance.get_klines.call_count, 2)
+
+    def test_run_survives_rejected_handshake(self):
+        self.stream.RECONNECT_DELAY = 0
+        nb_requests = 0
+
+        def reject(connection, request):
+            nonlocal nb_requests
+            nb_requests += 1
+            return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "Unavailable\n")
+
+        async def handler(websocket):
+            await websocket.wait_closed()
+
+        async def run():
+            async with websockets.serve(handler, "localhost", 0, process_request=reject) as server:
+                port = server.sockets[0].getsockname()[1]
+                self.stream.url = "ws://localhost:{}".format(port)
+                task = asyncio.create_task(self.stream.run(None))
+                while nb_requests < 2:
+                    self.assertFalse(task.done())
+                    await asyncio.sleep(0.01)
+                task.cancel()
+
+        with self.assertLogs(level="ERROR"):
+            asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.binance.get_klines.assert_not_called()
+
+    def test_run_with_local_server(self):
+        async def handler(websocket):
+            for message in [kline_message(5, is_closed=False), kline_message(5), kline_message(6)]:
+                await websocket.send(message)
+            await websocket.wait_closed()
+
+        windows = []
+        done = asyncio.Event()
+
+        async def on_close(klines):
+            windows.append([kline.open_time for kline in klines])
+            if len(windows) == 2:
+                done.set()
+
+        async def run():
+            async with websockets.serve(handler, "localhost", 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                self.stream.url = "ws://localhost:{}".format(port)
+                task = asyncio.create_task(self.stream.run(on_close))
+                await asyncio.wait_for(done.wait(), timeout=5)
+                task.cancel()
+
+        asyncio.run(run())
+        self.assertEqual([[180000, 240000, 300000], [240000, 300000, 360000]], windows)
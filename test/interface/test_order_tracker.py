@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import AsyncMock
+import asyncio
+from http import HTTPStatus
+import json
+
+import websockets
+
+from interface.order_tracker import OrderTracker
+
+
+def execution_report(order_id, status="FILLED"):
+    return {
+        "e": "executionReport",
+        "s": "BTCUSDT",
+        "i": order_id,
+        "X": status,
+        "z": "2.00000000",
+        "Z": "8.02000000",
+    }
+
+
+class OrderTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_client = AsyncMock()
+        self.mock_client.create_order.return_value = {"orderId": 153118, "status": "NEW"}
+        self.mock_client.get_order.return_value = {"orderId": 153118, "status": "NEW"}
+        self.tracker = OrderTracker(self.mock_client)
+        self.tracker.POLL_DELAY = 0.01
+
+    def test_immediate_fill(self):
+        mock_order = {"orderId": 153118, "status": "FILLED", "fills": [{"price": "4.0"}]}
+        self.mock_client.create_order.return_value = mock_order
+        order = asyncio.run(self.tracker.execute(is_buy=True, quantity=2.0, symbol="BTCUSDT"))
+        self.assertEqual(mock_order, order)
+        self.mock_client.create_order.assert_awaited_once_with(
+            symbol="BTCUSDT", side="BUY", type="MARKET", quantity=2.0
+        )
+
+    def test_fill_from_stream_event(self):
+        self.tracker.POLL_DELAY = 10
+
+        async def run():
+            future = self.tracker.submit(is_buy=False, quantity=2.0, symbol="BTCUSDT")
+            await asyncio.sleep(0.01)
+            self.tracker.handle_event(execution_report(153118, "PARTIALLY_FILLED"))
+            self.assertFalse(future.done())
+            self.tracker.handle_event(execution_report(153118))
+            return await future
+
+        order = asyncio.run(run())
+        self.assertEqual("FILLED", order["status"])
+        self.assertEqual(4.01, float(order["fills"][0]["price"]))
+        self.mock_client.get_order.assert_not_awaited()
+        self.assertEqual({}, self.tracker.waiters)
+
+    def test_fill_before_registration(self):
+        self.tracker.handle_event(execution_report(153118))
+        order = asyncio.run(self.tracker.execute(is_buy=True, quantity=2.0, symbol="BTCUSDT"))
+        self.assertEqual(153118, order["orderId"])
+        self.assertEqual({}, self.tracker.unclaimed_fills)
+
+    def test_fill_from_rest_fallback(self):
+        self.mock_client.get_order.side_effect = [
+            {"orderId": 153118, "status": "NEW"},
+            {
+                "orderId": 153118,
+                "status": "FILLED",
+                "executedQty": "2.00000000",
+                "cummulativeQuoteQty": "8.00000000",
+            },
+        ]
+        callback_orders = []
+
+        async def run():
+            future = self.tracker.submit(
+                is_buy=True,
+                quantity=2.0,
+                symbol="BTCUSDT",
+                callback=lambda done: callback_orders.append(done.result()),
+            )
+            return await future
+
+        order = asyncio.run(run())
+        self.assertEqual(4.0, float(order["fills"][0]["price"]))
+        self.assertEqual(2, self.mock_client.get_order.await_count)
+        self.mock_client.get_order.assert_awaited_with(symbol="BTCUSDT", orderId=153118)
+        self.assertEqual([order], callback_orders)
+
+    def test_timeout(self):
+        self.tracker.TIMEOUT = 0.05
+        with self.assertLogs(level="ERROR"):
+            order = asyncio.run(self.tracker.execute(is_buy=True, quantity=2.0, symbol="BTCUSDT"))
+        self.assertEqual("NEW", order["status"])
+        self.assertEqual({}, self.tracker.waiters)
+
+    def test_fill_found_after_timeout(self):
+        self.tracker.TIMEOUT = 0.05
+        self.tracker.POLL_DELAY = 10
+        self.mock_client.get_order.return_value = {
+            "orderId": 153118,
+            "status": "FILLED",
+            "executedQty": "2.00000000",
+            "cummulativeQuoteQty": "8.00000000",
+        }
+        with self.assertLogs(level="ERROR"):
+            order = asyncio.run(self.tracker.execute(is_buy=True, quantity=2.0, symbol="BTCUSDT"))
+        self.assertEqual(4.0, float(order["fills"][0]["price"]))
+        self.mock_client.get_order.assert_awaited_once_with(symbol="BTCUSDT", orderId=153118)
+
+    def test_user_stream_with_local_server(self):
+        self.tracker.POLL_DELAY = 10
+
+        async def handler(websocket):
+            await asyncio.sleep(0.05)
+            await websocket.send(json.dumps(execution_report(153118)))
+            await websocket.wait_closed()
+
+        async def run():
+            async with websockets.serve(handler, "localhost", 0) as server:
+                self.tracker.url = "ws://localhost:{}".format(server.sockets[0].getsockname()[1])
+                await self.tracker.start()
+                order = await self.tracker.submit(is_buy=True, quantity=2.0, symbol="BTCUSDT")
+                await self.tracker.stop()
+                return order
+
+        order = asyncio.run(run())
+        self.assertEqual("FILLED", order["status"])
+        self.mock_client.stream_get_listen_key.assert_not_awaited()
+
+    def test_user_stream_renews_listen_key(self):
+        self.tracker.POLL_DELAY = 10
+        self.tracker.RECONNECT_DELAY = 0
+        self.mock_client.stream_get_listen_key.side_effect = ["expired", "renewed"]
+
+        def reject_expired_key(connection, request):
+            if request.path == "/expired":
+                return connection.respond(HTTPStatus.BAD_REQUEST, "Invalid listen key\n")
+
+        async def handler(websocket):
+            await asyncio.sleep(0.05)
+            await websocket.send("not json")
+            await websocket.send(json.dumps({"e": "executionReport", "X": "FILLED"}))
+            await websocket.send(json.dumps(execution_report(153118)))
+            await websocket.wait_closed()
+
+        async def run():
+            async with websockets.serve(
+                handler, "localhost", 0, process_request=reject_expired_key
+            ) as server:
+                port = server.sockets[0].getsockname()[1]
+                self.tracker.USER_STREAM_URL = "ws://localhost:{}/{{}}".format(port)
+                await self.tracker.start()
+                order = await self.tracker.submit(is_buy=True, quantity=2.0, symbol="BTCUSDT")
+                await self.tracker.stop()
+                return order
+
+        with self.assertLogs(level="ERROR") as logs:
+            order = asyncio.run(run())
+        self.assertEqual("FILLED", order["status"])
+        self.mock_client.get_order.assert_not_awaited()
+        self.assertEqual(2, self.mock_client.stream_get_listen_key.await_count)
+        self.assertEqual(3, len(logs.records))
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+
+from binance.exceptions import BinanceAPIException
+
+from interface.rate_limiter import RequestScheduler
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+
+class RequestSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        # Capacity of 48 weight, refilled at 0.8 per second
+        self.scheduler = RequestScheduler(weight_limit=60, clock=self.clock)
+
+    def test_acquire_within_budget(self):
+        entry = self.scheduler.enqueue(RequestScheduler.PRIORITY_ORDER)
+        self.assertEqual(0., self.scheduler.try_acquire(entry, 20, RequestScheduler.PRIORITY_ORDER))
+        self.assertAlmostEqual(28., self.scheduler.tokens)
+        self.assertEqual([], self.scheduler.waiting)
+
+    def test_wait_for_refill(self):
+        self.scheduler.tokens = 10.
+        entry = self.scheduler.enqueue(RequestScheduler.PRIORITY_ORDER)
+        self.assertAlmostEqual(12.5, self.scheduler.try_acquire(entry, 20, RequestScheduler.PRIORITY_ORDER))
+        self.clock.now += 12.5
+        self.assertEqual(0., self.scheduler.try_acquire(entry, 20, RequestScheduler.PRIORITY_ORDER))
+
+    def test_reserve_for_orders(self):
+        self.scheduler.tokens = 20.
+        analytics = self.scheduler.enqueue(RequestScheduler.PRIORITY_ANALYTICS)
+        # 40% of the budget is reserved for higher priorities
+        self.assertGreater(self.scheduler.try_acquire(analytics, 5, RequestScheduler.PRIORITY_ANALYTICS), 0.)
+        self.scheduler.dequeue(analytics)
+        order = self.scheduler.enqueue(RequestScheduler.PRIORITY_ORDER)
+        self.assertEqual(0., self.scheduler.try_acquire(order, 5, RequestScheduler.PRIORITY_ORDER))
+
+    def test_priority_order(self):
+        analytics = self.scheduler.enqueue(RequestScheduler.PRIORITY_ANALYTICS)
+        order = self.scheduler.enqueue(RequestScheduler.PRIORITY_ORDER)
+        self.assertGreater(self.scheduler.try_acquire(analytics, 1, RequestScheduler.PRIORITY_ANALYTICS), 0.)
+        self.assertEqual(0., self.scheduler.try_acquire(order, 1, RequestScheduler.PRIORITY_ORDER))
+        self.assertEqual(0., self.scheduler.try_acquire(analytics, 1, RequestScheduler.PRIORITY_ANALYTICS))
+
+    def test_update_used_weight(self):
+        self.scheduler.update_used_weight(MagicMock(headers={"x-mbx-used-weight-1m": "40"}))
+        self.assertAlmostEqual(8., self.scheduler.tokens)
+        self.scheduler.update_used_weight(MagicMock(headers={}))
+        self.assertAlmostEqual(8., self.scheduler.tokens)
+
+    def test_call_rate_limited(self):
+        response = MagicMock(status_code=429, headers={"Retry-After": "30"}, text='{"code": -1003, "msg": "Too many requests"}')
+        client = MagicMock()
+        client.get_klines.side_effect = BinanceAPIException(response, 429, response.text)
+        with self.assertRaises(BinanceAPIException):
+            self.scheduler.call(client, RequestScheduler.PRIORITY_MARKET, "get_klines", symbol="BTCUSDT")
+        entry = self.scheduler.enqueue(RequestScheduler.PRIORITY_ORDER)
+        self.assertAlmostEqual(30., self.scheduler.try_acquire(entry, 1, RequestScheduler.PRIORITY_ORDER))
+
+    def test_call_async(self):
+        client = MagicMock()
+        client.response = MagicMock(headers={"x-mbx-used-weight-1m": "10"})
+
+        async def get_ticker(symbol):
+            return {"lastPrice": "1.0"}
+
+        client.get_ticker = get_ticker
+        ticker = asyncio.run(self.scheduler.call_async(client, RequestScheduler.PRIORITY_MARKET, "get_ticker", symbol="BTCUSDT"))
+        self.assertEqual({"lastPrice": "1.0"}, ticker)
+        self.assertAlmostEqual(38., self.scheduler.tokens)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+
+import numpy as np
+
+from interface import read_data
+
+
+class ReadDataTest(unittest.TestCase):
+
+    TEST_JSON_FILE = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+    TEST_BINARY_FILE = "data/binance_klines_BTCUSDT_1h_test.klines"
+
+    def tearDown(self):
+        if os.path.isfile(self.TEST_BINARY_FILE):
+            os.remove(self.TEST_BINARY_FILE)
+
+    def test_binary_round_trip(self):
+        klines = read_data.read_klines_from_json(self.TEST_JSON_FILE)
+        read_data.write_klines_to_binary(self.TEST_BINARY_FILE, klines)
+        self.assertEqual(
+            read_data.KLINE_FILE_DATA_OFFSET + 72 * 9 * 8,
+            os.path.getsize(self.TEST_BINARY_FILE),
+        )
+        binary_klines = read_data.read_klines(self.TEST_BINARY_FILE)
+        self.assertIsInstance(binary_klines.close_price, np.memmap)
+        self.assertTrue(binary_klines.close_price.flags["C_CONTIGUOUS"])
+        self.assertEqual(klines, binary_klines)
+        self.assertEqual(klines[10], binary_klines[10])
+
+    def test_binary_append(self):
+        klines = read_data.read_klines_from_json(self.TEST_JSON_FILE)
+        read_data.write_klines_to_binary(self.TEST_BINARY_FILE, klines[:10])
+        with read_data.open_binary_klines_for_append(self.TEST_BINARY_FILE) as writer:
+            read_data.append_klines_to_binary(writer, klines[10:40])
+            read_data.append_klines_to_binary(writer, klines[40:])
+        self.assertEqual(read_data.KLINE_FILE_MIN_CAPACITY, writer.capacity)
+        binary_klines = read_data.read_klines(self.TEST_BINARY_FILE)
+        self.assertEqual(klines, binary_klines)
+        self.assertTrue(binary_klines.open_time.flags["C_CONTIGUOUS"])
+
+    def test_binary_interrupted_append(self):
+        klines = read_data.read_klines_from_json(self.TEST_JSON_FILE)
+        read_data.write_klines_to_binary(self.TEST_BINARY_FILE, klines[:10], capacity=20)
+        # Values written past the last kline, without the count being updated
+        with open(self.TEST_BINARY_FILE, "r+b") as file:
+            file.seek(read_data.KLINE_FILE_DATA_OFFSET + 10 * 8)
+            file.write(b"\xff" * 16)
+        self.assertEqual(klines[:10], read_data.read_klines(self.TEST_BINARY_FILE))
+        with read_data.open_binary_klines_for_append(self.TEST_BINARY_FILE) as writer:
+            read_data.append_klines_to_binary(writer, klines[10:])
+        self.assertEqual(klines, read_data.read_klines(self.TEST_BINARY_FILE))
+
+    def test_binary_empty(self):
+        read_data.write_klines_to_binary(self.TEST_BINARY_FILE, [])
+        self.assertEqual(0, len(read_data.read_klines(self.TEST_BINARY_FILE)))
+
+    def test_binary_invalid_header(self):
+        with open(self.TEST_BINARY_FILE, "wb") as file:
+            file.write(b"[]")
+        with self.assertRaises(ValueError):
+            read_data.read_klines_from_binary(self.TEST_BINARY_FILE)
@@ -0,0 +1,123 @@
+import unittest
+import json
+import os
+import shutil
+
+from interface.state_journal import StateJournal
+
+
+class StateJournalTest(unittest.TestCase):
+
+    TEST_DIRECTORY = "test_output_state"
+    SNAPSHOT_FILE = os.path.join(TEST_DIRECTORY, "btcusdt.json")
+    JOURNAL_FILE = os.path.join(TEST_DIRECTORY, "btcusdt.journal")
+
+    def setUp(self):
+        shutil.rmtree(self.TEST_DIRECTORY, ignore_errors=True)
+        self.state = {
+            "symbol": "BTCUSDT",
+            "profit": 0.0,
+            "previous_price": float("inf"),
+            "nb_transactions": 0,
+            "acquired": None,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.TEST_DIRECTORY, ignore_errors=True)
+
+    def buy(self, price):
+        self.state["previous_price"] = price
+        self.state["nb_transactions"] += 1
+        self.state["acquired"] = 1.0 / price
+        self.state["profit"] -= 1.0
+
+    def test_load_missing(self):
+        self.assertIsNone(StateJournal(self.SNAPSHOT_FILE).load())
+
+    def test_replay(self):
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.load()
+        journal.save(self.state)
+        self.buy(100.0)
+        journal.save(self.state)
+        journal.close()
+        self.assertEqual(self.state, StateJournal(self.SNAPSHOT_FILE).load())
+
+    def test_save_changes_only(self):
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.save(self.state)
+        journal.save(self.state)
+        self.buy(100.0)
+        journal.save(self.state)
+        journal.close()
+        with open(self.JOURNAL_FILE) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(2, len(records))
+        self.assertNotIn("symbol", records[1])
+        self.assertEqual(1, records[1]["nb_transactions"])
+
+    def test_torn_record(self):
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.save(self.state)
+        journal.close()
+        expected = dict(self.state)
+        with open(self.JOURNAL_FILE, "a") as file:
+            file.write('{"profit": -1.0, "nb_tr')
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        self.assertEqual(expected, journal.load())
+        self.buy(100.0)
+        journal.save(self.state)
+        journal.close()
+        self.assertEqual(self.state, StateJournal(self.SNAPSHOT_FILE).load())
+
+    def test_record_without_newline(self):
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.save(self.state)
+        journal.close()
+        expected = dict(self.state)
+        with open(self.JOURNAL_FILE, "a") as file:
+            file.write('{"profit": -1.0}')
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        self.assertEqual(expected, journal.load())
+        self.buy(100.0)
+        journal.save(self.state)
+        self.buy(200.0)
+        journal.save(self.state)
+        journal.close()
+        self.assertEqual(self.state, StateJournal(self.SNAPSHOT_FILE).load())
+
+    def test_compaction(self):
+        journal = StateJournal(self.SNAPSHOT_FILE, compact_every=3)
+        journal.save(self.state)
+        self.buy(100.0)
+        journal.save(self.state)
+        self.buy(200.0)
+        journal.save(self.state)
+        self.assertEqual(0, os.path.getsize(self.JOURNAL_FILE))
+        with open(self.SNAPSHOT_FILE) as file:
+            self.assertEqual(self.state, json.load(file))
+        self.buy(300.0)
+        journal.save(self.state)
+        journal.close()
+        self.assertEqual(self.state, StateJournal(self.SNAPSHOT_FILE).load())
+
+    def test_replay_over_compacted_snapshot(self):
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.save(self.state)
+        self.buy(100.0)
+        journal.save(self.state)
+        journal.close()
+        with open(self.JOURNAL_FILE, "rb") as file:
+            records = file.read()
+        journal = StateJournal(self.SNAPSHOT_FILE)
+        journal.load()
+        journal.compact()
+        journal.close()
+        # Crash between the snapshot replacement and the journal truncation
+        with open(self.JOURNAL_FILE, "wb") as file:
+            file.write(records)
+        self.assertEqual(self.state, StateJournal(self.SNAPSHOT_FILE).load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, call
+import asyncio
+
+from interface.binance_async import AsyncBinanceInterface
+from interface.binance_io import BinanceInterface, merge_trades
+from interface.trade_store import TradeStore
+from model import Trade
+
+
+def trade_data(trade_id, time, is_buyer, qty="1.0"):
+    return {"id": trade_id, "price": str(trade_id / 10), "qty": qty, "time": time, "isBuyer": is_buyer}
+
+
+class TradeStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = TradeStore(":memory:")
+        self.fills = [
+            trade_data(1, 1000000, True),
+            trade_data(2, 1020000, True, "2.0"),
+            trade_data(3, 1500000, False),
+            trade_data(4, 1530000, False, "0.5"),
+            trade_data(5, 1560000, False, "0.25"),
+        ]
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_empty(self):
+        self.assertIsNone(self.store.last_id("BTCUSDT"))
+        self.assertEqual([], self.store.trades("BTCUSDT"))
+        self.assertIsNone(self.store.last_trade("BTCUSDT"))
+
+    def test_add(self):
+        self.store.add("BTCUSDT", self.fills[:3])
+        self.store.add("BTCUSDT", self.fills[2:])
+        self.store.add("ETHUSDT", [trade_data(9, 1000000, True)])
+        self.assertEqual(5, self.store.last_id("BTCUSDT"))
+        trades = self.store.trades("BTCUSDT")
+        self.assertEqual([Trade(fill) for fill in self.fills], trades)
+        self.assertEqual(0.3, trades[2].price)
+        self.assertFalse(trades[2].is_buy)
+        self.assertEqual(1500., trades[2].time)
+
+    def test_last_trade_merged(self):
+        self.store.add("BTCUSDT", self.fills)
+        last_trade = self.store.last_trade("BTCUSDT")
+        expected = merge_trades([Trade(fill) for fill in self.fills])[-1]
+        self.assertEqual(expected, last_trade)
+        self.assertEqual(1.75, last_trade.quantity)
+        self.assertEqual(1500., last_trade.time)
+
+    def test_sync_from_last_id(self):
+        client = MagicMock()
+        binance = BinanceInterface(client, trade_store=self.store)
+        binance.TRADE_PAGE_SIZE = 2
+        client.get_my_trades.side_effect = [self.fills[:2], self.fills[2:4], []]
+        self.assertEqual(2, len(binance.my_trade_history("BTCUSDT")))
+        self.assertEqual(
+            [
+                call(symbol="BTCUSDT", fromId=0, limit=2),
+                call(symbol="BTCUSDT", fromId=3, limit=2),
+                call(symbol="BTCUSDT", fromId=5, limit=2),
+            ],
+            client.get_my_trades.call_args_list,
+        )
+        client.get_my_trades.side_effect = [self.fills[4:]]
+        self.assertEqual(Trade(self.fills[2]), binance.last_trade("BTCUSDT"))
+        client.get_my_trades.assert_called_with(symbol="BTCUSDT", fromId=5, limit=2)
+
+    def test_async_sync_from_last_id(self):
+        client = AsyncMock()
+        binance = AsyncBinanceInterface(client, trade_store=self.store)
+        binance.TRADE_PAGE_SIZE = 2
+        client.get_my_trades.side_effect = [self.fills[:2], self.fills[2:4], []]
+        self.assertEqual(2, len(asyncio.run(binance.my_trade_history("BTCUSDT"))))
+        self.assertEqual(
+            [
+                call(symbol="BTCUSDT", fromId=0, limit=2),
+                call(symbol="BTCUSDT", fromId=3, limit=2),
+                call(symbol="BTCUSDT", fromId=5, limit=2),
+            ],
+            client.get_my_trades.await_args_list,
+        )
+        client.get_my_trades.side_effect = [self.fills[4:]]
+        self.assertEqual(Trade(self.fills[2]), asyncio.run(binance.last_trade("BTCUSDT")))
+        client.get_my_trades.assert_awaited_with(symbol="BTCUSDT", fromId=5, limit=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
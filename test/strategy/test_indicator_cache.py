@@ -0,0 +1,77 @@
+import unittest
+
+from interface import read_data
+from strategy.bollinger_bands import KlinesBollingerBandsStrategy
+from strategy.indicator_cache import IndicatorCache
+from strategy.indicators import Indicators
+from strategy.rsi_ema import KlinesRsiEmaStrategy
+
+
+class IndicatorCacheTest(unittest.TestCase):
+
+    TEST_FILE_PATH = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+
+    def setUp(self):
+        self.klines = read_data.read_klines_from_json(self.TEST_FILE_PATH)
+        self.cache = IndicatorCache()
+
+    def test_value(self):
+        typical_prices = self.klines.typical_prices()
+        value = self.cache.exp_moving_average(self.klines, "typical", 50, 20)
+        self.assertEqual(Indicators.exp_moving_average(typical_prices, 50, 20), value)
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+        self.assertEqual(value, self.cache.exp_moving_average(self.klines, "typical", 50, 20))
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+
+    def test_windows_share_absolute_indices(self):
+        value = self.cache.exp_moving_average(self.klines[10:60], "typical", 40, 20)
+        self.assertEqual(value, self.cache.exp_moving_average(self.klines[20:70], "typical", 30, 20))
+        self.assertEqual(value, self.cache.exp_moving_average(self.klines, "typical", 50, 20))
+        self.assertEqual(2, self.cache.misses)
+
+    def test_rsi_from_root_index(self):
+        close_prices = self.klines.close_price
+        for k in range(24, len(self.klines) + 1):
+            window = self.klines[k - 24:k]
+            self.assertAlmostEqual(
+                Indicators.rsi(close_prices, k - 20, k), self.cache.rsi(window, "close", 4, 24)
+            )
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(1, len(self.cache.series_entries))
+
+    def test_separate_series(self):
+        other_klines = read_data.read_klines_from_json(self.TEST_FILE_PATH)
+        self.cache.rsi(self.klines, "close", 10, 34)
+        self.cache.rsi(other_klines, "close", 10, 34)
+        self.assertEqual(0, self.cache.hits)
+
+    def test_eviction(self):
+        cache = IndicatorCache(max_size=2, max_series=1)
+        for K in range(30, 35):
+            cache.standard_deviation(self.klines, "close", K, 20)
+        self.assertEqual(2, len(cache.entries))
+        cache.standard_deviation(self.klines, "close", 34, 20)
+        cache.standard_deviation(self.klines, "close", 30, 20)
+        self.assertEqual((1, 6), (cache.hits, cache.misses))
+
+    def test_shared_between_strategies(self):
+        bollinger = KlinesBollingerBandsStrategy()
+        bollinger.indicator_cache = self.cache
+        other_bollinger = KlinesBollingerBandsStrategy()
+        other_bollinger.indicator_cache = self.cache
+        other_bollinger.STD_DEV_FACTOR = 2.
+        rsi_ema = KlinesRsiEmaStrategy()
+        rsi_ema.indicator_cache = self.cache
+        rsi_ema.EMA_LONG_NB_PERIODS = 40
+        for k in range(45, len(self.klines) + 1):
+            window = self.klines[k - 45:k]
+            bollinger.decide_action(window, None)
+            misses = self.cache.misses
+            other_bollinger.decide_action(window, None)
+            self.assertEqual(misses, self.cache.misses)
+            rsi_ema.decide_action(window, None)
+        self.assertGreater(self.cache.hit_rate, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
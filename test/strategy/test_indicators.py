@@ -1,6 +1,8 @@
 import unittest
 
-from strategy.indicators import Indicators
+import numpy as np
+
+from strategy.indicators import Indicators, RangeRatioIndex, sliding_extremum
 
 
 class IndicatorsTest(unittest.TestCase):
@@ -83,3 +85,106 @@ class IndicatorsTest(unittest.TestCase):
             self.x, K=8, nb_period=2))
         self.assertEqual(1.769710428290459, Indicators.standard_deviation(
             self.x, K=8, nb_period=4))
+
+
+class IndicatorSeriesTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.x = list(8000. * np.exp(np.cumsum(rng.normal(0., 0.01, 200))))
+        self.volumes = list(rng.uniform(10., 100., 200))
+
+    def test_simple_moving_average_series(self):
+        series = Indicators.simple_moving_average_series(self.x, 20)
+        self.assertTrue(np.isnan(series[:19]).all())
+        for k in range(20, len(self.x)):
+            self.assertAlmostEqual(Indicators.simple_moving_average(self.x, k, 20), series[k])
+
+    def test_exp_moving_average_series(self):
+        for nb_period in [1, 2, 20, 100]:
+            series = Indicators.exp_moving_average_series(self.x, nb_period)
+            self.assertTrue(np.isnan(series[:nb_period - 1]).all())
+            for k in range(nb_period, len(self.x)):
+                self.assertAlmostEqual(Indicators.exp_moving_average(self.x, k, nb_period), series[k])
+
+    def test_standard_deviation_series(self):
+        series = Indicators.standard_deviation_series(self.x, 20)
+        for k in range(20, len(self.x)):
+            self.assertAlmostEqual(Indicators.standard_deviation(self.x, k, 20), series[k], places=6)
+
+    def test_macd_series(self):
+        series = Indicators.macd_difference_series(self.x)
+        for k in range(40, len(self.x)):
+            self.assertAlmostEqual(Indicators.macd_difference(self.x, k), series[k])
+
+    def test_rsi_series(self):
+        series = Indicators.rsi_series(self.x, 24)
+        self.assertTrue(np.isnan(series[:23]).all())
+        for k in range(23, len(self.x)):
+            self.assertAlmostEqual(Indicators.rsi(self.x, k - 23, k + 1), series[k])
+
+    def test_rsi_series_flat(self):
+        self.assertEqual([0., 0.], list(Indicators.rsi_series([1., 1., 1., 1.], 3)[2:]))
+
+    def test_mfi_series(self):
+        series = Indicators.mfi_series(self.x, self.volumes, 14)
+        for k in range(13, len(self.x)):
+            self.assertAlmostEqual(Indicators.mfi(self.x, self.volumes, k - 13, k + 1), series[k])
+
+    def test_stoch_rsi_series(self):
+        for begin in [0, 30]:
+            series = Indicators.stoch_rsi_series(self.x, begin)
+            for k in range(len(self.x)):
+                expected = Indicators.stoch_rsi(self.x, begin, k + 1)
+                if expected is None:
+                    self.assertTrue(np.isnan(series[k]))
+                else:
+                    self.assertAlmostEqual(expected, series[k])
+
+    def test_log_returns_series(self):
+        np.testing.assert_allclose(Indicators.log_returns(self.x), Indicators.log_returns_series(self.x))
+
+
+class RangeRatioIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.x = [1., 3., 2.5, 3.4, .4, 4.5, .9, 0.1, .4]
+        self.volumes = [500., 200., 59., 550., 770., 1200., 1150., 100., .4]
+
+    def test_rsi(self):
+        index = RangeRatioIndex(self.x)
+        for begin in range(len(self.x)):
+            for end in range(len(self.x) + 1):
+                self.assertAlmostEqual(Indicators.rsi(self.x, begin, end), index.ratio(begin, end))
+
+    def test_mfi(self):
+        index = RangeRatioIndex.money_flow(self.x, self.volumes)
+        for begin in range(len(self.x)):
+            for end in range(len(self.x) + 1):
+                self.assertAlmostEqual(Indicators.mfi(self.x, self.volumes, begin, end), index.ratio(begin, end))
+
+    def test_flat_range(self):
+        index = RangeRatioIndex([2., 1., 1., 1., 3.])
+        self.assertEqual(0., index.ratio(1, 4))
+        self.assertEqual([0., 1.], list(index.ratios([1, 2], [4, 5])))
+
+    def test_stoch(self):
+        index = RangeRatioIndex(self.x)
+        self.assertIsNone(index.stoch(0, 1, 3))
+        self.assertEqual(0., index.stoch(0, 5, 3))
+        self.assertAlmostEqual(.20290607161390783, index.stoch(0, 7, 3))
+        self.assertAlmostEqual(.39258693609022444, index.stoch(0, 9, 3))
+        series = index.stoch_series(0, 3)
+        for end in range(1, len(self.x) + 1):
+            expected = index.stoch(0, end, 3)
+            if expected is None:
+                self.assertTrue(np.isnan(series[end - 1]))
+            else:
+                self.assertAlmostEqual(expected, series[end - 1])
+
+    def test_sliding_extremum(self):
+        values = np.random.default_rng(3).normal(size=50)
+        for size in [1, 3, 7, 50]:
+            windows = [values[i:i + size] for i in range(len(values) - size + 1)]
+            np.testing.assert_array_equal([w.min() for w in windows], sliding_extremum(values, size, np.minimum))
+            np.testing.assert_array_equal([w.max() for w in windows], sliding_extremum(values, size, np.maximum))
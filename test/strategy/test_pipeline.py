@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from interface import read_data
+from strategy import pipeline
+from strategy.avg_log_ratio import KlinesAvgLogRatioStrategy
+from strategy.bollinger_bands import KlinesBollingerBandsStrategy
+from strategy.indicators import Indicators
+from strategy.pipeline import Pipeline
+from strategy.rsi_ema import KlinesRsiEmaStrategy
+
+
+class PipelineTest(unittest.TestCase):
+
+    TEST_FILE_PATH = "test/data/binance_klines_BTCUSDT_1h_1569445200000.json"
+
+    def setUp(self):
+        self.klines = read_data.read_klines_from_json(self.TEST_FILE_PATH)
+
+    def test_shared_nodes(self):
+        short_bollinger = KlinesBollingerBandsStrategy()
+        short_bollinger.NB_PERIODS = 10
+        strategies = [KlinesBollingerBandsStrategy(), short_bollinger, KlinesRsiEmaStrategy()]
+        # close, typical, ema and std of typical for 20 and 10, ema of close for 20 and 100, rsi of close
+        self.assertEqual(9, len(Pipeline(strategies).nodes))
+        self.assertEqual(4, len(Pipeline([KlinesBollingerBandsStrategy()] * 10).nodes))
+
+    def test_plan_order(self):
+        nodes = pipeline.plan([pipeline.sma(pipeline.log_returns(pipeline.typical()), 3)])
+        self.assertEqual(["typical", "log_returns(typical)", "sma(log_returns(typical), 3)"], [repr(node) for node in nodes])
+
+    def test_evaluate(self):
+        inputs = pipeline.evaluate_inputs({"ema": pipeline.ema(pipeline.typical(), 20)}, self.klines)
+        np.testing.assert_array_equal(
+            Indicators.exp_moving_average_series(self.klines.typical_prices(), 20), inputs["ema"]
+        )
+
+    def test_signals(self):
+        strategies = [KlinesAvgLogRatioStrategy(), KlinesBollingerBandsStrategy(), KlinesRsiEmaStrategy()]
+        for strategy, (buy, sell) in zip(strategies, Pipeline(strategies).signals(self.klines)):
+            expected_buy, expected_sell = strategy.signals(self.klines)
+            np.testing.assert_array_equal(expected_buy, buy)
+            np.testing.assert_array_equal(expected_sell, sell)
+
+    def test_decide(self):
+        strategies = [KlinesBollingerBandsStrategy(), KlinesRsiEmaStrategy()]
+        window = self.klines[:50]
+        decisions = Pipeline(strategies).decide(window)
+        for strategy, (buy, sell) in zip(strategies, decisions):
+            expected_buy, expected_sell = strategy.signals(window)
+            self.assertEqual((bool(expected_buy[-1]), bool(expected_sell[-1])), (buy, sell))
+
+    def test_unknown_node(self):
+        with self.assertRaises(ValueError):
+            pipeline.Node("vwap")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from model import Kline
+from strategy.indicators import Indicators
+from strategy.streaming import RunningEma, WilderRsi, RollingStats, RollingMinMax, RunningMacd
+
+
+class StreamingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.x = [1., 3., 2.5, 3.4, .4, 4.5, .9, 0.1, .4]
+
+    def test_update_with_kline(self):
+        ema = RunningEma(nb_period=3)
+        kline = Kline([0, '1.0', '2.0', '0.5', '1.5', '10.0', 59999, '15.0', 3])
+        self.assertEqual(1.5, ema.update(kline))
+
+    def test_running_ema(self):
+        ema = RunningEma(nb_period=3)
+        self.assertEqual(1., ema.push(1.))
+        self.assertEqual(2., ema.push(3.))
+        self.assertEqual(2.25, ema.push(2.5))
+
+    def test_wilder_rsi(self):
+        rsi = WilderRsi(nb_period=2)
+        self.assertIsNone(rsi.push(1.))
+        self.assertIsNone(rsi.push(3.))
+        self.assertEqual(2. / 2.5, rsi.push(2.5))
+        self.assertAlmostEqual(.95 / 1.075, rsi.push(3.4))
+
+    def test_rolling_stats(self):
+        stats = RollingStats(nb_period=4)
+        for k, price in enumerate(self.x):
+            std = stats.push(price)
+            if k >= 4:
+                self.assertAlmostEqual(
+                    Indicators.standard_deviation(self.x, K=k, nb_period=4), std)
+                self.assertAlmostEqual(
+                    Indicators.simple_moving_average(self.x, K=k, nb_period=4), stats.mean)
+
+    def test_rolling_min_max(self):
+        min_max = RollingMinMax(nb_period=3)
+        for k, price in enumerate(self.x):
+            window = self.x[max(0, k - 2):k + 1]
+            self.assertEqual((min(window), max(window)), min_max.push(price))
+
+    def test_running_macd(self):
+        macd = RunningMacd(short_nb_period=2, long_nb_period=3, signal_nb_period=2)
+        ema_short = RunningEma(2)
+        ema_long = RunningEma(3)
+        ema_signal = RunningEma(2)
+        for price in self.x:
+            line = ema_short.push(price) - ema_long.push(price)
+            self.assertAlmostEqual(line - ema_signal.push(line), macd.push(price))
+            self.assertAlmostEqual(line, macd.macd)
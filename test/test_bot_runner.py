@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+
+import bot_runner
+
+
+class BotRunnerTest(unittest.TestCase):
+
+    def test_supervise_profile_restarts(self):
+        calls = []
+        restarted = asyncio.Event()
+
+        async def run_profile(params, binance, kline_cache):
+            calls.append(params["profile_name"])
+            if len(calls) == 1:
+                raise KeyError("fills")
+            restarted.set()
+            await asyncio.Event().wait()
+
+        async def run():
+            task = asyncio.create_task(
+                bot_runner.supervise_profile({"profile_name": "test"}, None, None)
+            )
+            await asyncio.wait_for(restarted.wait(), timeout=5)
+            task.cancel()
+
+        with patch.object(bot_runner, "run_profile", run_profile), \
+                patch.object(bot_runner, "RESTART_DELAY", 0), \
+                self.assertLogs(level="ERROR"):
+            asyncio.run(run())
+        self.assertEqual(["test", "test"], calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
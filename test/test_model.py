@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from model import Kline, KlineSeries, as_series
+
+
+class KlineSeriesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kline_data = [
+            [1509926400000, "1.50000000", "1.79900000", "0.50000000", "1.54580000",
+             "15425.04000000", 1509947999999, "23698.98992800", 199, "2901.96000000"],
+            [1509948000000, "1.54580000", "1.68100000", "1.53870000", "1.62880000",
+             "59449.05000000", 1509969599999, "95921.08691000", 338, "26110.78000000"],
+            [1509969600000, "1.62880000", "1.70000000", "1.60000000", "1.61000000",
+             "31000.00000000", 1509991199999, "50000.00000000", 250, "15000.00000000"],
+        ]
+        self.series = KlineSeries.from_data(self.kline_data)
+
+    def test_columns(self):
+        self.assertEqual(3, len(self.series))
+        self.assertEqual(np.int64, self.series.open_time.dtype)
+        self.assertEqual(np.float64, self.series.close_price.dtype)
+        self.assertEqual([1.5458, 1.6288, 1.61], self.series.close_price.tolist())
+        self.assertEqual([199, 338, 250], self.series.nb_trades.tolist())
+
+    def test_kline_view(self):
+        self.assertEqual(Kline(self.kline_data[1]), self.series[1])
+        self.assertEqual(Kline(self.kline_data[2]), self.series[-1])
+        self.assertEqual([Kline(kline_data) for kline_data in self.kline_data], self.series)
+
+    def test_slice_is_view(self):
+        window = self.series[1:3]
+        self.assertEqual(2, len(window))
+        self.assertTrue(np.shares_memory(window.close_price, self.series.close_price))
+        self.assertEqual(Kline(self.kline_data[1]), window[0])
+
+    def test_slice_root(self):
+        window = self.series[1:][:1]
+        self.assertIs(self.series, window.root)
+        self.assertEqual(self.series.key, window.key)
+        self.assertEqual(1, window.offset)
+        self.assertEqual(2, self.series[-1:].offset)
+        self.assertNotEqual(self.series.key, KlineSeries.from_data(self.kline_data).key)
+
+    def test_as_series(self):
+        self.assertIs(self.series, as_series(self.series))
+        klines = [Kline(kline_data) for kline_data in self.kline_data]
+        self.assertEqual(self.series, as_series(klines))
+
+    def test_typical_prices(self):
+        self.assertAlmostEqual((1.5458 + 1.799 + 0.5) / 3, self.series.typical_prices()[0])